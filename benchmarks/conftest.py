@@ -0,0 +1,101 @@
+import warnings
+
+import pytest
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+
+from benchmarks.enex_generator import GeneratorConfig, write_enex
+from enex2notion.enex_parser import iter_notes
+from enex2notion.utils_static import Rules
+
+# Fixed corpus, changing it invalidates saved baselines
+BENCH_CORPUS = GeneratorConfig(notes=50, webclip_ratio=0.5, seed=42)
+
+# Single long article, like a saved documentation page
+BIG_WEBCLIP = GeneratorConfig(
+    notes=1, paragraphs=200, webclip_ratio=1, attachments=0, seed=42
+)
+
+# Paragraph text is wrapped in this many nested formatting tags
+STYLED_DEPTH = 12
+STYLE_TAGS = (
+    ("b", ""),
+    ("i", ""),
+    ("u", ""),
+    ("span", ' style="color: rgb(255, 0, 0);"'),
+    ("span", ' style="font-weight: bold; font-style: italic;"'),
+    ("a", ' href="https://example.com"'),
+)
+
+
+def pytest_configure(config):
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+
+
+@pytest.fixture(scope="session")
+def bench_enex(tmp_path_factory):
+    return write_enex(tmp_path_factory.mktemp("bench") / "bench.enex", BENCH_CORPUS)
+
+
+@pytest.fixture(scope="session")
+def bench_notes(bench_enex):
+    return list(iter_notes(bench_enex))
+
+
+@pytest.fixture(scope="session")
+def bench_rules():
+    return Rules(
+        mode_webclips="TXT",
+        add_meta=False,
+        add_pdf_preview=False,
+        condense_lines=False,
+        condense_lines_sparse=False,
+        tag=None,
+        retry=0,
+        skip_failed=False,
+        keep_failed=False,
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_doms(bench_notes):
+    """Pre-parsed note DOMs, copy before use since parsers modify them in place"""
+
+    return {
+        is_webclip: [
+            BeautifulSoup(n.content, "html.parser").find("en-note")
+            for n in bench_notes
+            if n.is_webclip == is_webclip
+        ]
+        for is_webclip in (False, True)
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_big_webclip(tmp_path_factory):
+    enex_file = write_enex(tmp_path_factory.mktemp("bench") / "big.enex", BIG_WEBCLIP)
+    note = next(iter_notes(enex_file))
+
+    return BeautifulSoup(note.content, "html.parser").find("en-note")
+
+
+@pytest.fixture(scope="session")
+def bench_styled_paragraphs():
+    """Paragraphs wrapped in nested formatting, with more formatting inside"""
+
+    paragraphs = (_make_styled_paragraph(p) for p in range(100))
+
+    return [BeautifulSoup(p, "html.parser").find("div") for p in paragraphs]
+
+
+def _make_styled_paragraph(offset):
+    tags = [STYLE_TAGS[(offset + d) % len(STYLE_TAGS)] for d in range(STYLED_DEPTH)]
+
+    opening = "".join(f"<{name}{attrs}>" for name, attrs in tags)
+    closing = "".join(f"</{name}>" for name, _ in reversed(tags))
+
+    words = "".join(
+        "word{0} <{1}{2}>styled{0}</{1}><br/>".format(w, *STYLE_TAGS[w % 3])
+        for w in range(20)
+    )
+
+    return f"<div>{opening}{words}{closing}</div>"
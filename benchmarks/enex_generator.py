@@ -0,0 +1,269 @@
+"""Synthetic ENEX corpus generator
+
+Output is fully determined by the config (including seed),
+so benchmark runs on different machines parse identical notes.
+
+    python -m benchmarks.enex_generator --notes 500 --webclip-ratio 0.3 out.enex
+"""
+
+import argparse
+import base64
+import hashlib
+import random
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from xml.sax.saxutils import escape
+
+ENEX_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE en-export SYSTEM "http://xml.evernote.com/pub/evernote-export4.dtd">
+<en-export export-date="20211218T085932Z" application="Evernote" version="10.25.6">
+"""
+ENEX_FOOTER = "</en-export>\n"
+
+NOTE_HEADER = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd">
+"""
+
+BASE_DATE = datetime(2021, 11, 18, 8, 53, 32)
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod"
+    " tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam"
+    " quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+INLINE_TAGS = ("b", "i", "u", "s", "code")
+
+ATTACHMENT_MIMES = (
+    ("image/png", "png"),
+    ("image/jpeg", "jpg"),
+    ("application/pdf", "pdf"),
+    ("application/octet-stream", "bin"),
+)
+
+
+@dataclass
+class GeneratorConfig(object):
+    notes: int = 100
+    paragraphs: int = 20
+    words: int = 30
+    webclip_ratio: float = 0.2
+    table_rows: int = 5
+    table_cols: int = 4
+    list_depth: int = 3
+    color_ratio: float = 0.1
+    attachments: int = 1
+    attachment_size: int = 16 * 1024
+    seed: int = 0
+
+
+def generate_enex(config: GeneratorConfig) -> Iterator[str]:
+    rng = random.Random(config.seed)
+
+    yield ENEX_HEADER
+
+    for note_idx in range(config.notes):
+        yield _make_note(rng, config, note_idx)
+
+    yield ENEX_FOOTER
+
+
+def write_enex(path: Path, config: GeneratorConfig) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in generate_enex(config):
+            f.write(chunk)
+
+    return path
+
+
+def _make_note(rng: random.Random, config: GeneratorConfig, note_idx: int) -> str:
+    is_webclip = rng.random() < config.webclip_ratio
+
+    resources = [
+        _make_resource(rng, config.attachment_size, note_idx, res_idx)
+        for res_idx in range(config.attachments)
+    ]
+
+    if is_webclip:
+        body = _make_webclip_body(rng, config, resources)
+        attributes = "<source>web.clip7</source>"
+        attributes += f"<source-url>https://example.com/{note_idx}</source-url>"
+    else:
+        body = _make_note_body(rng, config, resources)
+        attributes = ""
+
+    content = f"{NOTE_HEADER}<en-note>{body}</en-note>"
+    created = BASE_DATE + timedelta(hours=note_idx)
+
+    return "".join(
+        (
+            "<note>",
+            f"<title>Note {note_idx}</title>",
+            f"<created>{created:%Y%m%dT%H%M%SZ}</created>",
+            f"<updated>{created + timedelta(minutes=5):%Y%m%dT%H%M%SZ}</updated>",
+            f"<tag>tag{note_idx % 7}</tag>",
+            f"<note-attributes>{attributes}</note-attributes>",
+            f"<content><![CDATA[{content}]]></content>",
+            *(r[1] for r in resources),
+            "</note>\n",
+        )
+    )
+
+
+def _make_note_body(rng, config, resources) -> str:
+    parts = []
+
+    for par_idx in range(config.paragraphs):
+        parts.append(f"<div>{_make_text(rng, config)}</div>")
+
+        if par_idx == config.paragraphs // 3:
+            parts.append(_make_list(rng, config, config.list_depth))
+        if par_idx == config.paragraphs // 2:
+            parts.append(_make_table(rng, config))
+
+    parts.extend(_make_media(r[0]) for r in resources)
+
+    return "".join(parts)
+
+
+def _make_webclip_body(rng, config, resources) -> str:
+    parts = ["<h1>", _make_words(rng, 6), "</h1>"]
+
+    for par_idx in range(config.paragraphs):
+        if par_idx % 5 == 0:
+            parts.append(f"<h2>{_make_words(rng, 4)}</h2>")
+
+        parts.append(
+            '<div style="margin: 0 auto;"><p style="font-size: 14px;">'
+            f"{_make_text(rng, config)}</p></div>"
+        )
+
+        if par_idx == config.paragraphs // 3:
+            note_list = _make_list(rng, config, config.list_depth)
+            parts.append(f"<div><div>{note_list}</div></div>")
+        if par_idx == config.paragraphs // 2:
+            parts.append(f"<div>{_make_table(rng, config)}</div>")
+
+    parts.extend(_make_media(r[0]) for r in resources)
+
+    return (
+        '<div style="--en-clipped-content: fullPage; --en-clipped-source-url:'
+        f' https://example.com/;">{"".join(parts)}</div>'
+    )
+
+
+def _make_text(rng, config) -> str:
+    chunks = []
+
+    for word in rng.choices(WORDS, k=config.words):
+        roll = rng.random()
+
+        if roll < config.color_ratio:
+            chunks.append(_make_color_span(rng, word))
+        elif roll < config.color_ratio + 0.05:
+            tag = rng.choice(INLINE_TAGS)
+            chunks.append(f"<{tag}>{word}</{tag}>")
+        elif roll < config.color_ratio + 0.07:
+            chunks.append(f'<a href="https://example.com/{word}">{word}</a>')
+        else:
+            chunks.append(word)
+
+    return " ".join(chunks)
+
+
+def _make_color_span(rng, word) -> str:
+    color = "rgb({0}, {1}, {2})".format(*(rng.randrange(256) for _ in range(3)))
+    prop = rng.choice(("color", "background-color"))
+
+    return f'<span style="{prop}: {color};">{word}</span>'
+
+
+def _make_words(rng, count) -> str:
+    return escape(" ".join(rng.choices(WORDS, k=count)))
+
+
+def _make_list(rng, config, depth) -> str:
+    if depth <= 0:
+        return ""
+
+    tag = rng.choice(("ul", "ol"))
+    items = "".join(
+        f"<li>{_make_words(rng, 5)}{_make_list(rng, config, depth - 1)}</li>"
+        for _ in range(3)
+    )
+
+    return f"<{tag}>{items}</{tag}>"
+
+
+def _make_table(rng, config) -> str:
+    rows = "".join(
+        "<tr>{0}</tr>".format(
+            "".join(f"<td>{_make_words(rng, 3)}</td>" for _ in range(config.table_cols))
+        )
+        for _ in range(config.table_rows)
+    )
+
+    return f"<table>{rows}</table>"
+
+
+def _make_media(resource_info: Tuple[str, str]) -> str:
+    md5, mime = resource_info
+
+    return f'<div><en-media type="{mime}" hash="{md5}" /></div>'
+
+
+def _make_resource(rng, size, note_idx, res_idx) -> Tuple[Tuple[str, str], str]:
+    mime, ext = rng.choice(ATTACHMENT_MIMES)
+
+    # Unique per note, so every attachment is a separate upload
+    prefix = f"{note_idx}:{res_idx}:".encode()
+    payload_size = max(size - len(prefix), 0)
+    payload_bits = rng.getrandbits(payload_size * 8) if payload_size else 0
+    data_bin = prefix + payload_bits.to_bytes(payload_size, "little")
+    data_b64 = base64.b64encode(data_bin).decode()
+
+    resource_xml = "".join(
+        (
+            "<resource>",
+            f'<data encoding="base64">{data_b64}</data>',
+            f"<mime>{mime}</mime>",
+            "<resource-attributes>",
+            f"<file-name>file{note_idx}_{res_idx}.{ext}</file-name>",
+            "</resource-attributes>",
+            "</resource>",
+        )
+    )
+
+    return (hashlib.md5(data_bin).hexdigest(), mime), resource_xml
+
+
+def parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.enex_generator",
+        description="Generate synthetic ENEX file for benchmarks",
+    )
+
+    for field in fields(GeneratorConfig):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=field.type,
+            default=field.default,
+            help=f"(default: {field.default})",
+        )
+
+    parser.add_argument("output", type=Path, help="ENEX file to write")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):  # pragma: no cover
+    args = vars(parse_args(argv))
+    output = args.pop("output")
+
+    write_enex(output, GeneratorConfig(**args))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
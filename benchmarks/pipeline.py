@@ -0,0 +1,274 @@
+"""End-to-end upload benchmark against the local Notion mock server
+
+Runs the real CLI on a generated (or given) ENEX file for every combination
+of the swept knobs, each run in a fresh process so module state and peak RSS
+do not leak between runs.
+
+    python -m benchmarks.pipeline --notes 200 --concurrency 1 3 6 --rate-limit 0 3
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.enex_generator import GeneratorConfig, write_enex
+from enex2notion import cli, cli_notion, cli_upload, enex_uploader_block
+from enex2notion.enex_parser import count_notes
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+REPORT_COLUMNS = (
+    ("concurrency", "conc", "{0}"),
+    ("batch_size", "batch", "{0}"),
+    ("rate_limit", "rps", "{0:g}"),
+    ("notes_per_sec", "notes/s", "{0:.2f}"),
+    ("blocks_per_sec", "blocks/s", "{0:.1f}"),
+    ("requests_per_note", "req/note", "{0:.2f}"),
+    ("mb_uploaded", "MB sent", "{0:.2f}"),
+    ("peak_rss_mb", "RSS MB", "{0:.0f}"),
+    ("duration", "time s", "{0:.1f}"),
+)
+
+
+@dataclass
+class PipelineKnobs(object):
+    concurrency: int = 3
+    batch_size: int = 50
+    rate_limit: float = 3
+    latency: float = 0
+
+
+class StageTimer(object):
+    """Accumulates wall time spent in wrapped functions, summed across threads"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def wrap(self, module, func_name, stage):
+        func = getattr(module, func_name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(stage, time.perf_counter() - start)
+
+        setattr(module, func_name, wrapper)
+
+    def wrap_iter(self, module, func_name, stage):
+        func = getattr(module, func_name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            iterator = iter(func(*args, **kwargs))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._add(stage, time.perf_counter() - start)
+                yield item
+
+        setattr(module, func_name, wrapper)
+
+    def _add(self, stage, seconds):
+        with self._lock:
+            self.totals[stage] += seconds
+
+
+def run_pipeline(enex_file: Path, notes_count: int, knobs: PipelineKnobs) -> dict:
+    """Single benchmark run, patches enex2notion modules so needs a fresh process"""
+
+    logging.disable(logging.WARNING)
+
+    cli_upload.MAX_CONCURRENT_NOTES = knobs.concurrency
+    enex_uploader_block.BATCH_LIMIT = knobs.batch_size
+
+    timer = StageTimer()
+    timer.wrap(cli_notion, "get_notion_client", "connect")
+    timer.wrap(cli_upload, "count_notes", "count")
+    timer.wrap_iter(cli_upload, "iter_notes", "read")
+    timer.wrap(cli_upload, "parse_note", "parse")
+    timer.wrap(cli_upload, "get_notebook_page", "notebook")
+    timer.wrap(cli_upload, "upload_note", "upload")
+
+    server = start_mock_server(MockServerConfig(latency=knobs.latency))
+
+    try:
+        start = time.perf_counter()
+        cli.cli(
+            [
+                "--token",
+                "bench",
+                "--pageid",
+                ROOT_PAGE_ID,
+                "--notion-base-url",
+                server.url,
+                "--rate-limit",
+                str(knobs.rate_limit),
+                str(enex_file),
+            ]
+        )
+        duration = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stats = server.state.stats
+
+    return {
+        **asdict(knobs),
+        "notes": notes_count,
+        "duration": duration,
+        "notes_per_sec": notes_count / duration,
+        "blocks_per_sec": stats["blocks_created"] / duration,
+        "requests_per_note": stats["requests"] / notes_count,
+        "mb_uploaded": stats["bytes_received"] / 2**20,
+        "peak_rss_mb": _get_peak_rss_mb(),
+        "stages": dict(timer.totals),
+        "server": dict(stats),
+    }
+
+
+def sweep(enex_file: Path, notes_count: int, knobs_list: List[PipelineKnobs]):
+    spawn_ctx = multiprocessing.get_context("spawn")
+
+    for knobs in knobs_list:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn_ctx) as executor:
+            # Progress bars are configured on import, so the worker has to
+            # inherit it, the pool spawns the worker on submit
+            with _worker_environ(TQDM_DISABLE="1"):
+                future = executor.submit(run_pipeline, enex_file, notes_count, knobs)
+
+            yield future.result()
+
+
+def format_report_header() -> str:
+    return "\t".join(c[1] for c in REPORT_COLUMNS) + "\tstages (s)"
+
+
+def format_report_row(result: dict) -> str:
+    columns = [fmt.format(result[key]) for key, _, fmt in REPORT_COLUMNS]
+    stages = " ".join(f"{k}={v:.1f}" for k, v in sorted(result["stages"].items()))
+
+    return "\t".join(columns) + f"\t{stages}"
+
+
+@contextmanager
+def _worker_environ(**variables: str):
+    saved = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+
+    try:
+        yield
+    finally:
+        for name, saved_value in saved.items():
+            if saved_value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = saved_value
+
+
+def _get_peak_rss_mb() -> Optional[float]:
+    if resource is None:  # pragma: no cover
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.pipeline",
+        description="Benchmark full upload pipeline against the mock Notion API",
+    )
+
+    parser.add_argument("--enex", type=Path, help="benchmark this file instead")
+    parser.add_argument("--notes", type=int, default=100, help="generated notes")
+    parser.add_argument(
+        "--webclip-ratio", type=float, default=0.2, help="generated webclips share"
+    )
+    parser.add_argument(
+        "--attachment-size", type=int, default=16 * 1024, help="generated file size"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="generator seed")
+
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[3])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[50])
+    parser.add_argument("--rate-limit", type=float, nargs="+", default=[0])
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="mock server latency, seconds"
+    )
+
+    parser.add_argument("--json", type=Path, help="also save results to this file")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):  # pragma: no cover
+    args = parse_args(argv)
+
+    knobs_list = [
+        PipelineKnobs(concurrency=c, batch_size=b, rate_limit=r, latency=args.latency)
+        for c, b, r in itertools.product(
+            args.concurrency, args.batch_size, args.rate_limit
+        )
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        enex_file = args.enex
+        if enex_file is None:
+            enex_file = write_enex(
+                Path(tmp_dir) / "bench.enex",
+                GeneratorConfig(
+                    notes=args.notes,
+                    webclip_ratio=args.webclip_ratio,
+                    attachment_size=args.attachment_size,
+                    seed=args.seed,
+                ),
+            )
+
+        notes_count = count_notes(enex_file)
+
+        print(format_report_header(), flush=True)  # noqa: WPS421
+
+        results = []
+        for result in sweep(enex_file, notes_count, knobs_list):
+            results.append(result)
+            print(format_report_row(result), flush=True)  # noqa: WPS421
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+from enex2notion.enex_parser import iter_notes
+from enex2notion.enex_uploader_block import _convert_block_to_api_format
+from enex2notion.note_parser.blocks import parse_note_blocks
+from enex2notion.note_parser.note import parse_note
+from enex2notion.note_parser.note_post_process_condense import condense_lines
+from enex2notion.note_parser.string_extractor import extract_string
+from enex2notion.note_parser.webclip import parse_webclip
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _copy_doms(doms):
+    return ([copy.copy(d) for d in doms],), {}
+
+
+def _iter_blocks(blocks):
+    for block in blocks:
+        yield block
+        yield from _iter_blocks(block.children)
+
+
+def test_iter_notes(benchmark, bench_enex):
+    notes = benchmark(lambda: list(iter_notes(bench_enex)))
+
+    assert notes
+
+
+def test_parse_note(benchmark, bench_notes, bench_rules):
+    blocks = benchmark(lambda: [parse_note(n, bench_rules) for n in bench_notes])
+
+    assert all(blocks)
+
+
+def test_parse_note_blocks(benchmark, bench_doms):
+    blocks = benchmark.pedantic(
+        lambda doms: [parse_note_blocks(d) for d in doms],
+        setup=lambda: _copy_doms(bench_doms[False]),
+        rounds=10,
+    )
+
+    assert all(blocks)
+
+
+def test_parse_webclip(benchmark, bench_doms):
+    blocks = benchmark.pedantic(
+        lambda doms: [parse_webclip(d) for d in doms],
+        setup=lambda: _copy_doms(bench_doms[True]),
+        rounds=10,
+    )
+
+    assert all(blocks)
+
+
+def test_parse_big_webclip(benchmark, bench_big_webclip):
+    blocks = benchmark.pedantic(
+        parse_webclip,
+        setup=lambda: ((copy.copy(bench_big_webclip),), {}),
+        rounds=5,
+    )
+
+    assert blocks
+
+
+def test_extract_string(benchmark, bench_doms):
+    paragraphs = [p for d in bench_doms[False] for p in d.find_all("div")]
+
+    strings = benchmark(lambda: [extract_string(p) for p in paragraphs])
+
+    assert any(strings)
+
+
+def test_extract_string_styled(benchmark, bench_styled_paragraphs):
+    strings = benchmark(lambda: [extract_string(p) for p in bench_styled_paragraphs])
+
+    assert all(strings)
+
+
+def test_condense_lines(benchmark, bench_notes, bench_rules):
+    notes_blocks = [parse_note(n, bench_rules) for n in bench_notes]
+
+    blocks = benchmark.pedantic(
+        lambda nb: [condense_lines(b) for b in nb],
+        setup=lambda: ((copy.deepcopy(notes_blocks),), {}),
+        rounds=10,
+    )
+
+    assert all(blocks)
+
+
+def test_convert_block_to_api_format(benchmark, bench_notes, bench_rules):
+    blocks = [b for n in bench_notes for b in _iter_blocks(parse_note(n, bench_rules))]
+
+    api_blocks = benchmark(lambda: [_convert_block_to_api_format(b) for b in blocks])
+
+    assert len(api_blocks) == len(blocks)
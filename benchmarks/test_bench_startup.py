@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _run_python(*args):
+    subprocess.run([sys.executable, *args], check=True, capture_output=True)
+
+
+def test_python_startup(benchmark):
+    """Interpreter alone, baseline for the rest"""
+
+    benchmark(_run_python, "-c", "pass")
+
+
+def test_import_cli(benchmark):
+    benchmark(_run_python, "-c", "import enex2notion.cli")
+
+
+def test_cli_version(benchmark):
+    benchmark(_run_python, "-m", "enex2notion", "--version")
+
+
+def test_import_parser(benchmark):
+    benchmark(_run_python, "-c", "import enex2notion.note_parser.note")
+
+
+def test_import_pdf_parser(benchmark):
+    benchmark(_run_python, "-c", "import enex2notion.note_parser.webclip_pdf")
+
+
+def test_import_uploader(benchmark):
+    benchmark(_run_python, "-c", "import enex2notion.cli_upload")
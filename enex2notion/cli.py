@@ -1,45 +1,226 @@
 import logging
 import sys
 from pathlib import Path
-from typing import List
+from typing import Callable, List
 
-from enex2notion.cli_args import parse_args
-from enex2notion.cli_logging import setup_logging
-from enex2notion.cli_notion import get_root
-from enex2notion.cli_upload import EnexUploader
+from enex2notion.cli_args import parse_args, parse_replay_args, parse_state_args
+from enex2notion.cli_logging import disable_bs4_warning, setup_logging
 from enex2notion.cli_wkhtmltopdf import ensure_wkhtmltopdf
+from enex2notion.utils_profile import stage_profiler
 from enex2notion.utils_static import Rules
+from enex2notion.utils_stats import (
+    format_report,
+    run_stats,
+    write_report,
+    write_trace,
+)
 
 logger = logging.getLogger(__name__)
 
 
 def cli(argv):
+    if argv[:1] == ["replay"]:
+        cli_replay(argv[1:])
+        return
+
+    if argv[:1] == ["state"]:
+        cli_state(argv[1:])
+        return
+
     args = parse_args(argv)
 
     rules = Rules.from_args(args)
 
     setup_logging(args.verbose, args.log)
+    disable_bs4_warning()
 
-    if rules.mode_webclips == "PDF":
+    if rules.mode_webclips in {"PDF", "AUTO"}:
         ensure_wkhtmltopdf()
 
-    root = get_root(args.token, args.pageid)
+    _start_run_stats(args)
+
+    # Commands import their modules on use to keep startup fast
+    if args.estimate:
+        _cli_estimate(args, rules)
+    elif args.spool_dir:
+        _cli_spool(args, rules)
+    else:
+        _cli_upload(args, rules)
+
+
+def cli_replay(argv):
+    from enex2notion.cli_notion import get_root
+    from enex2notion.cli_replay import SpoolUploader
+    from enex2notion.enex_spool import find_spool_notebooks
+    from enex2notion.utils_rate_limit import RateLimiter
+
+    args = parse_replay_args(argv)
+
+    rules = Rules.from_args(args)
+
+    setup_logging(args.verbose, args.log)
+
+    _ensure_sync_done_file(args)
+
+    _start_run_stats(args)
+
+    rate_limiter = RateLimiter(args.rate_limit)
+
+    root = get_root(args.token, args.pageid, rate_limiter, args.notion_base_url)
+
+    stage_profiler.start(args.profile, args.profile_dir, args.profile_every)
+
+    spool_uploader = SpoolUploader(
+        import_root=root,
+        mode=args.mode,
+        done_file=args.done_file,
+        rules=rules,
+        sync=args.sync,
+        state_db=args.state_db,
+        engine=args.engine,
+        rate_limiter=rate_limiter,
+        upload_jobs=args.upload_jobs,
+    )
+
+    try:
+        for spool_dir in args.spool_input:
+            for notebook_dir in find_spool_notebooks(spool_dir):
+                spool_uploader.upload_notebook(notebook_dir)
+    finally:
+        spool_uploader.close()
+        _report_run_stats(args)
+
+
+def cli_state(argv):
+    from enex2notion.cli_state import (
+        STATUS_FAILED,
+        STATUS_PARSED,
+        STATUS_UPLOADING,
+        print_state,
+    )
+
+    args = parse_state_args(argv)
+
+    setup_logging(False, None)
+
+    if args.left:
+        statuses = [STATUS_PARSED, STATUS_UPLOADING, STATUS_FAILED]
+    elif args.failed:
+        statuses = [STATUS_FAILED]
+    else:
+        statuses = None
+
+    print_state(args.state_db, statuses)
+
+
+def _cli_estimate(args, rules: Rules):
+    from enex2notion.cli_estimate import EnexEstimator
+
+    enex_estimator = EnexEstimator(rules, args.rate_limit)
+
+    try:
+        _process_input(enex_estimator.estimate_notebook, args.enex_input)
+    finally:
+        _report_run_stats(args)
+
+    logger.info(f"Upload estimate:\n{enex_estimator.get_summary()}")
+
+
+def _cli_spool(args, rules: Rules):
+    from enex2notion.cli_spool import EnexSpooler
+
+    enex_spooler = EnexSpooler(args.spool_dir, rules, args.spool_jobs)
+
+    try:
+        _process_input(enex_spooler.spool_notebook, args.enex_input)
+    finally:
+        _report_run_stats(args)
+
+
+def _cli_upload(args, rules: Rules):
+    from enex2notion.cli_notion import get_root
+    from enex2notion.cli_upload import EnexUploader
+    from enex2notion.utils_rate_limit import RateLimiter
+
+    _ensure_sync_done_file(args)
+
+    rate_limiter = RateLimiter(args.rate_limit)
+
+    root = get_root(args.token, args.pageid, rate_limiter, args.notion_base_url)
+
+    stage_profiler.start(args.profile, args.profile_dir, args.profile_every)
 
     enex_uploader = EnexUploader(
-        import_root=root, mode=args.mode, done_file=args.done_file, rules=rules
+        import_root=root,
+        mode=args.mode,
+        done_file=args.done_file,
+        rules=rules,
+        sync=args.sync,
+        state_db=args.state_db,
+        engine=args.engine,
+        rate_limiter=rate_limiter,
+        upload_jobs=args.upload_jobs,
     )
 
-    _process_input(enex_uploader, args.enex_input)
+    try:
+        _process_input(enex_uploader.upload_notebook, args.enex_input)
+    finally:
+        enex_uploader.close()
+        _report_run_stats(args)
+
+
+def _ensure_sync_done_file(args):
+    if args.sync and not (args.done_file or args.state_db):
+        logger.error(
+            "--sync requires --done-file or --state-db to map notes to uploaded pages!"
+        )
+        sys.exit(1)
+
+
+def _start_run_stats(args):
+    run_stats.reset()
+
+    if args.trace:
+        run_stats.start_trace()
+
+    if args.metrics_listen or args.metrics_file:
+        from enex2notion.utils_metrics import metrics_exporter
+
+        try:
+            metrics_exporter.start(args.metrics_listen, args.metrics_file)
+        except OSError as e:
+            logger.error(f"Failed to start metrics server: {e}")
+            sys.exit(1)
+
+
+def _report_run_stats(args):
+    stage_profiler.stop()
+
+    if args.metrics_listen or args.metrics_file:
+        from enex2notion.utils_metrics import metrics_exporter
+
+        metrics_exporter.stop()
+
+    report = run_stats.get_report()
+
+    if args.report:
+        write_report(report, args.report)
+        logger.info(f"Run summary:\n{format_report(report)}")
+    else:
+        logger.debug(f"Run summary:\n{format_report(report)}")
+
+    if args.trace:
+        write_trace(run_stats.get_trace(), args.trace)
 
 
-def _process_input(enex_uploader: EnexUploader, enex_input: List[Path]):
+def _process_input(process_notebook: Callable[[Path], None], enex_input: List[Path]):
     for path in enex_input:
         if path.is_dir():
             logger.info(f"Processing directory '{path.name}'...")
             for enex_file in sorted(path.glob("**/*.enex")):
-                enex_uploader.upload_notebook(enex_file)
+                process_notebook(enex_file)
         else:
-            enex_uploader.upload_notebook(path)
+            process_notebook(path)
 
 
 def main():  # pragma: no cover
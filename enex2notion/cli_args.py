@@ -1,19 +1,43 @@
 import argparse
 from pathlib import Path
+from typing import Tuple
 
 from enex2notion.version import __version__
 
 HELP_ARGS_WIDTH = 29
 
+REPLAY_OPTIONS = (
+    "--token",
+    "--pageid",
+    "--mode",
+    "--retry",
+    "--skip-failed",
+    "--keep-failed",
+    "--done-file",
+    "--state-db",
+    "--sync",
+    "--rate-limit",
+    "--engine",
+    "--upload-jobs",
+    "--notion-base-url",
+    "--report",
+    "--trace",
+    "--profile",
+    "--profile-dir",
+    "--profile-every",
+    "--metrics-listen",
+    "--metrics-file",
+    "--log",
+    "--verbose",
+    "--version",
+)
+
 
 def parse_args(argv):
-    parser = argparse.ArgumentParser(
+    parser = _make_parser(
         prog="enex2notion",
         description="Uploads ENEX files to Notion",
         usage="%(prog)s [-h] [--token TOKEN] [OPTION ...] FILE/DIR [FILE/DIR ...]",
-        formatter_class=lambda prog: argparse.HelpFormatter(
-            prog, max_help_position=HELP_ARGS_WIDTH
-        ),
     )
 
     schema = {
@@ -23,6 +47,102 @@ def parse_args(argv):
             "help": "ENEX files or directories to upload",
             "metavar": "FILE/DIR",
         },
+        **_get_options_schema(),
+    }
+
+    for arg, arg_params in schema.items():
+        parser.add_argument(arg, **arg_params)
+
+    return parser.parse_args(argv)
+
+
+def parse_replay_args(argv):
+    parser = _make_parser(
+        prog="enex2notion replay",
+        description="Uploads notes converted with --spool-dir to Notion",
+        usage="%(prog)s [-h] [--token TOKEN] [OPTION ...] SPOOL_DIR [SPOOL_DIR ...]",
+    )
+
+    options_schema = _get_options_schema()
+
+    schema = {
+        "spool_input": {
+            "type": Path,
+            "nargs": "+",
+            "help": "spool directories or single spooled notebooks to upload",
+            "metavar": "SPOOL_DIR",
+        },
+        **{arg: options_schema[arg] for arg in REPLAY_OPTIONS},
+    }
+
+    for arg, arg_params in schema.items():
+        parser.add_argument(arg, **arg_params)
+
+    # Conversion options are already applied to the spooled payloads
+    parser.set_defaults(
+        **_get_option_defaults(
+            {
+                arg: arg_params
+                for arg, arg_params in options_schema.items()
+                if arg not in REPLAY_OPTIONS
+            }
+        )
+    )
+
+    return parser.parse_args(argv)
+
+
+def parse_state_args(argv):
+    parser = _make_parser(
+        prog="enex2notion state",
+        description="Shows upload state stored with --state-db",
+        usage="%(prog)s [-h] [--left | --failed] FILE",
+    )
+
+    parser.add_argument(
+        "state_db",
+        type=Path,
+        metavar="FILE",
+        help="state database to query",
+    )
+
+    query_group = parser.add_mutually_exclusive_group()
+    query_group.add_argument(
+        "--left",
+        action="store_true",
+        help="list notes that are not uploaded yet",
+    )
+    query_group.add_argument(
+        "--failed",
+        action="store_true",
+        help="list notes that failed to upload with error messages",
+    )
+
+    return parser.parse_args(argv)
+
+
+def _make_parser(prog, description, usage):
+    return argparse.ArgumentParser(
+        prog=prog,
+        description=description,
+        usage=usage,
+        formatter_class=lambda prog: argparse.HelpFormatter(
+            prog, max_help_position=HELP_ARGS_WIDTH
+        ),
+    )
+
+
+def _get_option_defaults(options_schema):
+    defaults_parser = argparse.ArgumentParser(add_help=False)
+
+    for arg, arg_params in options_schema.items():
+        defaults_parser.add_argument(arg, **arg_params)
+
+    return vars(defaults_parser.parse_args([]))
+
+
+def _get_options_schema():
+    return {
         "--token": {
             "help": (
                 "Notion token, stored in token_v2 cookie for notion.so"
@@ -46,11 +166,11 @@ def parse_args(argv):
             ),
         },
         "--mode-webclips": {
-            "choices": ["TXT", "PDF"],
+            "choices": ["TXT", "PDF", "AUTO"],
             "default": "TXT",
             "help": (
-                "convert web clips to text (TXT) or pdf (PDF) before upload"
-                " (default: TXT)"
+                "convert web clips to text (TXT) or pdf (PDF) before upload,"
+                " or pick one by upload cost (AUTO) (default: TXT)"
             ),
         },
         "--retry": {
@@ -82,7 +202,65 @@ def parse_args(argv):
             "action": "store_true",
             "help": (
                 "include preview image with PDF webclips for gallery view thumbnail"
-                " (works only with --mode-webclips=PDF)"
+                " (works only with --mode-webclips=PDF or AUTO)"
+            ),
+        },
+        "--webclip-max-requests": {
+            "type": int,
+            "default": 5,
+            "metavar": "N",
+            "help": (
+                "with --mode-webclips=AUTO, upload web clip as PDF if its text"
+                " would take more than N block append requests (default: 5)"
+            ),
+        },
+        "--pdf-jobs": {
+            "type": int,
+            "default": 0,
+            "metavar": "N",
+            "help": (
+                "number of processes rendering PDF webclips and their previews"
+                " at once, split between --spool-jobs processes (default: one per CPU)"
+            ),
+        },
+        "--pdf-timeout": {
+            "type": float,
+            "default": 60,
+            "metavar": "SEC",
+            "help": (
+                "kill wkhtmltopdf if rendering one webclip takes longer than SEC"
+                " (default: 60)"
+            ),
+        },
+        "--pdf-preview-width": {
+            "type": int,
+            "default": 0,
+            "metavar": "PX",
+            "help": (
+                "scale --add-pdf-preview images to PX pixels wide"
+                " (default: PDF page size)"
+            ),
+        },
+        "--pdf-preview-format": {
+            "choices": ["png", "jpeg"],
+            "default": "png",
+            "help": "image format for --add-pdf-preview images (default: png)",
+        },
+        "--render-cache": {
+            "type": Path,
+            "metavar": "DIR",
+            "help": (
+                "keep rendered PDF webclips and previews in DIR"
+                " to reuse them for unchanged notes on the next run"
+            ),
+        },
+        "--render-cache-size": {
+            "type": int,
+            "default": 1024,
+            "metavar": "MB",
+            "help": (
+                "remove least recently used renders once --render-cache"
+                " grows over MB megabytes (default: 1024)"
             ),
         },
         "--add-meta": {
@@ -111,6 +289,136 @@ def parse_args(argv):
             "metavar": "FILE",
             "help": "file for uploaded notes hashes to resume interrupted upload",
         },
+        "--state-db": {
+            "type": Path,
+            "metavar": "FILE",
+            "help": (
+                "SQLite database for per-note upload state,"
+                " used instead of --done-file to resume interrupted upload"
+            ),
+        },
+        "--sync": {
+            "action": "store_true",
+            "help": (
+                "update pages of notes changed since they were uploaded"
+                " instead of creating new ones (requires --done-file or --state-db)"
+            ),
+        },
+        "--estimate": {
+            "action": "store_true",
+            "help": (
+                "parse notes and report API requests, bytes and time"
+                " their upload would take at --rate-limit, without uploading"
+            ),
+        },
+        "--spool-dir": {
+            "type": Path,
+            "metavar": "DIR",
+            "help": (
+                "convert notes into ready-to-send Notion API payloads in DIR"
+                " instead of uploading, use 'enex2notion replay DIR' to upload them"
+            ),
+        },
+        "--spool-jobs": {
+            "type": int,
+            "default": 1,
+            "metavar": "N",
+            "help": (
+                "number of parallel processes for --spool-dir conversion (default: 1)"
+            ),
+        },
+        "--rate-limit": {
+            "type": float,
+            "default": 3,
+            "metavar": "RPS",
+            "help": (
+                "maximum Notion API requests per second,"
+                " 0 to disable rate limiting"
+                " (default: 3)"
+            ),
+        },
+        "--engine": {
+            "choices": ["threads", "async"],
+            "default": "threads",
+            "help": (
+                "send note uploads from worker threads (threads)"
+                " or with asyncio Notion client on a single thread (async)"
+                " (default: threads)"
+            ),
+        },
+        "--upload-jobs": {
+            "type": int,
+            "default": 3,
+            "metavar": "N",
+            "help": (
+                "number of notes uploaded at once, --engine threads also caps it"
+                " at the worker thread count (default: 3)"
+            ),
+        },
+        "--notion-base-url": {
+            "metavar": "URL",
+            "help": (
+                "send API requests to URL instead of https://api.notion.com,"
+                " e.g. to benchmark against enex2notion.notion_mock_server"
+            ),
+        },
+        "--report": {
+            "type": Path,
+            "metavar": "FILE",
+            "help": (
+                "save JSON report with time spent in each processing stage,"
+                " API request latencies and error counts to FILE"
+            ),
+        },
+        "--trace": {
+            "type": Path,
+            "metavar": "FILE",
+            "help": (
+                "record timeline of notes, requests and waits to FILE"
+                " in Chrome trace format (open with ui.perfetto.dev)"
+            ),
+        },
+        "--profile": {
+            "choices": ["cpu", "mem"],
+            "help": (
+                "profile CPU time (cpu) or memory allocations (mem)"
+                " of reading, parsing and uploading notes"
+            ),
+        },
+        "--profile-dir": {
+            "type": Path,
+            "default": Path("profile"),
+            "metavar": "DIR",
+            "help": (
+                "directory for per-stage .pstats (cpu) or memory.txt (mem)"
+                " profile results (default: profile)"
+            ),
+        },
+        "--profile-every": {
+            "type": int,
+            "default": 100,
+            "metavar": "N",
+            "help": (
+                "take memory snapshot for every N-th note"
+                " after its parsing, conversion and upload (default: 100)"
+            ),
+        },
+        "--metrics-listen": {
+            "type": parse_listen_address,
+            "metavar": "[HOST:]PORT",
+            "help": (
+                "serve live progress metrics on http://HOST:PORT/metrics"
+                " (Prometheus) and /metrics.json (default host: 127.0.0.1)"
+            ),
+        },
+        "--metrics-file": {
+            "type": Path,
+            "metavar": "FILE",
+            "help": (
+                "keep live progress metrics in FILE in Prometheus text format,"
+                " e.g. for node_exporter textfile collector"
+            ),
+        },
         "--log": {
             "type": Path,
             "metavar": "FILE",
@@ -126,7 +434,10 @@ def parse_args(argv):
         },
     }
 
-    for arg, arg_params in schema.items():
-        parser.add_argument(arg, **arg_params)
 
-    return parser.parse_args(argv)
+def parse_listen_address(address: str) -> Tuple[str, int]:
+    """Parse [HOST:]PORT, host defaults to localhost"""
+
+    host, _, port = address.rpartition(":")
+
+    return host or "127.0.0.1", int(port)
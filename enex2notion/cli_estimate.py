@@ -0,0 +1,176 @@
+import json
+import logging
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import List, Optional
+
+from enex2notion.enex_parser import iter_notes
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.enex_uploader_block import (
+    build_block_payloads,
+    plan_payload_tree_requests,
+)
+from enex2notion.note_parser.note import parse_note
+from enex2notion.utils_static import Rules
+
+logger = logging.getLogger(__name__)
+
+# Notebook page lookup and creation
+NOTEBOOK_REQUESTS = 2
+
+# Unfinished page lookup, page creation and final rename
+NOTE_PAGE_REQUESTS = 3
+
+# File upload object creation and content upload
+FILE_UPLOAD_REQUESTS = 2
+
+# Summary table columns: title, alignment and width, value precision
+SUMMARY_COLUMNS = (
+    ("notebook", "<30", ""),
+    ("notes", ">6", ""),
+    ("pages", ">6", ""),
+    ("appends", ">8", ""),
+    ("blocks", ">8", ""),
+    ("files", ">6", ""),
+    ("file MiB", ">10", ".1f"),
+    ("JSON MiB", ">10", ".1f"),
+    ("requests", ">9", ""),
+    ("time", ">10", ""),
+)
+
+
+@dataclass
+class UploadEstimate(object):
+    """API cost of uploading notes, as planned by the uploader"""
+
+    notes: int = 0
+    skipped: int = 0
+    pages: int = 0
+    appends: int = 0
+    blocks: int = 0
+    files: int = 0
+    file_bytes: int = 0
+    payload_bytes: int = 0
+    requests: int = 0
+
+    def add(self, other: "UploadEstimate"):
+        for estimate_field in fields(self):
+            setattr(
+                self,
+                estimate_field.name,
+                getattr(self, estimate_field.name)
+                + getattr(other, estimate_field.name),
+            )
+
+    def get_wall_time(self, rate_limit: float) -> Optional[float]:
+        if rate_limit <= 0:
+            return None
+
+        return self.requests / rate_limit
+
+
+class EnexEstimator(object):
+    """Parses notes and plans their upload without sending anything"""
+
+    def __init__(self, rules: Rules, rate_limit: float):
+        self.rules = rules
+        self.rate_limit = rate_limit
+
+        self.notebooks: List[tuple] = []
+
+    def estimate_notebook(self, enex_file: Path):
+        logger.info(f"Estimating notebook '{enex_file.stem}'...")
+
+        notebook_estimate = UploadEstimate(requests=NOTEBOOK_REQUESTS)
+
+        for note in iter_notes(enex_file):
+            notebook_estimate.add(self._estimate_note(note))
+
+        self.notebooks.append((enex_file.stem, notebook_estimate))
+
+    def get_summary(self) -> str:
+        total = UploadEstimate()
+
+        lines = [_format_header()]
+        for notebook_title, notebook_estimate in self.notebooks:
+            total.add(notebook_estimate)
+            lines.append(
+                _format_row(notebook_title, notebook_estimate, self.rate_limit)
+            )
+
+        lines.append(_format_row("TOTAL", total, self.rate_limit))
+
+        return "\n".join(lines)
+
+    def _estimate_note(self, note: EvernoteNote) -> UploadEstimate:
+        try:
+            note_blocks = parse_note(note, self.rules)
+        except Exception as e:
+            logger.error(f"Failed to parse note '{note.title}'")
+            logger.debug(e, exc_info=e)
+            return UploadEstimate(notes=1, skipped=1)
+
+        if not note_blocks:
+            logger.debug(f"Skipping note '{note.title}' (no blocks)")
+            return UploadEstimate(notes=1, skipped=1)
+
+        return estimate_payloads(build_block_payloads(note_blocks))
+
+
+def estimate_payloads(payloads) -> UploadEstimate:
+    """API cost of uploading note payloads into a new page"""
+
+    estimate = UploadEstimate(notes=1, pages=1, requests=NOTE_PAGE_REQUESTS)
+
+    for request_payloads in plan_payload_tree_requests(payloads):
+        blocks = [p["block"] for p in request_payloads]
+
+        estimate.appends += 1
+        estimate.blocks += len(blocks)
+        estimate.payload_bytes += len(json.dumps({"children": blocks}))
+
+        for payload in request_payloads:
+            if payload.get("file"):
+                estimate.files += 1
+                estimate.file_bytes += payload["file"]["size"]
+                estimate.requests += FILE_UPLOAD_REQUESTS
+
+    estimate.requests += estimate.appends
+
+    return estimate
+
+
+def _format_header():
+    return " ".join(format(title, width) for title, width, _ in SUMMARY_COLUMNS)
+
+
+def _format_row(title, estimate: UploadEstimate, rate_limit):
+    wall_time = estimate.get_wall_time(rate_limit)
+
+    row = (
+        title[:30],
+        estimate.notes,
+        estimate.pages,
+        estimate.appends,
+        estimate.blocks,
+        estimate.files,
+        estimate.file_bytes / 2**20,
+        estimate.payload_bytes / 2**20,
+        estimate.requests,
+        _format_duration(wall_time),
+    )
+
+    return " ".join(
+        format(row_value, f"{width}{precision}")
+        for row_value, (_, width, precision) in zip(row, SUMMARY_COLUMNS)
+    )
+
+
+def _format_duration(seconds):
+    if seconds is None:
+        return "n/a"
+
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f"{hours}:{minutes:02}:{seconds:02}"
@@ -21,10 +21,8 @@ def setup_logging(is_verbose: bool, log_file: Optional[Path]):
     logging.getLogger("urllib3").setLevel(logging.ERROR)
     logging.getLogger("notion").setLevel(logging.WARNING)
 
-    _disable_bs4_warning()
 
-
-def _disable_bs4_warning():  # pragma: no cover
+def disable_bs4_warning():  # pragma: no cover
     # For latest version of BeautifulSoup
     try:
         from bs4 import XMLParsedAsHTMLWarning  # noqa: WPS433
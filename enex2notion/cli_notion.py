@@ -1,15 +1,25 @@
 import logging
 import sys
 
-from notion_client import Client
+import httpx
+from notion_client import AsyncClient, Client
 from notion_client.errors import APIResponseError
 
 from enex2notion.utils_exceptions import BadTokenException
+from enex2notion.utils_rate_limit import (
+    AsyncRateLimitedTransport,
+    RateLimitedTransport,
+    RateLimiter,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def get_root(token, pageid=None):
+# Notion allows an average of 3 requests per second per integration
+DEFAULT_RATE_LIMIT = 3
+
+
+def get_root(token, pageid=None, rate_limiter=None, base_url=None):
     if not token:
         logger.warning(
             "No token provided, dry run mode. Nothing will be uploaded to Notion!"
@@ -23,7 +33,7 @@ def get_root(token, pageid=None):
         return None
 
     try:
-        client = get_notion_client(token)
+        client = get_notion_client(token, rate_limiter, base_url)
     except BadTokenException:
         logger.error("Invalid token provided!")
         sys.exit(1)
@@ -31,15 +41,21 @@ def get_root(token, pageid=None):
     return get_import_root(client, pageid)
 
 
-def get_notion_client(token):
+def get_notion_client(token, rate_limiter=None, base_url=None):
+    """rate_limiter paces the client requests, DEFAULT_RATE_LIMIT if not given"""
+
+    transport = RateLimitedTransport(rate_limiter or RateLimiter(DEFAULT_RATE_LIMIT))
+
+    client_options = {"base_url": base_url} if base_url else {}
+
     try:
-        client = Client(auth=token)
+        client = Client(
+            auth=token,
+            client=httpx.Client(transport=transport),
+            **client_options,
+        )
         # Test the client by trying to list users
         client.users.list()
-        # Make token discoverable
-        client.auth = token
-        client._auth = token
-        client._token = token
         return client
     except APIResponseError as e:
         if e.status == 401:
@@ -49,6 +65,21 @@ def get_notion_client(token):
         raise BadTokenException
 
 
+def get_async_notion_client(client: Client, rate_limiter: RateLimiter):
+    """Async client with the same token and API URL as the already checked client
+
+    Pass the rate limiter of the sync client to pace both clients together.
+    Must be created inside the event loop it is used in.
+    """
+    transport = AsyncRateLimitedTransport(rate_limiter)
+
+    return AsyncClient(
+        auth=client.options.auth,
+        base_url=client.options.base_url,
+        client=httpx.AsyncClient(transport=transport),
+    )
+
+
 def get_import_root(client, pageid):
     """
     Get the page specified by pageid to use as the import root.
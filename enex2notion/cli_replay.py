@@ -0,0 +1,73 @@
+import logging
+from pathlib import Path
+from typing import Iterator
+
+from enex2notion.cli_upload import EnexUploader
+from enex2notion.enex_spool import (
+    SpoolFiles,
+    count_spool_notes,
+    iter_spool_notes,
+    read_spool_payloads,
+)
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.enex_uploader import sync_note_payloads, upload_note_payloads
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolUploader(EnexUploader):
+    """Uploads notebooks spooled with --spool-dir, no note parsing involved"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.note_paths = {}
+
+    def _get_notebook_title(self, notebook_dir: Path) -> str:
+        return notebook_dir.name
+
+    def _count_notes(self, notebook_dir: Path) -> int:
+        return count_spool_notes(notebook_dir)
+
+    def _iter_notes(self, notebook_dir: Path) -> Iterator[EvernoteNote]:
+        for spool_note in iter_spool_notes(notebook_dir):
+            self.note_paths[spool_note.note.note_hash] = spool_note.path
+
+            yield spool_note.note
+
+    def _parse_note(self, note):
+        try:
+            return read_spool_payloads(self.note_paths[note.note_hash])
+        except Exception as e:
+            logger.error(f"Failed to read spooled note '{note.title}'")
+            logger.debug(e, exc_info=e)
+            return []
+
+    def _upload_note(self, notebook_root, note, payloads, progress):
+        return upload_note_payloads(
+            notebook_root,
+            note,
+            payloads,
+            self._get_spool_files(note, payloads),
+            self.rules.keep_failed,
+            progress,
+        )
+
+    def _sync_note(self, notebook_root, note, payloads, page_id, progress):
+        return sync_note_payloads(
+            notebook_root,
+            note,
+            payloads,
+            self._get_spool_files(note, payloads),
+            self.rules.keep_failed,
+            page_id,
+            progress,
+        )
+
+    def _get_note_payloads(self, note, note_blocks):
+        return note_blocks, self._get_spool_files(note, note_blocks)
+
+    def _get_spool_files(self, note, payloads):
+        note_path = self.note_paths[note.note_hash]
+
+        return SpoolFiles(note_path.parent, payloads)
@@ -0,0 +1,104 @@
+import dataclasses
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from enex2notion.enex_parser import count_notes, iter_notes
+from enex2notion.enex_spool import get_spooled_hashes, write_spool_note
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.enex_uploader_block import (
+    build_block_payloads,
+    collect_block_resources,
+)
+from enex2notion.note_parser.note import parse_note
+from enex2notion.note_parser.webclip_pdf_render import get_worker_render_jobs
+from enex2notion.utils_static import Rules
+
+logger = logging.getLogger(__name__)
+
+
+class EnexSpooler(object):
+    def __init__(self, spool_dir: Path, rules: Rules, jobs: int = 1):
+        self.spool_dir = spool_dir
+        self.jobs = max(jobs, 1)
+
+        # Render processes are split between spool processes
+        self.rules = dataclasses.replace(
+            rules, pdf_jobs=get_worker_render_jobs(rules.pdf_jobs, self.jobs)
+        )
+
+    def spool_notebook(self, enex_file: Path):
+        logger.info(f"Spooling notebook '{enex_file.stem}'...")
+
+        notebook_dir = self.spool_dir / enex_file.stem
+        notebook_dir.mkdir(parents=True, exist_ok=True)
+
+        notes_count = count_notes(enex_file)
+
+        logger.debug(f"'{enex_file.stem}' notebook contains {notes_count} note(s)")
+
+        spooled_hashes = get_spooled_hashes(notebook_dir)
+
+        notes = (
+            (note_idx, note)
+            for note_idx, note in enumerate(iter_notes(enex_file), 1)
+            if note.note_hash not in spooled_hashes
+        )
+
+        if self.jobs == 1:
+            for note_idx, note in notes:
+                spool_note(notebook_dir, self.rules, note_idx, note)
+        else:
+            self._spool_notes_parallel(notebook_dir, notes)
+
+    def _spool_notes_parallel(self, notebook_dir: Path, notes):
+        # Keep submission bounded, notes carry their resources in memory
+        max_pending = self.jobs * 2
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            pending = set()
+
+            for note_idx, note in notes:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _raise_failed(done)
+
+                pending.add(
+                    pool.submit(spool_note, notebook_dir, self.rules, note_idx, note)
+                )
+
+            done, _ = wait(pending)
+            _raise_failed(done)
+
+
+def spool_note(notebook_dir: Path, rules: Rules, note_idx: int, note: EvernoteNote):
+    if rules.tag and rules.tag not in note.tags:
+        note.tags.append(rules.tag)
+
+    logger.debug(f"Parsing note '{note.title}'")
+
+    try:
+        note_blocks = parse_note(note, rules)
+    except Exception as e:
+        logger.error(f"Failed to parse note '{note.title}'")
+        logger.debug(e, exc_info=e)
+        return
+
+    if not note_blocks:
+        logger.debug(f"Skipping note '{note.title}' (no blocks)")
+        return
+
+    logger.info(f"Spooling note {note_idx} '{note.title}'")
+
+    write_spool_note(
+        notebook_dir,
+        note_idx,
+        note,
+        build_block_payloads(note_blocks),
+        collect_block_resources(note_blocks),
+    )
+
+
+def _raise_failed(futures):
+    for future in futures:
+        future.result()
@@ -0,0 +1,278 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from enex2notion.enex_types import EvernoteNote
+
+logger = logging.getLogger(__name__)
+
+STATUS_PARSED = "parsed"
+STATUS_UPLOADING = "uploading"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Commit pending state updates after this many writes or seconds
+COMMIT_BATCH = 50
+COMMIT_INTERVAL = 2
+
+# Wait for other writers instead of failing with "database is locked"
+BUSY_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    note_hash TEXT PRIMARY KEY,
+    note_id TEXT NOT NULL,
+    notebook TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    page_id TEXT,
+    blocks INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    duration REAL,
+    error TEXT,
+    progress TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_note_id ON notes (note_id);
+CREATE INDEX IF NOT EXISTS notes_status ON notes (status);
+"""
+
+UPSERT_NOTE = """
+INSERT INTO notes (note_hash, note_id, notebook, title, status, blocks, updated_at)
+VALUES (:note_hash, :note_id, :notebook, :title, :status, :blocks, :now)
+ON CONFLICT (note_hash) DO UPDATE SET
+    note_id = excluded.note_id,
+    notebook = excluded.notebook,
+    title = excluded.title,
+    status = excluded.status,
+    blocks = excluded.blocks,
+    updated_at = excluded.updated_at
+WHERE notes.status != 'done'
+"""
+
+START_NOTE = """
+UPDATE notes SET status = :status, attempts = attempts + 1, updated_at = :now
+WHERE note_hash = :note_hash
+"""
+
+FINISH_NOTE = """
+UPDATE notes SET
+    status = :status,
+    page_id = COALESCE(:page_id, page_id),
+    duration = :duration,
+    error = :error,
+    progress = :progress,
+    updated_at = :now
+WHERE note_hash = :note_hash
+"""
+
+
+class StateDB(object):
+    """Per-note upload state in SQLite, drop-in replacement for DoneFile
+
+    Writes from all threads are buffered in memory and committed in batches,
+    each batch in a single short transaction, so no write lock is held
+    between calls. Other processes are serialized by SQLite locking (WAL mode).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, dict]] = []
+        self._batch_started = 0.0
+
+        self._conn = sqlite3.connect(
+            str(path),
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __contains__(self, note_hash):
+        row = self._query_one(
+            "SELECT 1 FROM notes WHERE note_hash = ? AND status = ?",
+            (note_hash, STATUS_DONE),
+        )
+        return row is not None
+
+    def get_page_id(self, note_id) -> Optional[str]:
+        row = self._query_one(
+            "SELECT page_id FROM notes"
+            " WHERE note_id = ? AND page_id IS NOT NULL"
+            " ORDER BY status = 'done' DESC, updated_at DESC LIMIT 1",
+            (note_id,),
+        )
+        return row[0] if row else None
+
+    def get_progress(self, note_hash) -> Optional[dict]:
+        """Progress of the unfinished upload saved by mark_failed()"""
+
+        row = self._query_one(
+            "SELECT progress FROM notes"
+            " WHERE note_hash = ? AND status != ? AND progress IS NOT NULL",
+            (note_hash, STATUS_DONE),
+        )
+        return json.loads(row[0]) if row else None
+
+    def mark_parsed(self, note: EvernoteNote, notebook: str, blocks: int):
+        self._write(
+            UPSERT_NOTE,
+            {
+                "note_hash": note.note_hash,
+                "note_id": note.note_id,
+                "notebook": notebook,
+                "title": note.title,
+                "status": STATUS_PARSED,
+                "blocks": blocks,
+                "now": time.time(),
+            },
+        )
+
+    def mark_uploading(self, note: EvernoteNote):
+        self._write(
+            START_NOTE,
+            {
+                "note_hash": note.note_hash,
+                "status": STATUS_UPLOADING,
+                "now": time.time(),
+            },
+        )
+
+    def mark_done(self, note: EvernoteNote, page_id: str, duration: float):
+        self._finish(note, STATUS_DONE, page_id, duration, None)
+
+    def mark_failed(
+        self,
+        note: EvernoteNote,
+        error: str,
+        duration: float,
+        progress: Optional[dict] = None,
+    ):
+        """progress is kept to resume the upload in the next run"""
+
+        self._finish(note, STATUS_FAILED, None, duration, error, progress)
+
+    def iter_notes(self, statuses: Optional[List[str]] = None) -> Iterator[Tuple]:
+        query = (
+            "SELECT status, attempts, duration, notebook, title, page_id, error"
+            " FROM notes"
+        )
+        params: Tuple = ()
+
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            params = tuple(statuses)
+
+        with self._lock:
+            self._commit()
+            rows = self._conn.execute(
+                f"{query} ORDER BY notebook, updated_at", params
+            ).fetchall()
+
+        yield from rows
+
+    def count_by_status(self):
+        with self._lock:
+            self._commit()
+            return dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM notes GROUP BY status"
+                ).fetchall()
+            )
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def _finish(self, note, status, page_id, duration, error, progress=None):
+        self._write(
+            FINISH_NOTE,
+            {
+                "note_hash": note.note_hash,
+                "status": status,
+                "page_id": page_id,
+                "duration": duration,
+                "error": error,
+                "progress": json.dumps(progress) if progress else None,
+                "now": time.time(),
+            },
+        )
+
+    def _write(self, query, params):
+        with self._lock:
+            if not self._pending:
+                self._batch_started = time.monotonic()
+
+            self._pending.append((query, params))
+
+            batch_age = time.monotonic() - self._batch_started
+            if len(self._pending) >= COMMIT_BATCH or batch_age >= COMMIT_INTERVAL:
+                self._commit()
+
+    def _query_one(self, query, params):
+        with self._lock:
+            self._commit()
+            return self._conn.execute(query, params).fetchone()
+
+    def _commit(self):
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for query, params in pending:
+                self._conn.execute(query, params)
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+def print_state(state_db: Path, statuses: Optional[List[str]] = None):
+    if not state_db.exists():
+        logger.error(f"State database '{state_db}' does not exist!")
+        return
+
+    state = StateDB(state_db)
+
+    try:
+        if statuses is None:
+            _print_summary(state)
+        else:
+            _print_notes(state, statuses)
+    finally:
+        state.close()
+
+
+def _print_summary(state: StateDB):
+    counts = state.count_by_status()
+
+    for status in (STATUS_PARSED, STATUS_UPLOADING, STATUS_DONE, STATUS_FAILED):
+        print(f"{status}\t{counts.get(status, 0)}")  # noqa: WPS421
+
+
+def _print_notes(state: StateDB, statuses: List[str]):
+    for status, attempts, duration, notebook, title, _, error in state.iter_notes(
+        statuses
+    ):
+        duration_str = f"{duration:.1f}s" if duration is not None else "-"
+        error_str = (error or "").replace("\n", " ")
+
+        print(  # noqa: WPS421
+            f"{status}\t{attempts}\t{duration_str}\t{notebook}\t{title}\t{error_str}"
+        )
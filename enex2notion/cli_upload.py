@@ -1,157 +1,548 @@
 import asyncio
 import itertools
 import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, Optional
 
+from enex2notion.cli_notion import DEFAULT_RATE_LIMIT, get_async_notion_client
+from enex2notion.cli_state import StateDB
 from enex2notion.enex_parser import count_notes, iter_notes
 from enex2notion.enex_types import EvernoteNote
-from enex2notion.enex_uploader import upload_note
+from enex2notion.enex_uploader import (
+    UploadProgress,
+    convert_note_blocks,
+    discard_note_upload,
+    sync_note,
+    upload_note,
+)
+from enex2notion.enex_uploader_async import AsyncNoteUploader
+from enex2notion.enex_uploader_block import collect_block_resources
 from enex2notion.enex_uploader_modes import get_notebook_page
 from enex2notion.note_parser.note import parse_note
+from enex2notion.note_parser.webclip_pdf_render import get_render_jobs
 from enex2notion.utils_exceptions import NoteUploadFailException
+from enex2notion.utils_profile import stage_profiler
+from enex2notion.utils_rate_limit import RateLimiter
 from enex2notion.utils_static import Rules
+from enex2notion.utils_stats import run_stats
 
 logger = logging.getLogger(__name__)
 
-# Maximum concurrent note uploads
+# Default number of notes uploaded at once, see --upload-jobs
 MAX_CONCURRENT_NOTES = 3
 
+UPLOAD_ENGINES = ("threads", "async")
+
+# Delay before retrying failed note upload, doubles with each attempt
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60
+
+
+@dataclass
+class NoteUpload(object):
+    """Parsed note on its way to Notion, kept between upload attempts"""
+
+    note: EvernoteNote
+    note_blocks: list
+    page_id: Optional[str] = None
+    payloads: Optional[list] = None
+    resources: Any = None
+    progress: UploadProgress = field(default_factory=UploadProgress)
+    attempt: int = 0
+    duration: float = 0
+
+
+def get_retry_delay(attempt: int) -> float:
+    return min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+
+
 class DoneFile(object):
-    def __init__(self, path: Path):
+    """Hashes of uploaded notes and the pages they were uploaded to
+
+    Each line is either a bare note hash (older done files) or
+    tab separated note hash, note id and Notion page id.
+    Without path it is kept in memory only.
+    """
+
+    def __init__(self, path: Optional[Path]):
         self.path = path
 
+        self.done_hashes = set()
+        self.note_pages = {}
+
+        self._lock = threading.Lock()
+
+        if path is None:
+            return
+
         try:
             with open(path, "r") as f:
-                self.done_hashes = {line.strip() for line in f}
+                for line in f:
+                    self._load_line(line)
         except FileNotFoundError:
-            self.done_hashes = set()
+            return
 
     def __contains__(self, note_hash):
         return note_hash in self.done_hashes
 
-    def add(self, note_hash):
+    def get_page_id(self, note_id) -> Optional[str]:
+        return self.note_pages.get(note_id)
+
+    def mark_parsed(self, note: EvernoteNote, notebook: str, blocks: int):
+        """Only finished uploads are recorded in done file"""
+
+    def mark_uploading(self, note: EvernoteNote):
+        """Only finished uploads are recorded in done file"""
+
+    def mark_failed(
+        self,
+        note: EvernoteNote,
+        error: str,
+        duration: float,
+        progress: Optional[dict] = None,
+    ):
+        """Only finished uploads are recorded in done file"""
+
+    def get_progress(self, note_hash) -> Optional[dict]:
+        """Unfinished uploads start over, their progress needs --state-db"""
+
+    def mark_done(self, note: EvernoteNote, page_id: str, duration: float):
+        self.add(note.note_hash, note.note_id, page_id)
+
+    def close(self):
+        """Done file is written line by line, nothing to flush"""
+
+    def add(self, note_hash, note_id=None, page_id=None):
+        with self._lock:
+            self.done_hashes.add(note_hash)
+
+            if note_id and page_id:
+                self.note_pages[note_id] = page_id
+                line = f"{note_hash}\t{note_id}\t{page_id}"
+            else:
+                line = note_hash
+
+            if self.path is not None:
+                with open(self.path, "a") as f:
+                    f.write(f"{line}\n")
+
+    def _load_line(self, line):
+        note_hash, *note_page = line.strip().split("\t")
+
         self.done_hashes.add(note_hash)
 
-        with open(self.path, "a") as f:
-            f.write(f"{note_hash}\n")
+        if len(note_page) == 2:
+            note_id, page_id = note_page
+            self.note_pages[note_id] = page_id
 
 
 class EnexUploader(object):
-    def __init__(self, import_root, mode: str, done_file: Optional[Path], rules: Rules):
+    def __init__(
+        self,
+        import_root,
+        mode: str,
+        done_file: Optional[Path],
+        rules: Rules,
+        sync: bool = False,
+        state_db: Optional[Path] = None,
+        engine: str = "threads",
+        rate_limiter: Optional[RateLimiter] = None,
+        upload_jobs: int = MAX_CONCURRENT_NOTES,
+    ):
         self.import_root = import_root
         self.mode = mode
 
         self.rules = rules
+        self.sync = sync
+
+        self.engine = engine
+        self.async_uploader: Optional[AsyncNoteUploader] = None
 
-        self.done_hashes = DoneFile(done_file) if done_file else set()
+        # Shared by the sync client of import_root and the async engine client
+        self.rate_limiter = rate_limiter or RateLimiter(DEFAULT_RATE_LIMIT)
+        self.upload_jobs = upload_jobs
+
+        self.done_notes = StateDB(state_db) if state_db else DoneFile(done_file)
 
         self.notebook_root = None
+        self.notebook_title = None
         self.notebook_notes_count = None
 
+    def close(self):
+        self.done_notes.close()
+
     def upload_notebook(self, enex_file: Path):
-        logger.info(f"Processing notebook '{enex_file.stem}'...")
+        notebook_title = self._get_notebook_title(enex_file)
+        self.notebook_title = notebook_title
+
+        logger.info(f"Processing notebook '{notebook_title}'...")
 
         try:
-            self.notebook_root = self._get_notebook_root(enex_file.stem)
+            self.notebook_root = self._get_notebook_root(notebook_title)
         except NoteUploadFailException:
             if not self.rules.skip_failed:
                 raise
             return
 
-        self.notebook_notes_count = count_notes(enex_file)
+        self.notebook_notes_count = self._count_notes(enex_file)
 
         logger.debug(
-            f"'{enex_file.stem}' notebook contains {self.notebook_notes_count} note(s)"
+            f"'{notebook_title}' notebook contains {self.notebook_notes_count} note(s)"
         )
 
         # Use async processing for concurrent note uploads
         asyncio.run(self._upload_notes_concurrent(enex_file))
 
+    def _get_notebook_title(self, enex_file: Path) -> str:
+        return enex_file.stem
+
+    def _count_notes(self, enex_file: Path) -> int:
+        return count_notes(enex_file)
+
+    def _iter_notes(self, enex_file: Path) -> Iterator[EvernoteNote]:
+        return iter_notes(enex_file)
+
     async def _upload_notes_concurrent(self, enex_file: Path):
         """Upload notes concurrently using async semaphore for rate limiting."""
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_NOTES)
-        
+        semaphore = asyncio.Semaphore(self.upload_jobs)
+
+        # Notes are parsed ahead of the upload slots, so PDF renders can use
+        # all --pdf-jobs while upload_jobs notes are being uploaded
+        prefetch = asyncio.Semaphore(
+            self.upload_jobs + get_render_jobs(self.rules.pdf_jobs)
+        )
+
         # Collect all notes first so we can process them concurrently
         notes_to_upload = []
-        for note_idx, note in enumerate(iter_notes(enex_file), 1):
-            if note.note_hash not in self.done_hashes:
-                notes_to_upload.append((note, note_idx))
-            else:
-                logger.debug(f"Skipping note '{note.title}' (already uploaded)")
-        
+        with stage_profiler.profile("read"):
+            for note_idx, note in enumerate(self._iter_notes(enex_file), 1):
+                if note.note_hash not in self.done_notes:
+                    notes_to_upload.append((note, note_idx))
+                else:
+                    logger.debug(f"Skipping note '{note.title}' (already uploaded)")
+
         if not notes_to_upload:
             logger.info("All notes already uploaded, skipping notebook")
             return
-        
-        logger.info(f"Uploading {len(notes_to_upload)} notes concurrently (max {MAX_CONCURRENT_NOTES} at once)")
-        
+
+        run_stats.add_gauge("notes_planned", len(notes_to_upload))
+        run_stats.set_gauge("upload_slots", self.upload_jobs)
+
+        logger.info(
+            f"Uploading {len(notes_to_upload)} notes concurrently"
+            f" (max {self.upload_jobs} at once)"
+        )
+
+        if self.engine == "async" and self.notebook_root is not None:
+            self.async_uploader = AsyncNoteUploader(
+                get_async_notion_client(self.import_root["_client"], self.rate_limiter),
+                self.rules.keep_failed,
+            )
+
+        try:
+            await self._upload_notes_tasks(semaphore, prefetch, notes_to_upload)
+        finally:
+            if self.async_uploader is not None:
+                await self.async_uploader.close()
+                self.async_uploader = None
+
+    async def _upload_notes_tasks(
+        self,
+        semaphore: asyncio.Semaphore,
+        prefetch: asyncio.Semaphore,
+        notes_to_upload,
+    ):
         # Create async tasks for each note
         tasks = []
         for note, note_idx in notes_to_upload:
-            task = asyncio.create_task(self._upload_note_async(semaphore, note, note_idx))
+            task = asyncio.create_task(
+                self._upload_note_async(semaphore, prefetch, note, note_idx)
+            )
             tasks.append(task)
-        
+
         # Execute all note uploads concurrently
         try:
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            
+
             # Check for any exceptions that weren't handled
             failed_count = 0
             for i, result in enumerate(results):
                 if isinstance(result, Exception) and not self.rules.skip_failed:
                     failed_count += 1
                     logger.error(f"Unhandled error in note {i+1}: {result}")
-            
+
             if failed_count > 0 and not self.rules.skip_failed:
                 raise Exception(f"{failed_count} notes failed to upload")
-                
+
         except Exception as e:
             logger.error(f"Error during concurrent note upload: {e}")
             if not self.rules.skip_failed:
                 raise
 
-    async def _upload_note_async(self, semaphore: asyncio.Semaphore, note: EvernoteNote, note_idx: int):
-        """Upload a single note with concurrency limiting."""
-        async with semaphore:
-            # Run the synchronous upload_note in a thread executor
-            loop = asyncio.get_event_loop()
-            try:
-                await loop.run_in_executor(None, self.upload_note, note, note_idx)
-            except Exception as e:
-                logger.error(f"Failed to upload note '{note.title}': {e}")
-                if not self.rules.skip_failed:
-                    raise
+    async def _upload_note_async(
+        self,
+        semaphore: asyncio.Semaphore,
+        prefetch: asyncio.Semaphore,
+        note: EvernoteNote,
+        note_idx: int,
+    ):
+        """Upload a single note with concurrency limiting.
+
+        Parsing happens outside of the upload slot, prefetch limits
+        the number of notes parsed but not yet uploaded.
+        """
+        track = f"note {note_idx}"
+        try:
+            async with prefetch:
+                note_upload = await self._prepare_note_async(note, note_idx)
+                if note_upload is None:
+                    return
+
+                async with _note_slot(semaphore, track):
+                    note_upload = await self._attempt_note_upload(note_upload)
+
+            # Failed uploads wait without holding a slot, so other notes keep going
+            while note_upload is not None:
+                retry_delay = get_retry_delay(note_upload.attempt)
+                logger.warning(
+                    f"Failed to upload note '{note.title}' to Notion!"
+                    f" Retrying in {retry_delay}s..."
+                )
+                run_stats.add_gauge("notes_retry_waiting", 1)
+                try:
+                    with run_stats.timer("note_retry_wait", track=track):
+                        await asyncio.sleep(retry_delay)
+                finally:
+                    run_stats.add_gauge("notes_retry_waiting", -1)
+
+                async with _note_slot(semaphore, track):
+                    note_upload = await self._attempt_note_upload(note_upload)
+        except Exception as e:
+            logger.error(f"Failed to upload note '{note.title}': {e}")
+            if not self.rules.skip_failed:
+                raise
+
+    async def _prepare_note_async(self, note: EvernoteNote, note_idx: int):
+        prepare = self._prepare_note_upload
+        if self.async_uploader is not None:
+            prepare = self._prepare_note_payloads
+
+        # Parsing and conversion are CPU bound, keep them off the loop
+        return await asyncio.get_event_loop().run_in_executor(
+            None, prepare, note, note_idx
+        )
+
+    async def _attempt_note_upload(self, note_upload: NoteUpload):
+        if self.async_uploader is None:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self._try_upload_note, note_upload
+            )
+
+        return await self._try_upload_note_async(note_upload)
+
+    def upload_note(self, note: EvernoteNote, note_idx: int) -> Optional[NoteUpload]:
+        """Parse and upload note, returns upload to retry later if it failed"""
+
+        note_upload = self._prepare_note_upload(note, note_idx)
+        if note_upload is None:
+            return None
+
+        return self._try_upload_note(note_upload)
 
-    def upload_note(self, note: EvernoteNote, note_idx: int):
-        if note.note_hash in self.done_hashes:
+    def _prepare_note_upload(
+        self, note: EvernoteNote, note_idx: int
+    ) -> Optional[NoteUpload]:
+        if note.note_hash in self.done_notes:
             logger.debug(f"Skipping note '{note.title}' (already uploaded)")
-            return
+            return None
 
         if self.rules.tag and self.rules.tag not in note.tags:
             note.tags.append(self.rules.tag)
 
         logger.debug(f"Parsing note '{note.title}'")
 
-        note_blocks = self._parse_note(note)
+        with run_stats.timer("note_parse", note=note.title):
+            with stage_profiler.profile("parse"):
+                note_blocks = self._parse_note(note)
+
+        stage_profiler.checkpoint("parse", note.title)
         if not note_blocks:
             logger.debug(f"Skipping note '{note.title}' (no blocks)")
-            return
+            run_stats.incr("notes_skipped")
+            return None
+
+        self.done_notes.mark_parsed(note, self.notebook_title, len(note_blocks))
+
+        if self.notebook_root is None:
+            return None
+
+        page_id = self.done_notes.get_page_id(note.note_id) if self.sync else None
 
-        if self.notebook_root is not None:
-            logger.info(
-                f"Uploading note {note_idx}"
-                f" out of {self.notebook_notes_count} '{note.title}'"
+        action = "Updating" if page_id else "Uploading"
+        logger.info(
+            f"{action} note {note_idx}"
+            f" out of {self.notebook_notes_count} '{note.title}'"
+        )
+
+        saved_progress = self.done_notes.get_progress(note.note_hash)
+        progress = (
+            UploadProgress.from_dict(saved_progress)
+            if saved_progress
+            else UploadProgress()
+        )
+
+        return NoteUpload(
+            note=note, note_blocks=note_blocks, page_id=page_id, progress=progress
+        )
+
+    def _prepare_note_payloads(
+        self, note: EvernoteNote, note_idx: int
+    ) -> Optional[NoteUpload]:
+        note_upload = self._prepare_note_upload(note, note_idx)
+
+        if note_upload is not None:
+            note_upload.payloads, note_upload.resources = self._get_note_payloads(
+                note, note_upload.note_blocks
             )
 
-            try:
-                self._upload_note(self.notebook_root, note, note_blocks)
-            except NoteUploadFailException:
-                if not self.rules.skip_failed:
-                    raise
-                return
+        return note_upload
+
+    def _try_upload_note(self, note_upload: NoteUpload) -> Optional[NoteUpload]:
+        upload_start = self._start_upload_attempt(note_upload)
+
+        try:
+            with run_stats.timer(
+                "note_upload", note=note_upload.note.title, attempt=note_upload.attempt
+            ):
+                with stage_profiler.profile("upload"):
+                    page_id = self._upload_or_sync_note(note_upload)
+        except NoteUploadFailException as e:
+            if self._is_upload_retried(note_upload, upload_start, e):
+                return note_upload
+
+            discard_note_upload(
+                self.notebook_root, note_upload.progress, self.rules.keep_failed
+            )
+
+            if not self.rules.skip_failed:
+                raise
+            return None
 
-            self.done_hashes.add(note.note_hash)
+        self._finish_upload(note_upload, upload_start, page_id)
+
+        return None
+
+    async def _try_upload_note_async(
+        self, note_upload: NoteUpload
+    ) -> Optional[NoteUpload]:
+        """_try_upload_note() for the async engine"""
+
+        upload_start = self._start_upload_attempt(note_upload)
+
+        try:
+            with run_stats.timer(
+                "note_upload",
+                track=note_upload.note.note_hash,
+                note=note_upload.note.title,
+                attempt=note_upload.attempt,
+            ):
+                page_id = await self._upload_or_sync_note_async(note_upload)
+        except NoteUploadFailException as e:
+            if self._is_upload_retried(note_upload, upload_start, e):
+                return note_upload
+
+            await self.async_uploader.discard_note_upload(note_upload.progress)
+
+            if not self.rules.skip_failed:
+                raise
+            return None
+
+        self._finish_upload(note_upload, upload_start, page_id)
+
+        return None
+
+    def _start_upload_attempt(self, note_upload: NoteUpload) -> float:
+        note_upload.attempt += 1
+
+        self.done_notes.mark_uploading(note_upload.note)
+
+        return time.monotonic()
+
+    def _is_upload_retried(self, note_upload: NoteUpload, upload_start, error) -> bool:
+        note = note_upload.note
+
+        note_upload.duration += time.monotonic() - upload_start
+        logger.debug(f"Upload error: {error}", exc_info=error)
+
+        self.done_notes.mark_failed(
+            note,
+            str(error.__cause__ or error),
+            note_upload.duration,
+            note_upload.progress.to_dict(),
+        )
+
+        if note_upload.attempt != self.rules.retry:
+            run_stats.incr("note_retries")
+            return True
+
+        run_stats.incr("notes_failed")
+        logger.error(f"Failed to upload note '{note.title}' to Notion!")
+
+        return False
+
+    def _finish_upload(self, note_upload: NoteUpload, upload_start, page_id):
+        note = note_upload.note
+
+        note_upload.duration += time.monotonic() - upload_start
+        self.done_notes.mark_done(note, page_id, note_upload.duration)
+        run_stats.incr("notes_done")
+
+        stage_profiler.checkpoint("upload", note.title)
+
+    def _upload_or_sync_note(self, note_upload: NoteUpload):
+        if note_upload.page_id:
+            return self._sync_note(
+                self.notebook_root,
+                note_upload.note,
+                note_upload.note_blocks,
+                note_upload.page_id,
+                note_upload.progress,
+            )
+
+        return self._upload_note(
+            self.notebook_root,
+            note_upload.note,
+            note_upload.note_blocks,
+            note_upload.progress,
+        )
+
+    async def _upload_or_sync_note_async(self, note_upload: NoteUpload):
+        if note_upload.page_id:
+            return await self.async_uploader.sync_note(
+                self.notebook_root,
+                note_upload.note,
+                note_upload.payloads,
+                note_upload.resources,
+                note_upload.page_id,
+                note_upload.progress,
+            )
+
+        return await self.async_uploader.upload_note(
+            self.notebook_root,
+            note_upload.note,
+            note_upload.payloads,
+            note_upload.resources,
+            note_upload.progress,
+        )
+
+    def _get_note_payloads(self, note, note_blocks):
+        return convert_note_blocks(note, note_blocks), collect_block_resources(
+            note_blocks
+        )
 
     def _parse_note(self, note):
         try:
@@ -172,14 +563,19 @@ class EnexUploader(object):
             get_func, error_message, self.import_root, notebook_title
         )
 
-    def _upload_note(self, notebook_root, note, note_blocks):
-        self._attempt_upload(
-            upload_note,
-            f"Failed to upload note '{note.title}' to Notion",
+    def _upload_note(self, notebook_root, note, note_blocks, progress):
+        return upload_note(
+            notebook_root, note, note_blocks, self.rules.keep_failed, progress
+        )
+
+    def _sync_note(self, notebook_root, note, note_blocks, page_id, progress):
+        return sync_note(
             notebook_root,
             note,
             note_blocks,
             self.rules.keep_failed,
+            page_id,
+            progress,
         )
 
     def _attempt_upload(self, upload_func, error_message, *args, **kwargs):
@@ -194,3 +590,22 @@ class EnexUploader(object):
                     raise
 
                 logger.warning(f"{error_message}! Retrying...")
+
+
+@asynccontextmanager
+async def _note_slot(semaphore: asyncio.Semaphore, track: str):
+    """Hold one of the upload slots, timing the wait for it"""
+
+    run_stats.add_gauge("notes_waiting", 1)
+    try:
+        with run_stats.timer("note_slot_wait", track=track):
+            await semaphore.acquire()
+    finally:
+        run_stats.add_gauge("notes_waiting", -1)
+
+    run_stats.add_gauge("notes_uploading", 1)
+    try:
+        yield
+    finally:
+        semaphore.release()
+        run_stats.add_gauge("notes_uploading", -1)
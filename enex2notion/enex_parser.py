@@ -15,9 +15,12 @@ from enex2notion.enex_parser_xml import (
     iter_xml_elements_as_dict,
 )
 from enex2notion.enex_types import EvernoteNote, EvernoteResource
+from enex2notion.utils_stats import run_stats
 
 logger = logging.getLogger(__name__)
 
+_NOTES_END = object()
+
 
 def count_notes(enex_file: Path) -> int:
     return sum(
@@ -31,7 +34,19 @@ def _log_xml_errors(xml_file: Path, errors):
 
 
 def iter_notes(enex_file: Path) -> Iterator[EvernoteNote]:
-    yield from (_process_note(e) for e in iter_xml_elements_as_dict(enex_file, "note"))
+    notes_raw = iter_xml_elements_as_dict(enex_file, "note")
+
+    while True:
+        with run_stats.timer("xml_parse"):
+            note_raw = next(notes_raw, _NOTES_END)
+
+        if note_raw is _NOTES_END:
+            return
+
+        with run_stats.timer("note_build"):
+            note = _process_note(note_raw)
+
+        yield note
 
 
 def _process_note(note_raw: dict) -> EvernoteNote:
@@ -58,6 +73,7 @@ def _process_note(note_raw: dict) -> EvernoteNote:
         url=note_raw["note-attributes"].get("source-url") or "",
         is_webclip=_is_webclip(note_raw),
         resources=_parse_resources(note_raw),
+        guid=note_raw.get("guid") or "",
     )
 
 
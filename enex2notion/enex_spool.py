@@ -0,0 +1,183 @@
+"""Offline spool of ready-to-send Notion API payloads.
+
+Layout of a spool directory:
+
+    SPOOL_DIR/
+      <notebook>/
+        00001-<note_hash>.ndjson
+        files/
+          <md5>
+
+Each note file is NDJSON. The first line holds the page record
+({"page": {...}}), every following line is a top-level block payload
+as produced by build_block_payloads. Attachments are stored once per notebook
+under their md5 and referenced by the "file" entry of the payloads.
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Set
+
+from dateutil.parser import isoparse
+
+from enex2notion.enex_types import EvernoteNote, EvernoteResource
+
+logger = logging.getLogger(__name__)
+
+SPOOL_FILES_DIR = "files"
+SPOOL_NOTE_SUFFIX = ".ndjson"
+
+
+@dataclass
+class SpoolNote(object):
+    path: Path
+    note: EvernoteNote
+
+
+def write_spool_note(
+    notebook_dir: Path,
+    note_idx: int,
+    note: EvernoteNote,
+    payloads: List[Dict[str, Any]],
+    resources: Mapping[str, EvernoteResource],
+) -> Path:
+    files_dir = notebook_dir / SPOOL_FILES_DIR
+    files_dir.mkdir(parents=True, exist_ok=True)
+
+    for resource in resources.values():
+        _write_spool_file(files_dir, resource)
+
+    note_path = notebook_dir / f"{note_idx:05d}-{note.note_hash}{SPOOL_NOTE_SUFFIX}"
+
+    lines = [json.dumps({"page": _note_to_record(note, note_idx)})]
+    lines.extend(json.dumps(p, ensure_ascii=False) for p in payloads)
+
+    _write_atomic(note_path, "\n".join(lines).encode("utf-8") + b"\n")
+
+    return note_path
+
+
+def get_spooled_hashes(notebook_dir: Path) -> Set[str]:
+    return {p.note.note_hash for p in iter_spool_notes(notebook_dir)}
+
+
+def iter_spool_notes(notebook_dir: Path) -> Iterator[SpoolNote]:
+    for note_path in sorted(notebook_dir.glob(f"*{SPOOL_NOTE_SUFFIX}")):
+        with open(note_path, "r", encoding="utf-8") as f:
+            page_record = json.loads(f.readline())["page"]
+
+        yield SpoolNote(path=note_path, note=_record_to_note(page_record))
+
+
+def read_spool_payloads(note_path: Path) -> List[Dict[str, Any]]:
+    with open(note_path, "r", encoding="utf-8") as f:
+        next(f)  # page record
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def count_spool_notes(notebook_dir: Path) -> int:
+    return sum(1 for _ in notebook_dir.glob(f"*{SPOOL_NOTE_SUFFIX}"))
+
+
+def is_spool_notebook(path: Path) -> bool:
+    return path.is_dir() and any(path.glob(f"*{SPOOL_NOTE_SUFFIX}"))
+
+
+def find_spool_notebooks(spool_dir: Path) -> List[Path]:
+    if is_spool_notebook(spool_dir):
+        return [spool_dir]
+
+    return [p for p in sorted(spool_dir.iterdir()) if is_spool_notebook(p)]
+
+
+class SpoolFiles(Mapping):
+    """Attachments referenced by the payloads, read from disk on access"""
+
+    def __init__(self, notebook_dir: Path, payloads: List[Dict[str, Any]]):
+        self.files_dir = notebook_dir / SPOOL_FILES_DIR
+        self.file_infos = {}
+
+        _collect_file_infos(payloads, self.file_infos)
+
+    def __getitem__(self, md5: str) -> EvernoteResource:
+        file_info = self.file_infos[md5]
+
+        try:
+            data_bin = (self.files_dir / md5).read_bytes()
+        except FileNotFoundError:
+            logger.warning(f"Spooled file '{file_info['file_name']}' is missing")
+            raise KeyError(md5)
+
+        return EvernoteResource(
+            data_bin=data_bin,
+            size=len(data_bin),
+            md5=md5,
+            mime=file_info["mime"],
+            file_name=file_info["file_name"],
+        )
+
+    def __iter__(self):
+        return iter(self.file_infos)
+
+    def __len__(self):
+        return len(self.file_infos)
+
+
+def _collect_file_infos(payloads, file_infos):
+    for payload in payloads:
+        if "file" in payload:
+            file_infos[payload["file"]["md5"]] = payload["file"]
+
+        _collect_file_infos(payload.get("children", []), file_infos)
+
+
+def _write_spool_file(files_dir: Path, resource: EvernoteResource):
+    file_path = files_dir / resource.md5
+
+    if file_path.exists():
+        return
+
+    _write_atomic(file_path, resource.data_bin)
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+
+    os.replace(tmp_path, path)
+
+
+def _note_to_record(note: EvernoteNote, note_idx: int) -> Dict[str, Any]:
+    return {
+        "index": note_idx,
+        "note_hash": note.note_hash,
+        "title": note.title,
+        "created": note.created.isoformat(),
+        "updated": note.updated.isoformat(),
+        "tags": note.tags,
+        "author": note.author,
+        "url": note.url,
+        "is_webclip": note.is_webclip,
+        "guid": note.guid,
+    }
+
+
+def _record_to_note(page_record: Dict[str, Any]) -> EvernoteNote:
+    return EvernoteNote(
+        title=page_record["title"],
+        created=isoparse(page_record["created"]),
+        updated=isoparse(page_record["updated"]),
+        content="",
+        tags=page_record.get("tags") or [],
+        author=page_record.get("author") or "",
+        url=page_record.get("url") or "",
+        is_webclip=page_record.get("is_webclip", False),
+        resources=[],
+        guid=page_record.get("guid") or "",
+        _note_hash=page_record["note_hash"],
+    )
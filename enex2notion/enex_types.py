@@ -24,6 +24,7 @@ class EvernoteNote(object):
     url: str
     is_webclip: bool
     resources: List[EvernoteResource]
+    guid: str = ""
     _note_hash: str = None
 
     def resource_by_md5(self, md5):
@@ -32,6 +33,18 @@ class EvernoteNote(object):
                 return resource
         return None
 
+    @property
+    def note_id(self):
+        """Identity that survives note edits, unlike note_hash"""
+        if self.guid:
+            return self.guid
+
+        s1_hash = hashlib.sha1()
+        s1_hash.update(self.title.encode("utf-8"))
+        s1_hash.update(self.created.isoformat().encode("utf-8"))
+
+        return s1_hash.hexdigest()
+
     @property
     def note_hash(self):
         if self._note_hash is None:
@@ -1,249 +1,449 @@
 import logging
-import threading
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
 
 from notion_client.errors import APIResponseError
 from tqdm import tqdm
 
 from enex2notion.enex_types import EvernoteNote
-from enex2notion.enex_uploader_block import upload_blocks_batch
+from enex2notion.enex_uploader_block import (
+    build_block_payloads,
+    collect_block_resources,
+    upload_payloads_calls,
+)
+from enex2notion.enex_uploader_calls import NotionCall, NotionCalls, run_calls
 from enex2notion.utils_exceptions import NoteUploadFailException
+from enex2notion.utils_profile import stage_profiler
 
 logger = logging.getLogger(__name__)
 
 PROGRESS_BAR_WIDTH = 80
 
-# Global lock for page creation to prevent conflicts on parent pages
-_page_creation_lock = threading.Lock()
+UNFINISHED_SUFFIX = " [UNFINISHED UPLOAD]"
 
 
-def upload_note(root, note: EvernoteNote, note_blocks, keep_failed):
+@dataclass
+class UploadProgress(object):
+    """How far a note upload got, lets a retry continue on the same page"""
+
+    page: Optional[dict] = None
+    page_created: bool = False
+    payloads_total: int = 0
+    payloads_done: int = 0
+    blocks_done: int = 0
+
+    @classmethod
+    def from_dict(cls, progress: dict) -> "UploadProgress":
+        return cls(
+            page={"id": progress["page_id"]},
+            page_created=progress["page_created"],
+            payloads_total=progress["payloads_total"],
+            payloads_done=progress["payloads_done"],
+            blocks_done=progress["blocks_done"],
+        )
+
+    def to_dict(self) -> Optional[dict]:
+        """Progress to keep in the state store, None if no page was started"""
+
+        if self.page is None:
+            return None
+
+        return {
+            "page_id": self.page["id"],
+            "page_created": self.page_created,
+            "payloads_total": self.payloads_total,
+            "payloads_done": self.payloads_done,
+            "blocks_done": self.blocks_done,
+        }
+
+    def reset(self):
+        self.page = None
+        self.page_created = False
+        self.payloads_total = 0
+        self.payloads_done = 0
+        self.blocks_done = 0
+
+
+def upload_note(root, note: EvernoteNote, note_blocks, keep_failed, progress=None):
+    try:
+        return run_calls(
+            root["_client"],
+            upload_note_calls(
+                root,
+                note,
+                convert_note_blocks(note, note_blocks),
+                collect_block_resources(note_blocks),
+                keep_failed,
+                progress,
+            ),
+        )
+    except Exception as e:
+        raise NoteUploadFailException from e
+
+
+def upload_note_payloads(
+    root, note: EvernoteNote, payloads, resources, keep_failed, progress=None
+):
+    try:
+        return run_calls(
+            root["_client"],
+            upload_note_calls(root, note, payloads, resources, keep_failed, progress),
+        )
+    except Exception as e:
+        raise NoteUploadFailException from e
+
+
+def sync_note(
+    root, note: EvernoteNote, note_blocks, keep_failed, page_id, progress=None
+):
+    try:
+        return run_calls(
+            root["_client"],
+            sync_note_calls(
+                root,
+                note,
+                convert_note_blocks(note, note_blocks),
+                collect_block_resources(note_blocks),
+                keep_failed,
+                page_id,
+                progress,
+            ),
+        )
+    except Exception as e:
+        raise NoteUploadFailException from e
+
+
+def sync_note_payloads(
+    root, note: EvernoteNote, payloads, resources, keep_failed, page_id, progress=None
+):
     try:
-        _upload_note(root, note, note_blocks, keep_failed)
+        return run_calls(
+            root["_client"],
+            sync_note_calls(
+                root, note, payloads, resources, keep_failed, page_id, progress
+            ),
+        )
     except Exception as e:
         raise NoteUploadFailException from e
 
 
-def _upload_note(root, note: EvernoteNote, note_blocks, keep_failed):
+def discard_note_upload(root, progress: UploadProgress, keep_failed):
+    """Remove page left by an upload that won't be retried anymore."""
+    run_calls(root["_client"], discard_note_upload_calls(progress, keep_failed))
+
+
+def convert_note_blocks(note: EvernoteNote, note_blocks):
+    payloads = build_block_payloads(note_blocks)
+
+    stage_profiler.checkpoint("conversion", note.title)
+
+    return payloads
+
+
+def upload_note_calls(
+    root, note: EvernoteNote, payloads, resources, keep_failed, progress=None
+) -> NotionCalls:
+    """Note upload steps, shared by both upload engines"""
+
+    # Without progress the caller won't retry, so partial page is removed right away
+    is_retried = progress is not None
+    if progress is None:
+        progress = UploadProgress()
+
+    new_page = None
+    if progress.page is not None:
+        new_page = yield from _resume_page(note, payloads, progress)
+
+    if new_page is None:
+        new_page = yield from _get_note_page(root, note)
+
+        progress.page = new_page
+        progress.page_created = True
+
+    try:
+        yield from _upload_note_blocks(new_page, payloads, resources, progress)
+    except APIResponseError:
+        if not keep_failed and not is_retried:
+            yield from _delete_page(new_page)
+        raise
+
+    # Set proper name after everything is uploaded
+    yield from _update_page_title(new_page, note.title)
+
+    return new_page["id"]
+
+
+def sync_note_calls(
+    root, note: EvernoteNote, payloads, resources, keep_failed, page_id, progress=None
+) -> NotionCalls:
+    """Replace content of the page uploaded for the previous version of the note."""
+    if progress is None:
+        progress = UploadProgress()
+
+    page = None
+    if progress.page is not None:
+        page = yield from _resume_page(note, payloads, progress)
+
+    if page is None:
+        page = yield from _get_synced_page(page_id)
+
+        if page is None:
+            logger.info(f"Page for note '{note.title}' is gone, uploading it again")
+            return (
+                yield from upload_note_calls(
+                    root, note, payloads, resources, keep_failed, progress
+                )
+            )
+
+        # Existing page is never deleted on failure, mark it instead
+        yield from _update_page_title(page, f"{note.title}{UNFINISHED_SUFFIX}")
+        yield from _trim_page_blocks(page, 0)
+
+        progress.page = page
+
+    yield from _upload_note_blocks(page, payloads, resources, progress)
+
+    yield from _update_page_title(page, note.title)
+
+    return page["id"]
+
+
+def discard_note_upload_calls(progress: UploadProgress, keep_failed) -> NotionCalls:
+    if keep_failed or not progress.page_created:
+        return
+
+    try:
+        yield from _delete_page(progress.page)
+    except APIResponseError:
+        return
+
+
+def _get_synced_page(page_id) -> NotionCalls:
+    try:
+        page = yield NotionCall("pages.retrieve", {"page_id": page_id})
+    except APIResponseError as e:
+        if e.status == 404:
+            return None
+        raise
+
+    if page.get("archived") or page.get("in_trash"):
+        return None
+
+    return page
+
+
+def _get_note_page(root, note: EvernoteNote) -> NotionCalls:
     logger.debug(f"Looking for existing incomplete upload for note '{note.title}'")
-    
+
     # First, try to find existing "[UNFINISHED UPLOAD]" page
-    existing_page = _find_existing_unfinished_page(root, note)
-    
+    existing_page = yield from _find_existing_unfinished_page(root, note)
+
     if existing_page:
-        logger.info(f"Found existing incomplete upload for note '{note.title}', resuming...")
-        new_page = existing_page
-        
+        logger.info(
+            f"Found existing incomplete upload for note '{note.title}', resuming..."
+        )
+
         # Clear existing blocks from the page to avoid partial upload issues
         try:
-            _clear_page_blocks(new_page)
-            logger.debug(f"Cleared existing blocks from incomplete page for note '{note.title}'")
+            yield from _trim_page_blocks(existing_page, 0)
         except Exception as e:
-            logger.warning(f"Failed to clear existing blocks, will try to continue: {e}")
-    else:
-        logger.debug(f"Creating new page for note '{note.title}'")
-        new_page = _make_page(note, root)
+            logger.warning(
+                f"Failed to clear existing blocks, will try to continue: {e}"
+            )
 
-    try:
-        _upload_note_blocks(new_page, note_blocks)
-        
-    except APIResponseError:
-        if not keep_failed:
-            _delete_page(new_page)
-        raise
+        return existing_page
 
-    # Set proper name after everything is uploaded
-    _update_page_title(new_page, note.title)
-    _update_edit_time(new_page, note.updated)
+    logger.debug(f"Creating new page for note '{note.title}'")
+    return (yield from _make_page(note, root))
+
+
+def _resume_page(note: EvernoteNote, payloads, progress: UploadProgress) -> NotionCalls:
+    """Page to continue the upload on, None if the upload has to start over
+
+    Progress may come from a previous run, so the page is checked first.
+    """
+    if progress.payloads_total != len(payloads):
+        logger.info(f"Blocks of note '{note.title}' have changed, starting over")
+        progress.reset()
+        return None
+
+    page = yield from _get_synced_page(progress.page["id"])
+    if page is None:
+        logger.info(f"Page for note '{note.title}' is gone, starting over")
+        progress.reset()
+        return None
 
+    logger.info(
+        f"Resuming upload of note '{note.title}'"
+        f" after {progress.payloads_done} uploaded block(s)"
+    )
 
-def _find_existing_unfinished_page(root, note: EvernoteNote):
+    # Drop blocks of the request that failed midway (e.g. parent without children)
+    yield from _trim_page_blocks(page, progress.blocks_done)
+
+    progress.page = page
+
+    return page
+
+
+def _find_existing_unfinished_page(root, note: EvernoteNote) -> NotionCalls:
     """Find existing [UNFINISHED UPLOAD] page for this note."""
+    unfinished_title = f"{note.title}{UNFINISHED_SUFFIX}"
+
     try:
-        client = root.get("_client")
-        if not client:
-            return None
-        
-        # Search for pages with "[UNFINISHED UPLOAD]" in the title
-        unfinished_title = f"{note.title} [UNFINISHED UPLOAD]"
-        
-        search_result = client.search(
-            query=unfinished_title,
-            filter={
-                "value": "page", 
-                "property": "object"
-            }
+        search_result = yield NotionCall(
+            "search",
+            {
+                "query": unfinished_title,
+                "filter": {"value": "page", "property": "object"},
+            },
         )
-        
-        # Look for exact match
-        for result in search_result.get("results", []):
-            if result.get("object") == "page":
-                page_title = ""
-                if "properties" in result and "title" in result["properties"]:
-                    title_prop = result["properties"]["title"]
-                    if title_prop.get("type") == "title" and title_prop.get("title"):
-                        page_title = "".join([
-                            t.get("plain_text", "") for t in title_prop["title"]
-                        ])
-                
-                # Check if this is the exact unfinished page we're looking for
-                if page_title == unfinished_title:
-                    # Verify it's under the correct parent
-                    parent = result.get("parent", {})
-                    if parent.get("type") == "page_id" and parent.get("page_id") == root.get("id"):
-                        result["_client"] = client
-                        result["_note"] = note
-                        logger.debug(f"Found existing unfinished page: {page_title}")
-                        return result
-        
-        return None
-        
     except Exception as e:
         logger.warning(f"Failed to search for existing unfinished page: {e}")
         return None
 
+    for result in search_result.get("results", []):
+        if result.get("object") != "page":
+            continue
 
-def _clear_page_blocks(page):
-    """Clear all blocks from a page to prepare for re-upload."""
-    try:
-        client = page.get("_client")
-        if not client or not page.get("id"):
-            return
-        
-        # Get all blocks from the page
-        blocks_response = client.blocks.children.list(block_id=page["id"])
-        blocks = blocks_response.get("results", [])
-        
-        # Delete all blocks
-        for block in blocks:
-            try:
-                client.blocks.delete(block_id=block["id"])
-            except APIResponseError as e:
-                logger.warning(f"Failed to delete block {block.get('id', 'unknown')}: {e}")
-        
-        logger.debug(f"Cleared {len(blocks)} blocks from page")
-        
-    except Exception as e:
-        logger.warning(f"Failed to clear page blocks: {e}")
-        raise
+        # Verify it's under the correct parent
+        parent = result.get("parent", {})
+        is_root_child = (
+            parent.get("type") == "page_id" and parent.get("page_id") == root["id"]
+        )
 
+        if is_root_child and _get_page_title(result) == unfinished_title:
+            logger.debug(f"Found existing unfinished page: {unfinished_title}")
+            return result
 
-def _update_edit_time(page, date):
-    """Update the last edited time of a page using the modern API."""
-    try:
-        client = page.get("_client")
-        if client and page.get("id"):
-            # The modern API doesn't allow direct manipulation of last_edited_time
-            # This is handled automatically by Notion
-            pass
-    except Exception as e:
-        logger.warning(f"Could not update edit time: {e}")
-
-
-def _make_page(note, root):
-    """Create a new page using the modern API with synchronized page creation."""
-    # Use global lock to serialize page creation and prevent conflicts on parent page
-    with _page_creation_lock:
-        client = root.get("_client")
-        
-        if not client:
-            raise ValueError("No client available for page creation")
-        
-        # Handle the case where we need to create the root page first
-        if root.get("_needs_creation"):
-            # Create a new page at the top level
-            # For the modern API, we need to specify a parent
-            # We'll create it as a standalone page for now
-            tmp_name = f"{root.get('_title', 'Import Root')} [UNFINISHED UPLOAD]"
-            
-            # Since we can't create top-level pages directly, we need the user to 
-            # specify a parent page or database. For now, we'll raise an error with instructions.
-            raise ValueError(
-                "The modern Notion API requires a parent page or database to create new pages. "
-                "Please create a page in Notion, share it with your integration, and specify "
-                "it using the --pageid option."
-            )
-        
-        # Create a child page under the root
-        tmp_name = f"{note.title} [UNFINISHED UPLOAD]"
-        
-        page_data = {
-            "parent": {"page_id": root["id"]},
-            "properties": {
-                "title": {
-                    "title": [
-                        {
-                            "text": {
-                                "content": tmp_name
-                            }
-                        }
-                    ]
-                }
-            },
-            "children": []  # We'll add blocks later
-        }
-        
+    return None
+
+
+def _get_page_title(page) -> str:
+    title_prop = page.get("properties", {}).get("title", {})
+    if title_prop.get("type") != "title":
+        return ""
+
+    return "".join(t.get("plain_text", "") for t in title_prop.get("title", []))
+
+
+def _trim_page_blocks(page, keep_count) -> NotionCalls:
+    """Delete all page blocks after the first keep_count ones."""
+
+    # Get all blocks from the page, deleting while paging would shift the cursor
+    blocks = []
+    start_cursor = None
+    while True:
+        list_args = {"start_cursor": start_cursor} if start_cursor else {}
+        blocks_response = yield NotionCall(
+            "blocks.children.list", {"block_id": page["id"], **list_args}
+        )
+        blocks.extend(blocks_response.get("results", []))
+
+        if not blocks_response.get("has_more"):
+            break
+        start_cursor = blocks_response.get("next_cursor")
+
+    extra_blocks = blocks[keep_count:]
+
+    for block in extra_blocks:
         try:
-            logger.debug(f"Creating page for note '{note.title}' (with lock)")
-            new_page = client.pages.create(**page_data)
-            new_page["_client"] = client
-            new_page["_note"] = note
-            logger.debug(f"Successfully created page for note '{note.title}'")
-            return new_page
+            yield NotionCall("blocks.delete", {"block_id": block["id"]})
         except APIResponseError as e:
-            logger.error(f"Failed to create page: {e}")
-            raise
+            logger.warning(f"Failed to delete block {block.get('id', 'unknown')}: {e}")
+
+    logger.debug(f"Cleared {len(extra_blocks)} blocks from page")
+
 
+def _make_page(note: EvernoteNote, root) -> NotionCalls:
+    """Create the page for the note, page creation is serialized"""
+
+    # Since we can't create top-level pages directly, we need the user to
+    # specify a parent page or database.
+    if root.get("_needs_creation"):
+        raise ValueError(
+            "The modern Notion API requires a parent page or database"
+            " to create new pages. Please create a page in Notion, share it"
+            " with your integration, and specify it using the --pageid option."
+        )
+
+    logger.debug(f"Creating page for note '{note.title}' (with lock)")
 
-def _update_page_title(page, title):
-    """Update the page title using the modern API."""
     try:
-        client = page.get("_client")
-        if client and page.get("id"):
-            client.pages.update(
-                page_id=page["id"],
-                properties={
-                    "title": {
-                        "title": [
-                            {
-                                "text": {
-                                    "content": title
-                                }
-                            }
-                        ]
-                    }
-                }
-            )
-            logger.debug(f"Updated page title from '[UNFINISHED UPLOAD]' to '{title}'")
+        new_page = yield NotionCall(
+            "pages.create",
+            {
+                "parent": {"page_id": root["id"]},
+                "properties": _make_title_property(f"{note.title}{UNFINISHED_SUFFIX}"),
+                "children": [],
+            },
+            stage="page_create",
+            track=note.note_hash,
+            lock_stage="page_create_lock_wait",
+        )
+    except APIResponseError as e:
+        logger.error(f"Failed to create page: {e}")
+        raise
+
+    logger.debug(f"Successfully created page for note '{note.title}'")
+    return new_page
+
+
+def _update_page_title(page, title) -> NotionCalls:
+    try:
+        yield NotionCall(
+            "pages.update",
+            {"page_id": page["id"], "properties": _make_title_property(title)},
+            stage="page_rename",
+            track=page["id"],
+        )
     except APIResponseError as e:
         logger.warning(f"Could not update page title: {e}")
+        return
 
+    logger.debug(f"Updated page title from '[UNFINISHED UPLOAD]' to '{title}'")
 
-def _delete_page(page):
-    """Delete a page using the modern API with better error handling."""
+
+def _delete_page(page) -> NotionCalls:
+    """Archive the page, Notion's equivalent of deletion."""
     try:
-        client = page.get("_client")
-        if client and page.get("id"):
-            # Archive the page (Notion's equivalent of deletion)
-            client.pages.update(
-                page_id=page["id"],
-                archived=True
-            )
-            logger.debug(f"Successfully archived failed page")
+        yield NotionCall("pages.update", {"page_id": page["id"], "archived": True})
     except APIResponseError as e:
         logger.error(f"Failed to delete page: {e}")
         # Re-raise to ensure the caller knows deletion failed
         raise
 
+    logger.debug("Successfully archived failed page")
 
-def _upload_note_blocks(page, note_blocks):
+
+def _make_title_property(title):
+    return {"title": {"title": [{"text": {"content": title}}]}}
+
+
+def _upload_note_blocks(
+    page, payloads, resources, progress: UploadProgress
+) -> NotionCalls:
     """Upload blocks to an existing page using batched approach."""
-    logger.info(f"Uploading {len(note_blocks)} blocks using batched approach")
-    
+    progress.payloads_total = len(payloads)
+    payloads_left = payloads[progress.payloads_done :]
+
+    logger.info(f"Uploading {len(payloads_left)} blocks using batched approach")
+
     # Show progress with real-time updates as batches are uploaded
-    with tqdm(total=len(note_blocks), unit="block", leave=False, ncols=PROGRESS_BAR_WIDTH, desc="Uploading blocks") as pbar:
-        def progress_callback(num_processed):
-            pbar.update(num_processed)
-        
-        # Use sequential batched upload to avoid page conflicts
-        upload_blocks_batch(page, note_blocks, progress_callback)
+    with tqdm(
+        total=len(payloads),
+        initial=progress.payloads_done,
+        unit="block",
+        leave=False,
+        ncols=PROGRESS_BAR_WIDTH,
+        desc="Uploading blocks",
+    ) as pbar:
+
+        def progress_callback(payloads_count, blocks_count):
+            progress.payloads_done += payloads_count
+            progress.blocks_done += blocks_count
+            pbar.update(payloads_count)
+
+        yield from upload_payloads_calls(
+            page["id"], payloads_left, resources, progress_callback
+        )
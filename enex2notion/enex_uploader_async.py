@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Optional
+
+from notion_client import AsyncClient
+
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.enex_uploader import (
+    UploadProgress,
+    discard_note_upload_calls,
+    sync_note_calls,
+    upload_note_calls,
+)
+from enex2notion.enex_uploader_calls import (
+    NotionCall,
+    NotionCalls,
+    get_call_method,
+    get_call_timer,
+)
+from enex2notion.utils_exceptions import NoteUploadFailException
+from enex2notion.utils_stats import run_stats
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNoteUploader(object):
+    """Uploads note payloads with notion_client.AsyncClient
+
+    Drives the same upload steps as upload_note_payloads() and
+    sync_note_payloads(), only the requests are awaited on the event loop,
+    so the number of notes in flight is not bound to threads. Has to be
+    created and used inside one running event loop.
+    """
+
+    def __init__(self, client: AsyncClient, keep_failed: bool):
+        self.client = client
+        self.keep_failed = keep_failed
+
+        # Serialize calls with lock_stage, e.g. page creation
+        self._calls_lock = asyncio.Lock()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def upload_note(
+        self, root, note: EvernoteNote, payloads, resources, progress=None
+    ):
+        try:
+            return await self._run(
+                upload_note_calls(
+                    root, note, payloads, resources, self.keep_failed, progress
+                )
+            )
+        except Exception as e:
+            raise NoteUploadFailException from e
+
+    async def sync_note(
+        self, root, note: EvernoteNote, payloads, resources, page_id, progress=None
+    ):
+        try:
+            return await self._run(
+                sync_note_calls(
+                    root, note, payloads, resources, self.keep_failed, page_id, progress
+                )
+            )
+        except Exception as e:
+            raise NoteUploadFailException from e
+
+    async def discard_note_upload(self, progress: UploadProgress):
+        """Remove page left by an upload that won't be retried anymore."""
+        await self._run(discard_note_upload_calls(progress, self.keep_failed))
+
+    async def _run(self, calls: NotionCalls):
+        """run_calls() counterpart for the async client"""
+
+        response = None
+        error: Optional[Exception] = None
+
+        while True:
+            try:
+                call = calls.send(response) if error is None else calls.throw(error)
+            except StopIteration as stop:
+                return stop.value
+
+            try:
+                response, error = await self._send_call(call), None
+            except Exception as e:
+                response, error = None, e
+
+    async def _send_call(self, call: NotionCall):
+        method = get_call_method(self.client, call)
+
+        if call.lock_stage is None:
+            with get_call_timer(call, call.track):
+                return await method(**call.kwargs)
+
+        with run_stats.timer(call.lock_stage, track=call.track):
+            await self._calls_lock.acquire()
+
+        try:
+            with get_call_timer(call, call.track):
+                return await method(**call.kwargs)
+        finally:
+            self._calls_lock.release()
@@ -1,339 +1,255 @@
-import asyncio
-import io
 import logging
 import re
 import time
 from typing import Any, Dict, List, Optional
 
-import requests
 from notion_client.errors import APIResponseError
 
 from enex2notion.enex_types import EvernoteResource
+from enex2notion.enex_uploader_calls import NotionCall, NotionCalls, run_calls
 from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
 from enex2notion.notion_blocks.uploadable import NotionUploadableBlock
 from enex2notion.utils_rand_id import rand_id
 from enex2notion.utils_static import Rules
+from enex2notion.utils_stats import timed
 
 logger = logging.getLogger(__name__)
 
 # Notion API limit for batch block creation
 BATCH_LIMIT = 50
 
-# Concurrency control - stay under Notion's 3 rps average
-MAX_CONCURRENT_REQUESTS = 3
-_semaphore = None
+# Blocks of these types are always appended with a request of their own
+UNBATCHABLE_TYPES = frozenset(
+    ("image", "video", "audio", "file", "pdf", "table", "table_row")
+)
 
-def get_semaphore():
-    """Get or create the global semaphore for rate limiting."""
-    global _semaphore
-    if _semaphore is None:
-        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-    return _semaphore
+# Stands in for the file upload ID until the attachment is actually uploaded
+PENDING_FILE_UPLOAD = "pending-file-upload"
 
 
-async def upload_blocks_batch_async(page, blocks, progress_callback=None):
+def upload_blocks_batch(page, blocks, progress_callback=None):
     """
-    Upload blocks using batching optimization with async concurrency for speed.
+    Upload blocks using batching optimization for speed.
     
-    Groups simple leaf blocks into batches and uploads them concurrently while
-    respecting Notion's rate limits.
+    Groups simple leaf blocks into batches of up to 50 for single API calls,
+    while complex blocks (files, tables, nested blocks) use individual uploads.
     
     Args:
         page: Notion page object with client
         blocks: List of blocks to upload
-        progress_callback: Optional callback function to report progress
+        progress_callback: Optional callback function to report progress,
+            see upload_block_payloads
     """
-    client = page.get("_client")
-    if not client:
-        raise ValueError("No client available for block upload")
-    
-    # Group blocks into batches and individual uploads
-    batch_groups = []
-    individual_blocks = []
-    current_batch = []
-    
+    upload_block_payloads(
+        page,
+        build_block_payloads(blocks),
+        collect_block_resources(blocks),
+        progress_callback,
+    )
+
+
+@timed("block_conversion")
+def build_block_payloads(blocks) -> List[Dict[str, Any]]:
+    """
+    Convert parsed blocks into ready-to-send Notion API payloads.
+
+    Each payload is a JSON-serializable dict holding the API block under "block",
+    nested payloads under "children" and attachment info under "file" for blocks
+    that need their file uploaded before they can be appended.
+    """
+    payloads = []
+
     for block in blocks:
-        if _can_batch_block(block):
-            current_batch.append(block)
-            if len(current_batch) >= BATCH_LIMIT:
-                batch_groups.append(current_batch)
-                current_batch = []
+        if _needs_text_chunking(block):
+            logger.debug(
+                f"Block type '{block.type}' exceeds text limits,"
+                " chunking into multiple blocks"
+            )
+            chunked_blocks = _chunk_text_block(block)
+            chunked_blocks[-1].children = block.children
+
+            payloads.extend(_build_block_payload(b) for b in chunked_blocks)
         else:
-            # Flush current batch if any
-            if current_batch:
-                batch_groups.append(current_batch)
-                current_batch = []
-            individual_blocks.append(block)
-    
-    # Add final batch if any
-    if current_batch:
-        batch_groups.append(current_batch)
-    
-    # Create async tasks for batches and individual uploads
-    tasks = []
-    
-    # Add batch upload tasks
-    for batch in batch_groups:
-        task = asyncio.create_task(_upload_batch_async(page, batch, progress_callback))
-        tasks.append(task)
-    
-    # Add individual upload tasks
-    for block in individual_blocks:
-        task = asyncio.create_task(_upload_individual_async(page, block, progress_callback))
-        tasks.append(task)
-    
-    # Execute all tasks concurrently
-    try:
-        await asyncio.gather(*tasks)
-        total_blocks = sum(len(batch) for batch in batch_groups) + len(individual_blocks)
-        batched_blocks = sum(len(batch) for batch in batch_groups)
-        logger.info(f"Successfully uploaded {total_blocks} blocks concurrently (batched: {batched_blocks}, individual: {len(individual_blocks)})")
-    except Exception as e:
-        logger.error(f"Failed to upload blocks concurrently: {e}")
-        raise
+            payloads.append(_build_block_payload(block))
 
+    return payloads
 
-async def _upload_batch_async(page, batch_blocks, progress_callback=None):
-    """Upload a batch of blocks with rate limiting and retry logic."""
-    semaphore = get_semaphore()
-    
-    async with semaphore:
-        client = page.get("_client")
-        
-        # Convert blocks to API format
-        batch_data = []
-        for block in batch_blocks:
-            try:
-                block_data = _convert_block_to_api_format(block, None)
-                if _validate_block_data(block_data):
-                    batch_data.append(block_data)
-                else:
-                    logger.warning(f"Invalid block data for batch, skipping: {block.type}")
-            except Exception as e:
-                logger.warning(f"Failed to convert block for batch: {e}")
-        
-        if not batch_data:
-            return
-        
-        # Upload with retry logic
-        def api_call():
-            return client.blocks.children.append(
-                block_id=page["id"],
-                children=batch_data
-            )
-        
-        await _api_call_with_retry(
-            api_call,
-            f"batch of {len(batch_data)} blocks"
-        )
-        
-        if progress_callback:
-            progress_callback(len(batch_data))
 
+def _build_block_payload(block) -> Dict[str, Any]:
+    resource = _get_block_resource(block)
+    file_upload_id = PENDING_FILE_UPLOAD if resource is not None else None
 
-async def _upload_individual_async(page, block, progress_callback=None):
-    """Upload an individual block with rate limiting and retry logic."""
-    semaphore = get_semaphore()
-    
-    async with semaphore:
-        # Run the synchronous upload_block in a thread executor
-        # This ensures file uploads and complex logic still work without blocking the event loop
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, upload_block, page, block)
-            if progress_callback:
-                progress_callback(1)
-        except Exception as e:
-            logger.error(f"Failed to upload individual block: {e}")
-            raise
+    if block.type == "table":
+        payload = {"block": _convert_table_to_api_format(block, file_upload_id)}
+        children = []
+    else:
+        payload = {"block": _convert_block_to_api_format(block, file_upload_id)}
+        children = build_block_payloads(block.children)
+
+    if resource is not None:
+        payload["file"] = {
+            "md5": resource.md5,
+            "file_name": resource.file_name,
+            "mime": resource.mime,
+            "size": resource.size,
+        }
+
+    if children:
+        payload["children"] = children
+
+    return payload
+
+
+def collect_block_resources(blocks) -> Dict[str, EvernoteResource]:
+    """Map resource md5 to resource for every uploadable block in the tree."""
+    resources = {}
+
+    for block in blocks:
+        resource = _get_block_resource(block)
+        if resource is not None:
+            resources[resource.md5] = resource
+
+        resources.update(collect_block_resources(block.children))
 
+    return resources
 
-async def _api_call_with_retry(api_call, description, max_retries=5):
+
+def _get_block_resource(block) -> Optional[EvernoteResource]:
+    if isinstance(block, NotionUploadableBlock):
+        return block.resource
+    return None
+
+
+def plan_payload_requests(payloads) -> List[List[Dict[str, Any]]]:
     """
-    Execute an API call with exponential backoff retry logic.
-    
-    Handles rate limiting (429) responses and temporary failures.
-    Runs synchronous API calls in thread executor to avoid blocking event loop.
+    Group top-level payloads into append requests.
+
+    Consecutive batchable payloads share a request (up to BATCH_LIMIT),
+    everything else gets a request of its own.
     """
-    loop = asyncio.get_event_loop()
-    
-    for attempt in range(max_retries):
-        try:
-            # Run the synchronous API call in a thread executor
-            return await loop.run_in_executor(None, api_call)
-        except APIResponseError as e:
-            if e.status == 429:  # Rate limited
-                # Extract retry-after header if present
-                retry_after = getattr(e, 'retry_after', None) or 1
-                wait_time = min(retry_after * (2 ** attempt), 60)  # Cap at 60 seconds
-                
-                logger.debug(f"Rate limited for {description}, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(wait_time)
-                continue
-            elif e.status >= 500:  # Server error
-                wait_time = min(2 ** attempt, 30)  # Exponential backoff, cap at 30s
-                logger.debug(f"Server error for {description}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                # Client error, don't retry
-                logger.error(f"Client error for {description}: {e}")
-                raise
-        except Exception as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Max retries exceeded for {description}: {e}")
-                raise
-            
-            wait_time = min(2 ** attempt, 30)
-            logger.debug(f"Unexpected error for {description}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries}): {e}")
-            await asyncio.sleep(wait_time)
-    
-    raise Exception(f"Failed to complete {description} after {max_retries} attempts")
+    requests_plan = []
+    batch = []
 
+    for payload in payloads:
+        if is_payload_batchable(payload):
+            batch.append(payload)
+            if len(batch) >= BATCH_LIMIT:
+                requests_plan.append(batch)
+                batch = []
+            continue
 
-def upload_blocks_batch(page, blocks, progress_callback=None):
+        if batch:
+            requests_plan.append(batch)
+            batch = []
+
+        requests_plan.append([payload])
+
+    if batch:
+        requests_plan.append(batch)
+
+    return requests_plan
+
+
+def plan_payload_tree_requests(payloads) -> List[List[Dict[str, Any]]]:
     """
-    Upload blocks using batching optimization for speed.
-    
-    Groups simple leaf blocks into batches of up to 50 for single API calls,
-    while complex blocks (files, tables, nested blocks) use individual uploads.
-    
+    Group payloads into append requests, including requests for nested children.
+
+    Requests are listed in the order upload_block_payloads would send them.
+    """
+    requests_plan = []
+
+    for request_payloads in plan_payload_requests(payloads):
+        requests_plan.append(request_payloads)
+
+        for payload in request_payloads:
+            requests_plan.extend(
+                plan_payload_tree_requests(payload.get("children", []))
+            )
+
+    return requests_plan
+
+
+def is_payload_batchable(payload):
+    if payload.get("children") or payload.get("file"):
+        return False
+
+    if payload["block"].get("type") in UNBATCHABLE_TYPES:
+        return False
+
+    return validate_block_data(payload["block"])
+
+
+def upload_block_payloads(page, payloads, resources, progress_callback=None):
+    """
+    Upload prepared payloads to a page, batching leaf blocks together.
+
     Args:
         page: Notion page object with client
-        blocks: List of blocks to upload
-        progress_callback: Optional callback function to report progress (called with number of blocks processed)
+        payloads: Payloads produced by build_block_payloads
+        resources: Mapping of resource md5 to resource for payloads with files
+        progress_callback: Optional callback function to report progress
+            (called with number of top-level payloads processed and
+            number of blocks they added to the page)
+
+    Returns:
+        Number of blocks added to the page itself, it can be larger than
+        the number of payloads if children had to be moved to the page level
     """
     client = page.get("_client")
     if not client:
         raise ValueError("No client available for block upload")
-    
-    batch_queue = []
-    processed_count = 0
+
+    return run_calls(
+        client,
+        upload_payloads_calls(page["id"], payloads, resources, progress_callback),
+    )
+
+
+def upload_payloads_calls(
+    block_id, payloads, resources, progress_callback=None
+) -> NotionCalls:
+    """upload_block_payloads() steps, shared by both upload engines"""
+
     batched_count = 0
     individual_count = 0
-    
-    def flush_batch():
-        """Send accumulated batch blocks to Notion API."""
-        nonlocal processed_count, batched_count
-        if not batch_queue:
-            return
-        
-        batch_size = len(batch_queue)
-        logger.debug(f"Uploading batch of {batch_size} blocks")
-        try:
-            client.blocks.children.append(
-                block_id=page["id"],
-                children=batch_queue
-            )
-            logger.debug(f"Successfully uploaded batch of {batch_size} blocks")
-            processed_count += batch_size
-            batched_count += batch_size
-            if progress_callback:
-                progress_callback(batch_size)
-        except Exception as e:
-            logger.error(f"Failed to upload batch of {batch_size} blocks: {e}")
-            raise
-        finally:
-            batch_queue.clear()
-    
-    for block in blocks:
-        # Check if this block can be batched (simple leaf blocks only)
-        if _can_batch_block(block):
-            # Convert to API format and add to batch
+    parent_blocks_count = 0
+
+    for request_payloads in plan_payload_requests(payloads):
+        if is_payload_batchable(request_payloads[0]):
+            batch_size = len(request_payloads)
+            logger.debug(f"Uploading batch of {batch_size} blocks")
             try:
-                block_data = _convert_block_to_api_format(block, None)
-                if _validate_block_data(block_data):
-                    batch_queue.append(block_data)
-                    
-                    # If batch is full, send it
-                    if len(batch_queue) >= BATCH_LIMIT:
-                        flush_batch()
-                else:
-                    # If conversion failed, flush batch and use single upload
-                    flush_batch()
-                    upload_block(page, block)
-                    processed_count += 1
-                    individual_count += 1
-                    if progress_callback:
-                        progress_callback(1)
+                yield _append_call(block_id, [p["block"] for p in request_payloads])
             except Exception as e:
-                logger.warning(f"Failed to batch block, using single upload: {e}")
-                flush_batch()
-                upload_block(page, block)
-                processed_count += 1
-                individual_count += 1
-                if progress_callback:
-                    progress_callback(1)
+                logger.error(f"Failed to upload batch of {batch_size} blocks: {e}")
+                raise
+            logger.debug(f"Successfully uploaded batch of {batch_size} blocks")
+            batched_count += batch_size
+            request_blocks_count = batch_size
         else:
-            # Complex block - flush current batch and use single upload
-            flush_batch()
-            upload_block(page, block)
-            processed_count += 1
+            request_blocks_count = yield from _upload_payload(
+                block_id, request_payloads[0], resources
+            )
             individual_count += 1
-            if progress_callback:
-                progress_callback(1)
-    
-    # Send any remaining blocks in the batch
-    flush_batch()
-    
-    logger.info(f"Successfully uploaded {processed_count} blocks (batched: {batched_count}, individual: {individual_count})")
 
+        parent_blocks_count += request_blocks_count
 
-def _can_batch_block(block):
-    """
-    Check if a block can be safely batched.
-    
-    Only simple leaf blocks without children or complex requirements can be batched.
-    """
-    # Blocks with children need individual handling
-    if hasattr(block, 'children') and block.children:
-        return False
-    
-    # File/media blocks need special upload handling
-    if block.type in {"image", "video", "audio", "file", "pdf"}:
-        return False
-    
-    # Uploadable blocks with resources need file upload
-    if (isinstance(block, NotionUploadableBlock) and 
-        hasattr(block, 'resource') and 
-        block.resource is not None):
-        return False
-    
-    # Table blocks need special structure handling
-    if block.type in {"table", "table_row"}:
-        return False
-    
-    # Check if block needs text chunking
-    if _needs_text_chunking(block):
-        return False
-    
-    # All other blocks can be batched
-    return True
+        if progress_callback:
+            progress_callback(len(request_payloads), request_blocks_count)
+
+    logger.info(
+        f"Successfully uploaded {batched_count + individual_count} blocks"
+        f" (batched: {batched_count}, individual: {individual_count})"
+    )
+
+    return parent_blocks_count
 
 
 def upload_block(page, block):
     """Upload a block to a page using the modern Notion API."""
-    client = page.get("_client")
-    if not client:
-        raise ValueError("No client available for block upload")
-    
-    # Check if this block needs to be chunked due to text length
-    if _needs_text_chunking(block):
-        logger.info(f"Block type '{block.type}' exceeds text limits, chunking into multiple blocks")
-        chunked_blocks = _chunk_text_block(block)
-        
-        logger.debug(f"Created {len(chunked_blocks)} chunks from original block")
-        
-        # Upload each chunk as a separate block
-        for i, chunk_block in enumerate(chunked_blocks):
-            logger.debug(f"Uploading chunk {i+1}/{len(chunked_blocks)}")
-            _upload_single_block(page, chunk_block)
-        
-        logger.info(f"Successfully uploaded {len(chunked_blocks)} chunked blocks")
-        return
-    
-    # Regular single block upload
-    _upload_single_block(page, block)
+    upload_block_payloads(
+        page, build_block_payloads([block]), collect_block_resources([block])
+    )
 
 
 def _needs_text_chunking(block):
@@ -521,99 +437,133 @@ def _create_block_copy(original_block, new_properties):
     return new_block
 
 
-def _upload_single_block(page, block):
-    """Upload a single block to a page using the modern Notion API."""
-    client = page.get("_client")
-    if not client:
-        raise ValueError("No client available for block upload")
-    
-    # For file blocks with resources, upload the file first to get the upload ID
-    file_upload_id = None
-    if (isinstance(block, NotionUploadableBlock) and 
-        hasattr(block, 'resource') and 
-        block.resource is not None):
-        
-        logger.info(f"Pre-uploading file for block: {block.resource.file_name}")
-        auth_token = _extract_auth_token(client)
-        if auth_token:
-            file_upload_id = _try_direct_upload(auth_token, block.resource)
-            if file_upload_id:
-                logger.debug(f"Pre-upload successful, got file ID: {file_upload_id}")
-    
-    # Special handling for table blocks - they need to be created with their children
-    if block.type == "table":
-        _upload_table_with_children(page, block, file_upload_id)
-        return
-    
-    # Convert our internal block representation to Notion API format
-    block_data = _convert_block_to_api_format(block, file_upload_id)
-    
+def _upload_payload(block_id, payload, resources) -> NotionCalls:
+    """Upload a single payload, then its children under the created block.
+
+    Returns number of blocks added to block_id.
+    """
+    block_data = payload["block"]
+    if payload.get("file"):
+        resource = resources.get(payload["file"]["md5"])
+        file_upload_id = yield from _upload_file(resource)
+
+        block_data = attach_file_upload(block_data, resource, file_upload_id)
+
     # Debug logging to see what's being sent
-    logger.debug(f"Uploading block of type: {block.type}")
+    logger.debug(f"Uploading block of type: {block_data['type']}")
     logger.debug(f"Block data: {block_data}")
-    
+
     # Validate the block data before sending
-    if not _validate_block_data(block_data):
+    if not validate_block_data(block_data):
         logger.error(f"Invalid block data: {block_data}")
         raise ValueError("Invalid block data structure")
-    
+
     try:
-        # Append the block as a child to the page
-        response = client.blocks.children.append(
-            block_id=page["id"],
-            children=[block_data]
-        )
-        
-        # Get the created block ID for any file uploads or child blocks
-        if response.get("results"):
-            created_block = response["results"][0]
-            
-            # File upload is already handled for blocks with file_upload_id
-            # No additional file upload needed
-            
-            # Recursively upload child blocks with fallback to top level
-            for child_block in block.children:
-                try:
-                    # First, try to upload as a child block
-                    child_page = {
-                        "id": created_block["id"],
-                        "_client": client
-                    }
-                    upload_block(child_page, child_block)
-                except APIResponseError as e:
-                    # If child upload fails due to "does not support children", 
-                    # upload at the parent level instead
-                    if "does not support children" in str(e).lower():
-                        logger.debug(f"Block type '{created_block['type']}' doesn't support children, uploading child at parent level")
-                        upload_block(page, child_block)
-                    else:
-                        # Re-raise other errors
-                        raise
-                
+        response = yield _append_call(block_id, [block_data])
     except APIResponseError as e:
-        if "invalid image url" in str(e).lower() and block.type == "image":
-            logger.warning(
-                f"Invalid image URL '{block.attrs.get('url', '')}',"
-                " replacing with text block"
-            )
+        fallback_payload = get_invalid_image_fallback(e, block_data)
+        if fallback_payload is not None:
+            return (yield from _upload_payload(block_id, fallback_payload, resources))
 
-            fallback_text = f"Invalid image URL: {block.attrs.get('url', '')}"
-
-            new_block = NotionTextBlock(text_prop=TextProp(text=fallback_text))
-
-            upload_block(page, new_block)
-        else:
-            logger.error(f"Failed to upload block: {e}")
-            raise
+        logger.error(f"Failed to upload block: {e}")
+        raise
     except Exception as e:
         logger.error(f"Failed to upload block: {e}")
         raise
 
+    if payload.get("children") and response.get("results"):
+        children_count = yield from _upload_payload_children(
+            block_id, response["results"][0], payload["children"], resources
+        )
+        return 1 + children_count
 
-def _upload_table_with_children(page, table_block, file_upload_id=None):
-    """Upload a table block with its table_row children in a single request."""
-    client = page.get("_client")
-    
+    return 1
+
+
+def _upload_payload_children(
+    block_id, created_block, children, resources
+) -> NotionCalls:
+    """Upload child payloads with fallback to top level.
+
+    Returns number of blocks that ended up at the block_id level.
+    """
+    try:
+        yield from upload_payloads_calls(created_block["id"], children, resources)
+    except APIResponseError as e:
+        # If child upload fails due to "does not support children",
+        # upload at the parent level instead
+        if "does not support children" not in str(e).lower():
+            raise
+
+        logger.debug(
+            f"Block type '{created_block['type']}' doesn't support children,"
+            " uploading children at parent level"
+        )
+        return (yield from upload_payloads_calls(block_id, children, resources))
+
+    return 0
+
+
+def _append_call(block_id, blocks) -> NotionCall:
+    return NotionCall(
+        "blocks.children.append",
+        {"block_id": block_id, "children": blocks},
+        stage="block_append",
+        track=block_id,
+        span_args={"blocks": len(blocks)},
+    )
+
+
+def get_invalid_image_fallback(error, block_data) -> Optional[Dict[str, Any]]:
+    """Text payload to upload instead of an image Notion rejected for its URL."""
+    if "invalid image url" not in str(error).lower() or block_data["type"] != "image":
+        return None
+
+    image_url = block_data["image"].get("external", {}).get("url", "")
+
+    logger.warning(f"Invalid image URL '{image_url}', replacing with text block")
+
+    fallback_text = f"Invalid image URL: {image_url}"
+
+    return _build_block_payload(NotionTextBlock(text_prop=TextProp(text=fallback_text)))
+
+
+def attach_file_upload(block_data, resource, file_upload_id: Optional[str]):
+    """Point the block at the uploaded file
+
+    Turns the block into a paragraph if the upload failed.
+    """
+    block_type = block_data["type"]
+
+    if file_upload_id:
+        return {
+            **block_data,
+            block_type: {
+                "type": "file_upload",
+                "file_upload": {"id": file_upload_id}
+            },
+        }
+
+    file_name = resource.file_name if resource is not None else "unknown"
+    logger.warning(
+        f"No valid file upload for {block_type} block, converting to paragraph"
+    )
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {
+            "rich_text": [
+                {
+                    "type": "text",
+                    "text": {"content": f"[File upload failed: {file_name}]"},
+                }
+            ]
+        }
+    }
+
+
+def _convert_table_to_api_format(table_block, file_upload_id=None):
+    """Convert a table block with its table_row children for a single request."""
     # Convert table block
     table_data = _convert_block_to_api_format(table_block, file_upload_id)
     
@@ -641,21 +591,9 @@ def _upload_table_with_children(page, table_block, file_upload_id=None):
     # Add the table rows as children to the table block
     table_data[table_data["type"]]["children"] = table_row_children
     
-    logger.debug(f"Uploading table with {len(table_row_children)} rows as children")
-    logger.debug(f"Table data: {table_data}")
-    
-    try:
-        # Upload table with its rows as children in a single request
-        response = client.blocks.children.append(
-            block_id=page["id"],
-            children=[table_data]
-        )
-        
-        logger.debug("Table and rows uploaded successfully")
-        
-    except Exception as e:
-        logger.error(f"Failed to upload table with children: {e}")
-        raise
+    logger.debug(f"Prepared table with {len(table_row_children)} rows as children")
+
+    return table_data
 
 
 def _convert_block_to_api_format(block, file_upload_id=None):
@@ -916,24 +854,6 @@ def _get_notion_block_type(block_type):
     return type_mapping.get(block_type, "paragraph")
 
 
-def _extract_auth_token(client) -> Optional[str]:
-    """
-    Best-effort extraction of the integration token from a notion-client
-    instance.  Covers several SDK versions.
-    """
-    # 1. Public attribute on recent SDKs
-    token = getattr(client, "auth", None)
-    # 2. Private attributes used by older versions
-    token = token or getattr(client, "_token", None) or getattr(client, "_auth", None) or getattr(client, "token", None)
-
-    # 3. Fall back to the underlying requests.Session headers
-    if not token and hasattr(client, "_session"):
-        auth_header = client._session.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header[len("Bearer "):]
-    return token
-
-
 def _attach_file_to_block(client, block, file_upload_id: str) -> None:
     block_type = block.get("type")
     if block_type not in {"image", "video", "audio", "file", "pdf"}:
@@ -965,17 +885,8 @@ def _upload_file_to_block(client, block, resource: EvernoteResource):
             logger.info("Files larger than 20MB require multi-part upload which is not yet implemented")
             return
         
-        # Fetch the integration token (several SDK versions hide it differently)
-        auth_token = _extract_auth_token(client)
-        
-        if not auth_token:
-            logger.error("Unable to access auth token from Notion client")
-            logger.warning(f"File upload failed for {resource.file_name}")
-            logger.info(f"Leaving placeholder block for manual replacement in Notion")
-            return
-        
         # Perform the 3-step direct upload; receive the resulting file_upload_id
-        file_upload_id = _try_direct_upload(auth_token, resource)
+        file_upload_id = _try_direct_upload(client, resource)
         if file_upload_id:
             _attach_file_to_block(client, block, file_upload_id)
             logger.info("Successfully uploaded and attached %s", resource.file_name)
@@ -985,87 +896,76 @@ def _upload_file_to_block(client, block, resource: EvernoteResource):
         logger.error(f"Error processing file {resource.file_name}: {e}")
 
 
-def _try_direct_upload(auth_token: str, resource: EvernoteResource) -> Optional[str]:
+def _try_direct_upload(client, resource: EvernoteResource) -> Optional[str]:
     """Try to upload a file using Notion's Direct Upload API (3-step process)."""
+
+    return run_calls(client, _upload_file(resource))
+
+
+def _upload_file(resource: Optional[EvernoteResource]) -> NotionCalls:
+    """Direct Upload steps, returns file upload ID or None if upload failed.
+
+    Both requests go through the client's HTTP session, so they share
+    its base URL, auth headers and rate limiting with the rest of the upload.
+    """
+    if resource is None:
+        return None
+
+    logger.info(f"Pre-uploading file for block: {resource.file_name}")
+
     try:
         # Step 1: Create a file upload object
         logger.debug(f"Step 1: Creating file upload object for {resource.file_name}")
-        
-        # Create the authorization header
-        auth_header = f"Bearer {auth_token}"
-        headers = {
-            'Authorization': auth_header,
-            'Content-Type': 'application/json',
-            'Notion-Version': '2022-06-28'
-        }
-        
-        # Create file upload object
-        create_payload = {
-            "filename": resource.file_name,
-            "content_type": resource.mime
-        }
-        
-        create_response = requests.post(
-            'https://api.notion.com/v1/file_uploads',
-            json=create_payload,
-            headers=headers,
-            timeout=60
+
+        upload_object = yield NotionCall(
+            "request",
+            {
+                "path": "file_uploads",
+                "method": "POST",
+                "body": {
+                    "filename": resource.file_name,
+                    "content_type": resource.mime,
+                },
+            },
         )
-        
-        if create_response.status_code != 200:
-            logger.debug(f"File upload object creation failed: HTTP {create_response.status_code}")
-            return None
-            
-        upload_object = create_response.json()
-        file_upload_id = upload_object.get('id')
-        upload_url = upload_object.get('upload_url')
-        
+
+        file_upload_id = upload_object.get("id")
         if not file_upload_id:
             logger.debug("No file upload ID returned from creation")
             return None
-        
+
         logger.debug(f"Step 2: Sending file content for {resource.file_name}")
-        
+
         # Step 2: Send the file content using multipart/form-data
-        file_obj = io.BytesIO(resource.data_bin)
-        file_obj.name = resource.file_name
-        
-        files = {
-            'file': (resource.file_name, file_obj, resource.mime)
-        }
-        
-        # Remove Content-Type header for multipart request (requests will set it automatically)
-        send_headers = {
-            'Authorization': auth_header,
-            'Notion-Version': '2022-06-28'
-        }
-        
-        send_response = requests.post(
-            f'https://api.notion.com/v1/file_uploads/{file_upload_id}/send',
-            files=files,
-            headers=send_headers,
-            timeout=60
+        send_response = yield NotionCall(
+            "client.post",
+            {
+                "url": f"file_uploads/{file_upload_id}/send",
+                "files": {
+                    "file": (resource.file_name, resource.data_bin, resource.mime),
+                },
+            },
+            stage="file_upload",
+            track=resource.md5,
         )
-        
-        if send_response.status_code != 200:
-            logger.debug(f"File content upload failed: HTTP {send_response.status_code}")
-            return None
-        
-        upload_result = send_response.json()
-        if upload_result.get('status') != 'uploaded':
-            logger.debug(f"File upload status is not 'uploaded': {upload_result.get('status')}")
-            return None
-        
-        logger.debug(f"Step 3: Attaching file to block for {resource.file_name}")
-        
-        # ─── Step-3 will be executed by _attach_file_to_block ───
-        logger.debug("Direct upload successful, id=%s", file_upload_id)
-        return file_upload_id
-            
     except Exception as e:
         logger.debug(f"Direct Upload failed for {resource.file_name}: {e}")
-        
-    return None
+        return None
+
+    if send_response.status_code != 200:
+        logger.debug(f"File content upload failed: HTTP {send_response.status_code}")
+        return None
+
+    upload_result = send_response.json()
+    if upload_result.get("status") != "uploaded":
+        logger.debug(
+            f"File upload status is not 'uploaded': {upload_result.get('status')}"
+        )
+        return None
+
+    # Step 3 is executed by the block append / _attach_file_to_block
+    logger.debug("Direct upload successful, id=%s", file_upload_id)
+    return file_upload_id
 
 
 def _extract_file_id(url):
@@ -1089,7 +989,7 @@ def _sizeof_fmt(num, suffix='B'):
     return f"{num:.1f}Yi{suffix}"
 
 
-def _validate_block_data(block_data):
+def validate_block_data(block_data):
     """Validate that block data has required structure for Notion API."""
     if not isinstance(block_data, dict):
         return False
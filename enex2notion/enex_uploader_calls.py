@@ -0,0 +1,76 @@
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Any, Dict, Generator, Optional
+
+from enex2notion.utils_stats import run_stats
+
+# Generator of upload steps: yields requests, gets their responses, returns result
+NotionCalls = Generator["NotionCall", Any, Any]
+
+# Calls with lock_stage are sent one at a time, e.g. page creation,
+# to prevent conflicts on parent pages
+_calls_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class NotionCall(object):
+    """Notion API request yielded by upload steps
+
+    Upload steps are written once as generators and driven either by
+    run_calls() with notion_client.Client or by AsyncNoteUploader with
+    notion_client.AsyncClient. Responses are sent back into the generator,
+    request errors are thrown into it.
+
+    endpoint is the client method path, e.g. "blocks.children.append".
+    Requests with stage are timed, track is their async engine timeline.
+    """
+
+    endpoint: str
+    kwargs: Dict[str, Any]
+    stage: Optional[str] = None
+    track: Optional[str] = None
+    span_args: Dict[str, Any] = field(default_factory=dict)
+    lock_stage: Optional[str] = None
+
+
+def run_calls(client, calls: NotionCalls):
+    """Drive upload steps with the sync client, returns their result"""
+
+    response = None
+    error: Optional[Exception] = None
+
+    while True:
+        try:
+            call = calls.send(response) if error is None else calls.throw(error)
+        except StopIteration as stop:
+            return stop.value
+
+        try:
+            response, error = _send_call(client, call), None
+        except Exception as e:
+            response, error = None, e
+
+
+def get_call_method(client, call: NotionCall):
+    return reduce(getattr, call.endpoint.split("."), client)
+
+
+def get_call_timer(call: NotionCall, track: Optional[str] = None):
+    if call.stage is None:
+        return nullcontext()
+
+    return run_stats.timer(call.stage, track=track, **call.span_args)
+
+
+def _send_call(client, call: NotionCall):
+    method = get_call_method(client, call)
+
+    if call.lock_stage is None:
+        with get_call_timer(call):
+            return method(**call.kwargs)
+
+    with run_stats.locked(_calls_lock, call.lock_stage):
+        with get_call_timer(call):
+            return method(**call.kwargs)
@@ -54,24 +54,38 @@ def flatten_root(root: Tag):
     </en-note>              |
     """
 
-    while True:
-        divs_with_blocks = [
-            d
-            for d in root.find_all("div", recursive=False)
-            if _is_element_has_direct_blocks(d) and not _is_div_special_block(d)
-        ]
+    blocks = []
+    for child in root.contents:
+        blocks.extend(_flatten_div(child))
+
+    root.clear()
+    root.extend(b for b in blocks if not _is_empty_div(b))
+
+
+def _flatten_div(element: Tag) -> List[Tag]:
+    """Paragraphs of a div with nested blocks, expanded in a single walk
+
+    Uses an explicit stack, old notes can nest divs deeper than
+    the recursion limit.
+    """
+
+    blocks = []
+    stack = [element]
 
-        if not divs_with_blocks:
-            break
+    while stack:
+        block = stack.pop()
 
-        for div in divs_with_blocks:
-            div.insert_after(*_group_inline_tags(list(div.contents)))
+        if not _is_div_decomposable(block):
+            blocks.append(block)
+            continue
+
+        # Detached children are moved without searching for them in the parent
+        children = list(block.contents)
+        block.clear()
 
-            div.extract()
+        stack.extend(reversed(_group_inline_tags(children)))
 
-    empty_divs = [d for d in root.find_all("div", recursive=False) if not d.contents]
-    for d in empty_divs:
-        d.extract()
+    return blocks
 
 
 def _group_inline_tags(elements: List[Tag]):
@@ -107,6 +121,19 @@ def _make_block(elements: List[Tag]):
     return block
 
 
+def _is_div_decomposable(element):
+    return (
+        isinstance(element, Tag)
+        and element.name == "div"
+        and _is_element_has_direct_blocks(element)
+        and not _is_div_special_block(element)
+    )
+
+
+def _is_empty_div(element):
+    return isinstance(element, Tag) and element.name == "div" and not element.contents
+
+
 def _is_element_has_direct_blocks(element):
     return bool(element.find(BLOCK_TAGS, recursive=False))
 
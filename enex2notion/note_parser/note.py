@@ -10,6 +10,7 @@ from enex2notion.note_parser.note_type_based import parse_note_blocks_based_on_t
 from enex2notion.notion_blocks.minor import NotionBookmarkBlock
 from enex2notion.notion_blocks.text import NotionCalloutBlock, TextProp
 from enex2notion.utils_static import Rules
+from enex2notion.utils_stats import timed
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +20,7 @@ def parse_note(note: EvernoteNote, rules: Rules):
     if note_dom is None:
         return []
 
-    note_blocks = parse_note_blocks_based_on_type(
-        note, note_dom, rules.add_pdf_preview, rules.mode_webclips
-    )
+    note_blocks = parse_note_blocks_based_on_type(note, note_dom, rules)
 
     if rules.condense_lines_sparse:
         note_blocks = condense_lines(note_blocks, is_sparse=True)
@@ -41,6 +40,7 @@ def parse_note(note: EvernoteNote, rules: Rules):
     return note_blocks
 
 
+@timed("dom_parse")
 def _parse_note_dom(note: EvernoteNote) -> Optional[Tag]:
     # Using html.parser because Evernote enml2 is basically HTML
     note_dom = BeautifulSoup(note.content, "html.parser").find("en-note")
@@ -1,3 +1,4 @@
+import copy
 from typing import List
 
 from bs4 import Tag
@@ -5,17 +6,51 @@ from bs4 import Tag
 from enex2notion.enex_types import EvernoteNote
 from enex2notion.note_parser.blocks import parse_note_blocks
 from enex2notion.note_parser.webclip import parse_webclip
-from enex2notion.note_parser.webclip_pdf import parse_webclip_to_pdf
 from enex2notion.notion_blocks.base import NotionBaseBlock
+from enex2notion.utils_static import Rules
+from enex2notion.utils_stats import run_stats
 
 
 def parse_note_blocks_based_on_type(
-    note: EvernoteNote, note_dom: Tag, is_add_pdf_preview: bool, mode_webclips: str
+    note: EvernoteNote, note_dom: Tag, rules: Rules
 ) -> List[NotionBaseBlock]:
     if note.is_webclip:
-        if mode_webclips == "PDF":
-            return parse_webclip_to_pdf(note, note_dom, is_add_pdf_preview)
+        if rules.mode_webclips == "PDF":
+            # PyMuPDF and pdfkit are slow to import and needed only here
+            from enex2notion.note_parser.webclip_pdf import parse_webclip_to_pdf
+
+            return parse_webclip_to_pdf(note, note_dom, rules)
+
+        if rules.mode_webclips == "AUTO":
+            return _parse_webclip_auto(note, note_dom, rules)
 
         return parse_webclip(note_dom)
 
     return parse_note_blocks(note_dom)
+
+
+def _parse_webclip_auto(note: EvernoteNote, note_dom: Tag, rules: Rules):
+    """Keep webclip as text unless it takes too many requests to upload"""
+
+    # Text conversion modifies DOM, PDF needs the original one
+    note_blocks = parse_webclip(copy.copy(note_dom))
+
+    if _count_append_requests(note_blocks) <= rules.webclip_max_requests:
+        run_stats.incr("webclips_auto_txt")
+        return note_blocks
+
+    run_stats.incr("webclips_auto_pdf")
+
+    from enex2notion.note_parser.webclip_pdf import parse_webclip_to_pdf
+
+    return parse_webclip_to_pdf(note, note_dom, rules)
+
+
+def _count_append_requests(note_blocks) -> int:
+    # Pulls in Notion client, only needed in AUTO mode
+    from enex2notion.enex_uploader_block import (
+        build_block_payloads,
+        plan_payload_tree_requests,
+    )
+
+    return len(plan_payload_tree_requests(build_block_payloads(note_blocks)))
@@ -1,11 +1,16 @@
-from bs4 import Tag
+from typing import FrozenSet, List
+
+from bs4 import CData, NavigableString, PageElement, Tag
 
 from enex2notion.note_parser.string_extractor_properties import (
-    resolve_string_properties,
+    resolve_tag_properties,
 )
 from enex2notion.note_parser.string_extractor_split_tag import split_tag
 from enex2notion.notion_blocks.text import TextProp
 
+# Comments, scripts and such are not part of the text
+TEXT_TYPES = (NavigableString, CData)
+
 
 def extract_string(tag: Tag) -> TextProp:
     """Convert a block content into a string with properties
@@ -24,8 +29,8 @@ def extract_string(tag: Tag) -> TextProp:
     return TextProp(result_string, result_properties)
 
 
-def _extract_blocks(div_lines):
-    """Get parent stack for each string in the line and convert them to properties
+def _extract_blocks(div_lines: List[List[PageElement]]):
+    """Walk each line once, keeping formatting of the current parents on a stack
 
     IN: <div>some text <b>bold</b></div>
     OUT: [
@@ -35,34 +40,43 @@ def _extract_blocks(div_lines):
     """
 
     string_blocks = []
-    for div in div_lines:
-        _convert_newlines(div)
-        for string in div.strings:
-            parent_stack = _parents_upto(string, div)
-            string_properties = resolve_string_properties(parent_stack)
-
-            _add_string_block(string_blocks, string, string_properties)
+    for line_num, line in enumerate(div_lines):
+        _extract_line_blocks(string_blocks, line)
 
         # Add linebreak after each "line"
         # to render embedded lists in tables
         # skip last to avoid trailing linebreak
-        if div != div_lines[-1]:
-            _add_string_block(string_blocks, "\n", set())
+        if line_num != len(div_lines) - 1:
+            _add_string_block(string_blocks, "\n", frozenset())
     return string_blocks
 
 
-def _convert_newlines(element: Tag):
-    for br in element.find_all("br"):
-        br.replace_with("\n")
+def _extract_line_blocks(string_blocks, line: List[PageElement]):
+    stack = [(iter(line), frozenset())]
+
+    while stack:
+        children, properties = stack[-1]
+
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+
+        elif isinstance(child, Tag) and child.name == "br":
+            _add_string_block(string_blocks, "\n", properties)
+
+        elif isinstance(child, Tag):
+            stack.append((iter(child.contents), _push_properties(properties, child)))
+
+        elif type(child) in TEXT_TYPES:
+            _add_string_block(string_blocks, child, properties)
+
 
+def _push_properties(properties: FrozenSet[tuple], tag: Tag) -> FrozenSet[tuple]:
+    tag_properties = resolve_tag_properties(tag)
+    if not tag_properties:
+        return properties
 
-def _parents_upto(tag: Tag, upto: Tag):
-    parents = []
-    for p in tag.parents:
-        parents.append(p)
-        if p == upto:
-            break
-    return parents
+    return properties.union(tag_properties)
 
 
 def _add_string_block(string_blocks, string, string_properties):
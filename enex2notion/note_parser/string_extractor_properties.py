@@ -1,43 +1,85 @@
 import re
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
 
 from bs4 import Tag
 
 from enex2notion.utils_colors import extract_color
+from enex2notion.utils_stats import run_stats
 
+STYLE_CACHE_SIZE = 1024
 
-def resolve_string_properties(tags: List[Tag]):
-    properties = set()
 
-    tag_map = {
-        "b": lambda e: ("b",),
-        "i": lambda e: ("i",),
-        "u": lambda e: ("_",),
-        "s": lambda e: ("s",),
-        "span": _resolve_span,
-        "a": _resolve_link,
-    }
+class StyleCache(object):
+    """Bounded LRU cache of properties resolved from span styles
 
-    for tag in tags:
-        if tag_map.get(tag.name):
-            tag_property = tag_map[tag.name](tag)
+    Webclips repeat the same few style strings on thousands of spans.
+    Hits and misses are counted in run_stats.
+    """
 
-            if tag_property:
-                if isinstance(tag_property, list):
-                    properties.update(tag_property)
-                else:
-                    properties.add(tag_property)
+    def __init__(self, max_size: int):
+        self.max_size = max_size
 
-    return properties
+        self._lock = threading.Lock()
+        self._styles: "OrderedDict[str, Tuple[tuple, ...]]" = OrderedDict()
 
+    def get(self, style: str) -> Tuple[tuple, ...]:
+        with self._lock:
+            properties = self._styles.get(style)
+            if properties is not None:
+                self._styles.move_to_end(style)
+
+        if properties is not None:
+            run_stats.incr("style_cache_hits")
+            return properties
+
+        run_stats.incr("style_cache_misses")
+
+        properties = _resolve_style(style)
+
+        with self._lock:
+            self._styles[style] = properties
+            if len(self._styles) > self.max_size:
+                self._styles.popitem(last=False)
+
+        return properties
+
+    def clear(self):
+        with self._lock:
+            self._styles.clear()
+
+
+style_cache = StyleCache(STYLE_CACHE_SIZE)
+
+
+def resolve_tag_properties(tag: Tag) -> List[tuple]:
+    """Formatting that tag applies to all strings inside it"""
+
+    resolver = TAG_PROPERTIES.get(tag.name)
+    if resolver is None:
+        return []
+
+    tag_property = resolver(tag)
+
+    if not tag_property:
+        return []
+    if isinstance(tag_property, list):
+        return tag_property
+    return [tag_property]
 
-def _resolve_span(tag: Tag):
-    properties = []
 
+def _resolve_span(tag: Tag):
     style = tag.get("style")
     if not style:
         return []
 
+    return list(style_cache.get(style))
+
+
+def _resolve_style(style: str) -> Tuple[tuple, ...]:
+    properties = []
+
     color = extract_color(style)
     if color is not None:
         properties.append(("h", color))
@@ -48,7 +90,7 @@ def _resolve_span(tag: Tag):
     if re.match(r".*font-style:\s*italic", style):
         properties.append(("i",))
 
-    return properties
+    return tuple(properties)
 
 
 def _resolve_link(tag: Tag):
@@ -56,3 +98,13 @@ def _resolve_link(tag: Tag):
     if tag.get("href") and "evernote://" not in tag.get("href"):
         return "a", tag["href"]
     return None
+
+
+TAG_PROPERTIES = {
+    "b": lambda e: ("b",),
+    "i": lambda e: ("i",),
+    "u": lambda e: ("_",),
+    "s": lambda e: ("s",),
+    "span": _resolve_span,
+    "a": _resolve_link,
+}
@@ -1,4 +1,3 @@
-import copy
 from typing import List, Union
 
 from bs4 import NavigableString, PageElement, Tag
@@ -6,21 +5,23 @@ from bs4 import NavigableString, PageElement, Tag
 STANDALONES = ("h1", "h2", "h3", "div")
 
 
-def split_tag(tag: Tag) -> List[Tag]:
+def split_tag(tag: Tag) -> List[List[PageElement]]:
     """
     Element is either a single div itself or a collection of div or h1-3 "lines"
     it can also contain random inline strings, so we group them in separate lines
+
+    Lines are lists of the original elements, the tree is left untouched
     """
 
-    if tag.find_all(STANDALONES):
-        return _split_line(copy.copy(tag))
+    if tag.find(STANDALONES):
+        return _split_line(tag)
 
-    return [tag]
+    return [[tag]]
 
 
-def _split_line(element: Tag) -> List[Tag]:
+def _split_line(element: Tag) -> List[List[PageElement]]:
     blocks = []
-    group = []
+    group: List[PageElement] = []
 
     for sub in element.children:
         if _is_inline(sub):
@@ -30,13 +31,13 @@ def _split_line(element: Tag) -> List[Tag]:
 
         else:
             if group:
-                blocks.append(_make_block(group))
+                blocks.append(group)
                 group = []
 
-            blocks.append(sub)
+            blocks.append([sub])
 
     if group:
-        blocks.append(_make_block(group))
+        blocks.append(group)
 
     return blocks
 
@@ -47,14 +48,3 @@ def _is_whitespace(element: PageElement) -> bool:
 
 def _is_inline(element: Union[Tag, PageElement]) -> bool:
     return not isinstance(element, Tag) or element.name not in STANDALONES
-
-
-def _make_block(elements: List[Union[Tag, PageElement]]) -> Tag:
-    """Make a single block from a list of elements"""
-
-    block = Tag(name="div")
-
-    for element in elements:
-        block.append(copy.copy(element))
-
-    return block
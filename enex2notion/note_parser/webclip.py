@@ -4,24 +4,16 @@ from bs4 import Tag
 
 from enex2notion.note_parser.blocks import parse_note_blocks
 from enex2notion.note_parser.webclip_stages_cleanup import (
-    fix_redundant_img_src_quotes,
     remove_empty_blocks,
-    strip_paragraphs,
     wrap_orphans,
 )
-from enex2notion.note_parser.webclip_stages_convert import (
-    convert_inline_modifiers,
-    convert_newlines,
-    convert_paragraphs,
-    convert_subheaders,
-    convert_textless_links,
-)
 from enex2notion.note_parser.webclip_stages_flatten import flatten_root
-from enex2notion.note_parser.webclip_stages_preparation import (
-    remove_unprocessable,
-    unpack_block_elements,
-    unpack_tables,
+from enex2notion.note_parser.webclip_stages_fused import (
+    cleanup_elements,
+    convert_text_elements,
+    prepare_elements,
 )
+from enex2notion.utils_stats import run_stats
 
 logger = logging.getLogger(__name__)
 
@@ -59,26 +51,19 @@ def parse_webclip(note_dom: Tag):
     """
 
     processors = (
-        # Preparation
-        remove_unprocessable,
-        unpack_block_elements,
-        unpack_tables,
-        # Conversion
-        convert_paragraphs,
-        convert_subheaders,
-        convert_inline_modifiers,
-        convert_textless_links,
-        convert_newlines,
+        # Preparation and conversion, stages that commute share a single pass
+        prepare_elements,
+        convert_text_elements,
         # Flattening
         flatten_root,
         # Cleanup
         remove_empty_blocks,
         wrap_orphans,
-        strip_paragraphs,
-        fix_redundant_img_src_quotes,
+        cleanup_elements,
     )
 
     for processor in processors:
-        processor(note_dom)
+        with run_stats.timer(f"webclip.{processor.__name__}"):
+            processor(note_dom)
 
     return parse_note_blocks(note_dom)
@@ -1,38 +1,45 @@
 import hashlib
 import logging
+import mimetypes
 import re
-from base64 import b64encode
+import tempfile
+from pathlib import Path
 
-import fitz
-import pdfkit
 from bs4 import Tag
 
 from enex2notion.enex_types import EvernoteNote, EvernoteResource
+from enex2notion.note_parser.webclip_pdf_cache import (
+    cached_render,
+    get_render_cache,
+    get_render_key,
+)
+from enex2notion.note_parser.webclip_pdf_preview import PREVIEW_MIMES, render_preview
+from enex2notion.note_parser.webclip_pdf_render import render_pdf
 from enex2notion.notion_blocks.uploadable import NotionImageBlock, NotionPDFBlock
+from enex2notion.utils_static import Rules
 
 logger = logging.getLogger(__name__)
 
 
-def parse_webclip_to_pdf(note: EvernoteNote, note_dom: Tag, is_add_pdf_preview: bool):
-    _convert_local_images(note_dom, note)
-
-    _remove_remote_images(note_dom)
+def parse_webclip_to_pdf(note: EvernoteNote, note_dom: Tag, rules: Rules):
+    render_cache = get_render_cache(rules.render_cache, rules.render_cache_size)
 
     note_blocks = []
 
-    pdf_bin = pdfkit.from_string(
-        str(note_dom),
-        options={
-            "encoding": "UTF-8",
-            "margin-top": "0",
-            "margin-right": "0",
-            "margin-bottom": "0",
-            "margin-left": "0",
-        },
+    pdf_bin = cached_render(
+        render_cache,
+        get_render_key(note, "pdf"),
+        lambda: _render_webclip(note, note_dom, rules),
     )
 
-    if is_add_pdf_preview:
-        note_blocks.append(_get_pdf_preview(pdf_bin))
+    if rules.add_pdf_preview:
+        pix_format = rules.pdf_preview_format
+        pix_bin = cached_render(
+            render_cache,
+            get_render_key(note, pix_format, str(rules.pdf_preview_width)),
+            lambda: _get_pdf_first_page_png(pdf_bin, rules),
+        )
+        note_blocks.append(_get_pdf_preview(pix_bin, pix_format))
 
     pdf_md5 = hashlib.md5(pdf_bin).hexdigest()
 
@@ -52,9 +59,24 @@ def parse_webclip_to_pdf(note: EvernoteNote, note_dom: Tag, is_add_pdf_preview:
     return note_blocks
 
 
-def _get_pdf_preview(pdf_bin: bytes):
-    pix_bin = _get_pdf_first_page_png(pdf_bin)
+def _render_webclip(note: EvernoteNote, note_dom: Tag, rules: Rules) -> bytes:
+    with tempfile.TemporaryDirectory(prefix="enex2notion_") as images_dir:
+        images_path = Path(images_dir)
+
+        _convert_local_images(note_dom, note, images_path)
+
+        _remove_remote_images(note_dom, images_path)
+
+        # Images are read from disk, but only from this note's directory
+        return render_pdf(
+            str(note_dom),
+            rules.pdf_jobs,
+            rules.pdf_timeout,
+            options={"disable-local-file-access": "", "allow": images_dir},
+        )
+
 
+def _get_pdf_preview(pix_bin: bytes, pix_format: str):
     pix_md5 = hashlib.md5(pix_bin).hexdigest()
 
     return NotionImageBlock(
@@ -63,20 +85,19 @@ def _get_pdf_preview(pdf_bin: bytes):
             data_bin=pix_bin,
             size=len(pix_bin),
             md5=pix_md5,
-            mime="image/png",
-            file_name=f"{pix_md5}.png",
+            mime=PREVIEW_MIMES[pix_format],
+            file_name=f"{pix_md5}.{pix_format}",
         ),
     )
 
 
-def _get_pdf_first_page_png(pdf_bin: bytes):  # pragma: no cover
-    doc = fitz.open("pdf", pdf_bin)
-    page = doc.load_page(0)
-    pix = page.get_pixmap()
-    return pix.tobytes()
+def _get_pdf_first_page_png(pdf_bin: bytes, rules: Rules):  # pragma: no cover
+    return render_preview(
+        pdf_bin, rules.pdf_preview_width, rules.pdf_preview_format, rules.pdf_jobs
+    )
 
 
-def _convert_local_images(note_dom: Tag, note: EvernoteNote):
+def _convert_local_images(note_dom: Tag, note: EvernoteNote, images_path: Path):
     images = note_dom.find_all("en-media")
 
     for image in images:
@@ -87,9 +108,7 @@ def _convert_local_images(note_dom: Tag, note: EvernoteNote):
 
         img = Tag(name="img")
 
-        img["src"] = "data:{0};base64,{1}".format(
-            resource.mime, b64encode(resource.data_bin).decode("utf-8")
-        )
+        img["src"] = _write_image(resource, images_path).as_uri()
 
         if image.get("width"):
             img["width"] = image.get("width")
@@ -99,9 +118,22 @@ def _convert_local_images(note_dom: Tag, note: EvernoteNote):
         image.replace_with(img)
 
 
-def _remove_remote_images(note_dom: Tag):
+def _write_image(resource: EvernoteResource, images_path: Path) -> Path:
+    image_ext = mimetypes.guess_extension(resource.mime) or ""
+    image_file = images_path / f"{resource.md5}{image_ext}"
+
+    if not image_file.exists():
+        image_file.write_bytes(resource.data_bin)
+
+    return image_file
+
+
+def _remove_remote_images(note_dom: Tag, images_path: Path):
+    local_prefix = f"{images_path.as_uri()}/"
+
     for img in note_dom.find_all("img"):
-        if not img.get("src", "").startswith("data:"):
+        img_src = img.get("src", "")
+        if not (img_src.startswith("data:") or img_src.startswith(local_prefix)):
             img.decompose()
 
     elements_with_css_images = note_dom.find_all(style=re.compile(r"url\(http.*?\)"))
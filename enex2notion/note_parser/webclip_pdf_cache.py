@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.note_parser.webclip_pdf_render import PDF_OPTIONS
+from enex2notion.utils_stats import run_stats
+
+logger = logging.getLogger(__name__)
+
+# Bump when webclip HTML preparation or preview rendering changes
+RENDER_CACHE_VERSION = 2
+
+DEFAULT_RENDER_CACHE_SIZE = 1024
+
+# Eviction frees space down to this share of max_size
+LOW_WATER_RATIO = 0.9
+
+
+class RenderCache(object):
+    """On-disk LRU cache of rendered webclip PDFs and their previews
+
+    File modification time serves as last access time, so the order
+    survives between runs. Once the cache grows over max_size bytes, oldest
+    files are evicted down to LOW_WATER_RATIO of it. The directory is listed
+    only on start, sizes and access order are then tracked in memory.
+    Writes are atomic, several processes can share one cache directory,
+    files written by others are accounted for when they are read.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict(
+            (cache_file.name, f_stat.st_size)
+            for f_stat, cache_file in sorted(
+                self._iter_stats(), key=lambda f: f[0].st_mtime
+            )
+        )
+        self._size = sum(self._entries.values())
+
+    def get(self, key: str) -> Optional[bytes]:
+        cache_file = self.cache_dir / key
+
+        try:
+            data = cache_file.read_bytes()
+            os.utime(cache_file)
+        except FileNotFoundError:
+            run_stats.incr("render_cache_misses")
+            return None
+
+        run_stats.incr("render_cache_hits")
+
+        with self._lock:
+            self._track(key, len(data))
+
+        return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_size:
+            return
+
+        cache_file = self.cache_dir / key
+        tmp_file = cache_file.with_name(
+            f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, cache_file)
+
+        with self._lock:
+            self._track(key, len(data))
+            if self._size > self.max_size:
+                self._evict()
+
+    def _track(self, key, size):
+        self._size += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+
+    def _evict(self):
+        low_water = self.max_size * LOW_WATER_RATIO
+
+        while self._entries and self._size > low_water:
+            key, size = self._entries.popitem(last=False)
+
+            try:
+                (self.cache_dir / key).unlink()
+            except FileNotFoundError:
+                pass
+
+            self._size -= size
+            run_stats.incr("render_cache_evictions")
+
+    def _iter_stats(self):
+        for cache_file in self.cache_dir.iterdir():
+            if cache_file.suffix == ".tmp":
+                continue
+
+            try:
+                yield cache_file.stat(), cache_file
+            except FileNotFoundError:
+                continue
+
+
+_caches: Dict[Path, RenderCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_render_cache(
+    cache_dir: Optional[Path], max_size_mb: int = DEFAULT_RENDER_CACHE_SIZE
+) -> Optional[RenderCache]:
+    """Shared cache instance for cache_dir, None if caching is disabled"""
+
+    if cache_dir is None:
+        return None
+
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = RenderCache(cache_dir, max_size_mb * 2**20)
+
+        return _caches[cache_dir]
+
+
+def get_render_key(note: EvernoteNote, kind: str, *options: str) -> str:
+    pdf_options = json.dumps(PDF_OPTIONS, sort_keys=True)
+
+    s1_hash = hashlib.sha1()
+    for h in (note.note_hash, kind, str(RENDER_CACHE_VERSION), pdf_options, *options):
+        s1_hash.update(h.encode("utf-8"))
+
+    return f"{s1_hash.hexdigest()}.{kind}"
+
+
+def cached_render(
+    render_cache: Optional[RenderCache], key: str, render: Callable[[], bytes]
+) -> bytes:
+    if render_cache is None:
+        return render()
+
+    data = render_cache.get(key)
+    if data is None:
+        data = render()
+        render_cache.put(key, data)
+
+    return data
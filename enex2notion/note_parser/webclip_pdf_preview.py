@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import fitz
+
+from enex2notion.note_parser.webclip_pdf_render import get_render_jobs
+from enex2notion.utils_stats import run_stats
+
+PREVIEW_MIMES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+
+PREVIEW_JPEG_QUALITY = 85
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_jobs = 0
+_pool_lock = threading.Lock()
+
+
+def render_preview(pdf_bin: bytes, width: int, image_format: str, jobs: int = 0):
+    """Rasterize first PDF page in the shared process pool
+
+    Rasterization holds the GIL, so it runs in separate processes
+    to keep upload threads responsive.
+    """
+
+    global _pool, _pool_jobs  # noqa: WPS420
+
+    with _pool_lock:
+        pool_jobs = get_render_jobs(jobs)
+
+        if _pool is None or _pool_jobs != pool_jobs:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=pool_jobs)
+            _pool_jobs = pool_jobs
+
+        pool = _pool
+
+    with run_stats.timer("pdf_preview"):
+        return pool.submit(rasterize_first_page, pdf_bin, width, image_format).result()
+
+
+def rasterize_first_page(pdf_bin: bytes, width: int, image_format: str) -> bytes:
+    """First page as PNG or JPEG image, scaled to width pixels (0 = page size)"""
+
+    with fitz.open("pdf", pdf_bin) as doc:
+        page = doc.load_page(0)
+
+        zoom = width / page.rect.width if width else 1
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+    if image_format == "jpeg":
+        return pix.tobytes("jpeg", jpg_quality=PREVIEW_JPEG_QUALITY)
+
+    return pix.tobytes("png")
@@ -0,0 +1,156 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pdfkit
+from pdfkit.configuration import Configuration
+
+from enex2notion.utils_exceptions import PdfRenderException
+from enex2notion.utils_stats import run_stats
+
+logger = logging.getLogger(__name__)
+
+PDF_OPTIONS = {
+    "encoding": "UTF-8",
+    "margin-top": "0",
+    "margin-right": "0",
+    "margin-bottom": "0",
+    "margin-left": "0",
+}
+
+# Seconds one wkhtmltopdf process may take before it is killed
+DEFAULT_RENDER_TIMEOUT = 60
+
+
+class PdfRenderPool(object):
+    """Renders HTML to PDF in up to `jobs` wkhtmltopdf processes at once
+
+    Every render runs in its own process, so a crashed or hung wkhtmltopdf
+    fails only the note it was rendering. Renders over the limit wait in
+    the queue, the caller thread just waits for the result.
+    wkhtmltopdf is looked up once, on the first render.
+    """
+
+    def __init__(self, jobs: int = 0, timeout: float = DEFAULT_RENDER_TIMEOUT):
+        self.jobs = get_render_jobs(jobs)
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.jobs, thread_name_prefix="wkhtmltopdf"
+        )
+
+        self._configuration: Optional[Configuration] = None
+        self._configuration_lock = threading.Lock()
+
+    def render(self, html: str, options: Optional[dict] = None) -> bytes:
+        return self._executor.submit(self._render, html, options).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _render(self, html: str, options: Optional[dict]) -> bytes:
+        with run_stats.timer("pdf_render"):
+            return run_wkhtmltopdf(
+                html, self.timeout, options, self._get_configuration()
+            )
+
+    def _get_configuration(self):
+        with self._configuration_lock:
+            if self._configuration is None:
+                self._configuration = pdfkit.configuration()
+
+            return self._configuration
+
+
+_pool: Optional[PdfRenderPool] = None
+_pool_lock = threading.Lock()
+
+
+def render_pdf(
+    html: str,
+    jobs: int = 0,
+    timeout: float = DEFAULT_RENDER_TIMEOUT,
+    options: Optional[dict] = None,
+):
+    """Render HTML with the shared pool, recreated if its settings changed
+
+    options are added to PDF_OPTIONS for this render only.
+    """
+
+    global _pool  # noqa: WPS420
+
+    with _pool_lock:
+        pool_settings = (get_render_jobs(jobs), timeout)
+
+        if _pool is None or (_pool.jobs, _pool.timeout) != pool_settings:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = PdfRenderPool(jobs, timeout)
+
+        pool = _pool
+
+    return pool.render(html, options)
+
+
+def get_render_jobs(jobs: int) -> int:
+    """0 jobs means one per CPU"""
+
+    return jobs or os.cpu_count() or 1
+
+
+def get_worker_render_jobs(jobs: int, workers: int) -> int:
+    """Render jobs of one of `workers` processes, each of them has its own pool"""
+
+    return max(get_render_jobs(jobs) // workers, 1)
+
+
+def run_wkhtmltopdf(
+    html: str,
+    timeout: float,
+    options: Optional[dict] = None,
+    configuration: Optional[Configuration] = None,
+) -> bytes:
+    """configuration is resolved with pdfkit.configuration() if not given"""
+
+    render_options = {**PDF_OPTIONS, **(options or {})}
+
+    args = pdfkit.PDFKit(
+        html, "string", options=render_options, configuration=configuration
+    ).command()
+
+    try:
+        result = subprocess.run(
+            args,
+            input=html.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+            **_get_popen_options(),
+        )
+    except subprocess.TimeoutExpired:
+        raise PdfRenderException(f"wkhtmltopdf timed out after {timeout}s")
+
+    # Exit code 1 also means "some page resources failed", the PDF is still fine
+    if not result.stdout.startswith(b"%PDF"):
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise PdfRenderException(
+            f"wkhtmltopdf failed with exit code {result.returncode}: {stderr}"
+        )
+
+    return result.stdout
+
+
+def _get_popen_options():  # pragma: no cover
+    if sys.platform != "win32":
+        return {}
+
+    # Hide console window, same as pdfkit does
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+
+    return {"startupinfo": startupinfo}
@@ -24,8 +24,12 @@ def wrap_orphans(root: Tag):
 
 def fix_redundant_img_src_quotes(root: Tag):
     for e in root.find_all("img"):
-        if e.get("src"):
-            e["src"] = e["src"].strip("\"'")
+        fix_img_src_quotes(e)
+
+
+def fix_img_src_quotes(e: Tag):
+    if e.get("src"):
+        e["src"] = e["src"].strip("\"'")
 
 
 def _convert_to_paragraph(element):
@@ -38,11 +42,15 @@ def _convert_to_paragraph(element):
 
 def strip_paragraphs(root: Tag):
     for e in root.find_all("div"):
-        if not e.contents:
-            continue
+        strip_paragraph(e)
+
+
+def strip_paragraph(e: Tag):
+    if not e.contents:
+        return
 
-        _strip_left(e)
-        _strip_right(e)
+    _strip_left(e)
+    _strip_right(e)
 
 
 def _strip_right(e):
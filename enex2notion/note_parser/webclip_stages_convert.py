@@ -2,42 +2,47 @@ from bs4 import NavigableString, Tag
 
 from enex2notion.note_parser.webclip_stages_common import rename_tags
 
+PARAGRAPH_TAGS = ("address", "pre", "p", "blockquote", "dl", "dt")
+SUBHEADER_TAGS = ("h4", "h5", "h6")
+
+INLINE_MODIFIER_TAGS = {
+    "b": ("strong",),
+    "i": ("em", "cite", "dfn", "abbr", "acronym"),
+    "s": ("strike", "del"),
+}
 
-def convert_paragraphs(root: Tag):
-    paragraph_blocks = [
-        "address",
-        "pre",
-        "p",
-        "blockquote",
-        "dl",
-        "dt",
-    ]
 
-    rename_tags(root, paragraph_blocks, "div")
+def convert_paragraphs(root: Tag):
+    rename_tags(root, PARAGRAPH_TAGS, "div")
 
 
 def convert_subheaders(root: Tag):
-    rename_tags(root, ["h4", "h5", "h6"], "h3")
+    rename_tags(root, SUBHEADER_TAGS, "h3")
 
 
 def convert_inline_modifiers(root: Tag):
-    rename_tags(root, ["strong"], "b")
-
-    rename_tags(root, ["em", "cite", "dfn", "abbr", "acronym"], "i")
-
-    rename_tags(root, ["strike", "del"], "s")
+    for new_name, tags_to_rename in INLINE_MODIFIER_TAGS.items():
+        rename_tags(root, tags_to_rename, new_name)
 
 
 def convert_textless_links(root: Tag):
     for e in root.find_all("a"):
-        if not e.text.strip() and e.get("href"):
-            whitespace = (s for s in e.children if isinstance(s, NavigableString))
-            for w in whitespace:
-                w.extract()
-
-            e.append(e["href"])
+        convert_textless_link(e)
 
 
 def convert_newlines(root: Tag):
     for e in root.find_all("br"):
-        e.replace_with("\n")
+        convert_newline(e)
+
+
+def convert_textless_link(e: Tag):
+    if not e.text.strip() and e.get("href"):
+        whitespace = (s for s in e.children if isinstance(s, NavigableString))
+        for w in whitespace:
+            w.extract()
+
+        e.append(e["href"])
+
+
+def convert_newline(e: Tag):
+    e.replace_with("\n")
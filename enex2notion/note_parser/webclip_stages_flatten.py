@@ -1,72 +1,110 @@
 import copy
+from typing import List, Optional, Tuple
 
-from bs4 import Tag
+from bs4 import PageElement, Tag
 
 from enex2notion.note_parser.webclip_stages_common import BLOCK_TAGS, STANDALONE_TAGS
 
+FlatElement = Tuple[PageElement, Optional[List[PageElement]]]
+
 
 def flatten_root(root: Tag):
-    while True:
-        elements_with_blocks = [d for d in root.children if _is_element_decomposable(d)]
+    """Lift nested blocks to the root, splitting elements that contain them
 
-        if not elements_with_blocks:
-            break
+    <div><b>1<div>2</div>3</b></div> becomes <b>1</b><div>2</div><b>3</b>.
+    Each element is visited once, bottom up, so the cost doesn't depend
+    on how deep blocks are nested.
+    """
 
-        for element in elements_with_blocks:
-            _flatten_element(element)
+    blocks = []
+    for child in root.contents:
+        blocks.extend(_get_flat(child, _flatten_element(child)))
 
+    root.clear()
+    root.extend(blocks)
 
-def _flatten_element(element):
-    if not _is_element_has_direct_blocks(element):
-        element.insert_after(*element.children)
-        element.extract()
-        return
 
-    _split_by_blocks(element)
+def _flatten_element(element: PageElement) -> Optional[List[PageElement]]:
+    """Elements that replace this one at the root, None if it stays as is
 
+    Walks with an explicit stack, old notes can nest deeper than
+    the recursion limit.
+    """
 
-def _is_element_decomposable(element) -> bool:
-    if not isinstance(element, Tag):
-        return False
-    if element.name in STANDALONE_TAGS:
-        return False
-    return bool(element.find(BLOCK_TAGS))
+    if not _is_container(element):
+        return None
 
+    stack = [(element, iter(element.contents), [])]
 
-def _is_element_has_direct_blocks(element):
-    return bool(element.find(BLOCK_TAGS, recursive=False))
+    while True:
+        parent, children, flat_children = stack[-1]
 
+        for child in children:
+            if _is_container(child):
+                stack.append((child, iter(child.contents), []))
+                break
 
-def _split_by_blocks(element: Tag):
-    next_element = element
+            flat_children.append((child, None))
+        else:
+            stack.pop()
 
-    while next_element is not None:
-        cur_element = next_element
+            flat = _flatten_children(parent, flat_children)
+            if not stack:
+                return flat
 
-        try:
-            block = next(
-                c
-                for c in cur_element.children
-                if isinstance(c, Tag) and c.name in BLOCK_TAGS
-            )
-        except StopIteration:
-            return
+            stack[-1][2].append((parent, flat))
 
-        next_siblings = list(block.next_siblings)
-        cur_element.insert_after(block)
 
-        if next_siblings:
-            # Create an empty clone of the current element
-            next_chunk = copy.copy(cur_element)
-            next_chunk.clear()
+def _flatten_children(
+    element: Tag, children: List[FlatElement]
+) -> Optional[List[PageElement]]:
+    if not any(_is_block(c) or flat is not None for c, flat in children):
+        return None
 
-            next_chunk.extend(next_siblings)
+    # Detached children are moved without searching for them in the parent
+    element.clear()
 
-            block.insert_after(next_chunk)
+    blocks = []
+    run: List[FlatElement] = []
 
-            next_element = next_chunk
+    for child, flat_child in children:
+        if _is_block(child):
+            blocks.extend(_wrap_run(element, run))
+            blocks.extend(_get_flat(child, flat_child))
+            run = []
         else:
-            next_element = None
+            run.append((child, flat_child))
+
+    blocks.extend(_wrap_run(element, run))
+
+    return blocks
+
+
+def _wrap_run(element: Tag, run: List[FlatElement]) -> List[PageElement]:
+    """Wrap inline elements between blocks into an empty copy of their parent
+
+    Runs with blocks nested somewhere inside are unwrapped instead.
+    """
+
+    if not run:
+        return []
+
+    if any(flat is not None for _, flat in run):
+        return [e for child, flat in run for e in _get_flat(child, flat)]
+
+    chunk = copy.copy(element)
+    chunk.extend(child for child, _ in run)
+
+    return [chunk]
+
+
+def _get_flat(element: PageElement, flat: Optional[List[PageElement]]):
+    return [element] if flat is None else flat
+
+
+def _is_container(element: PageElement) -> bool:
+    return isinstance(element, Tag) and element.name not in STANDALONE_TAGS
+
 
-        if not cur_element.contents:
-            cur_element.extract()
+def _is_block(element: PageElement) -> bool:
+    return isinstance(element, Tag) and element.name in BLOCK_TAGS
@@ -0,0 +1,111 @@
+from typing import Callable, Dict, Iterable
+
+from bs4 import Tag
+
+from enex2notion.note_parser.webclip_stages_cleanup import (
+    fix_img_src_quotes,
+    strip_paragraph,
+)
+from enex2notion.note_parser.webclip_stages_convert import (
+    INLINE_MODIFIER_TAGS,
+    PARAGRAPH_TAGS,
+    SUBHEADER_TAGS,
+    convert_newline,
+    convert_textless_link,
+)
+from enex2notion.note_parser.webclip_stages_preparation import (
+    CONTAINER_TAGS,
+    TABLE_CELL_TAGS,
+    TABLE_CONTAINER_TAGS,
+    UNPROCESSABLE_TAGS,
+    unpack_element,
+)
+
+TagHandlers = Dict[str, Callable[[Tag], None]]
+
+
+def run_fused_pass(root: Tag, handlers: TagHandlers):
+    """Apply per-tag handlers of several stages in a single walk over the tree
+
+    Stages can share a pass only if their result doesn't depend on the order
+    they are applied in. Handlers run in document order, on the tags found
+    when the walk starts. Subtrees removed by a handler are not visited.
+    """
+    detached = set()
+
+    for e in root.find_all(list(handlers)):
+        if id(e) in detached:
+            continue
+
+        handlers[e.name](e)
+
+        if e.parent is None:
+            detached.update(id(d) for d in e.descendants)
+
+
+def prepare_elements(root: Tag):
+    """remove_unprocessable, unpack_block_elements, unpack_tables,
+    convert_paragraphs, convert_subheaders and convert_inline_modifiers
+
+    Removing, unpacking and renaming disjoint sets of tags commute,
+    so one pass gives the same tree as running the stages one by one.
+    """
+    run_fused_pass(root, PREPARATION_HANDLERS)
+
+
+def convert_text_elements(root: Tag):
+    """convert_textless_links and convert_newlines
+
+    Link is visited before <br> inside it, so its text is checked
+    before the line breaks are turned into strings, same as with
+    separate stages.
+    """
+    run_fused_pass(root, CONVERSION_HANDLERS)
+
+
+def cleanup_elements(root: Tag):
+    """strip_paragraphs and fix_redundant_img_src_quotes"""
+    run_fused_pass(root, CLEANUP_HANDLERS)
+
+
+def _remove_element(e: Tag):
+    e.extract()
+
+
+def _get_rename_handlers(renames: Dict[str, Iterable[str]]) -> TagHandlers:
+    handlers = {}
+
+    for new_name, tags in renames.items():
+        handlers.update(dict.fromkeys(tags, _get_rename_handler(new_name)))
+
+    return handlers
+
+
+def _get_rename_handler(new_name: str):
+    def rename(e: Tag):
+        e.name = new_name
+
+    return rename
+
+
+PREPARATION_HANDLERS: TagHandlers = {
+    **dict.fromkeys((*UNPROCESSABLE_TAGS, "colgroup"), _remove_element),
+    **dict.fromkeys((*CONTAINER_TAGS, *TABLE_CONTAINER_TAGS), unpack_element),
+    **_get_rename_handlers(
+        {
+            "div": (*TABLE_CELL_TAGS, *PARAGRAPH_TAGS),
+            "h3": SUBHEADER_TAGS,
+            **INLINE_MODIFIER_TAGS,
+        }
+    ),
+}
+
+CONVERSION_HANDLERS: TagHandlers = {
+    "a": convert_textless_link,
+    "br": convert_newline,
+}
+
+CLEANUP_HANDLERS: TagHandlers = {
+    "div": strip_paragraph,
+    "img": fix_img_src_quotes,
+}
@@ -2,42 +2,50 @@ from bs4 import Tag
 
 from enex2notion.note_parser.webclip_stages_common import rename_tags
 
+UNPROCESSABLE_TAGS = ("nav", "menu")
+
+CONTAINER_TAGS = (
+    "main",
+    "section",
+    "article",
+    "aside",
+    "fieldset",
+    "form",
+    "details",
+    "dialog",
+    "dd",
+    "hgroup",
+    "figure",
+    "footer",
+    "header",
+)
+
+TABLE_CONTAINER_TAGS = ("tr", "thead", "tbody", "tfoot", "table")
+TABLE_CELL_TAGS = ("caption", "td", "th")
+
 
 def remove_unprocessable(root: Tag):
-    for e in root.find_all(["nav", "menu"]):
+    for e in root.find_all(UNPROCESSABLE_TAGS):
         e.extract()
 
 
 def unpack_block_elements(root: Tag):
-    container_blocks = [
-        "main",
-        "section",
-        "article",
-        "aside",
-        "fieldset",
-        "form",
-        "details",
-        "dialog",
-        "dd",
-        "hgroup",
-        "figure",
-        "footer",
-        "header",
-    ]
-
-    for b in container_blocks:
+    for b in CONTAINER_TAGS:
         for e in root.find_all(b):
-            e.insert_after(*e.contents)
-            e.extract()
+            unpack_element(e)
 
 
 def unpack_tables(root: Tag):
     for cg in root.find_all("colgroup"):
         cg.decompose()
 
-    for b in ("tr", "thead", "tbody", "tfoot", "table"):
+    for b in TABLE_CONTAINER_TAGS:
         for e in root.find_all(b):
-            e.insert_after(*e.contents)
-            e.extract()
+            unpack_element(e)
+
+    rename_tags(root, TABLE_CELL_TAGS, "div")
+
 
-    rename_tags(root, ["caption", "td", "th"], "div")
+def unpack_element(e: Tag):
+    e.insert_after(*e.contents)
+    e.extract()
@@ -0,0 +1,905 @@
+"""Local stand-in for the parts of the Notion API used by enex2notion.
+
+Meant for measuring upload throughput without network access or a real
+workspace, not as a faithful Notion implementation. Objects are kept in
+memory and disappear when the server stops.
+
+Run it with:
+
+    python -m enex2notion.notion_mock_server --port 8080 --latency 0.1
+
+and point the uploader at it with --notion-base-url http://127.0.0.1:8080
+and --pageid set to the root page ID printed at startup.
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+ROOT_PAGE_ID = "00000000-0000-4000-8000-000000000000"
+
+# Block types that accept children, everything else answers with an error
+CHILDREN_TYPES = frozenset(
+    (
+        "paragraph",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "to_do",
+        "toggle",
+        "quote",
+        "callout",
+        "table",
+        "column_list",
+        "column",
+        "synced_block",
+        "template",
+    )
+)
+
+BLOCK_TYPES = CHILDREN_TYPES | frozenset(
+    (
+        "heading_1",
+        "heading_2",
+        "heading_3",
+        "code",
+        "divider",
+        "equation",
+        "table_row",
+        "image",
+        "video",
+        "audio",
+        "file",
+        "pdf",
+        "bookmark",
+        "embed",
+        "link_preview",
+        "table_of_contents",
+        "breadcrumb",
+    )
+)
+
+FILE_TYPES = frozenset(("image", "video", "audio", "file", "pdf"))
+
+
+class NotionMockError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class MockServerConfig(object):
+    # Delay added to every request, seconds
+    latency: float = 0
+    latency_jitter: float = 0
+
+    # Share of requests answered with 429 / 5xx at random
+    rate_limited_ratio: float = 0
+    server_error_ratio: float = 0
+    retry_after: float = 1
+
+    # Sustained requests per second before answering 429, 0 = no limit
+    rps_limit: float = 0
+
+    # Notion API request limits
+    max_children: int = 100
+    max_blocks_per_request: int = 1000
+    max_nesting: int = 2
+    max_text_length: int = 2000
+    max_payload_bytes: int = 500 * 1024
+    max_file_bytes: int = 20 * 1024 * 1024
+
+    # Expected integration token, any token is accepted if empty
+    token: str = ""
+
+    seed: Optional[int] = None
+
+
+class NotionMockState(object):
+    """In-memory pages, blocks and file uploads"""
+
+    def __init__(self, config: MockServerConfig):
+        self.config = config
+
+        self.lock = threading.RLock()
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.blocks: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.file_uploads: Dict[str, Dict[str, Any]] = {}
+
+        self.stats: Counter = Counter()
+
+        self._random = random.Random(config.seed)
+        self._rps_next_slot = time.monotonic()
+
+        self.create_page(None, "Import root", page_id=ROOT_PAGE_ID)
+
+    def incr(self, *counters: str, value: int = 1):
+        """Request handlers run on concurrent threads"""
+
+        with self.lock:
+            for counter in counters:
+                self.stats[counter] += value
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def roll(self, ratio: float) -> bool:
+        with self.lock:
+            return self._random.random() < ratio
+
+    def jitter(self) -> float:
+        with self.lock:
+            return self._random.uniform(-1, 1) * self.config.latency_jitter
+
+    def take_rps_slot(self) -> bool:
+        if not self.config.rps_limit:
+            return True
+
+        interval = 1 / self.config.rps_limit
+
+        with self.lock:
+            now = time.monotonic()
+            # Allow short bursts of up to 3 requests like Notion does
+            slot = max(self._rps_next_slot, now - interval * 2)
+            if slot > now:
+                return False
+            self._rps_next_slot = slot + interval
+            return True
+
+    def create_page(self, parent_id, title, page_id=None):
+        page_id = page_id or str(uuid.uuid4())
+        now = _now()
+
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": now,
+            "last_edited_time": now,
+            "parent": (
+                {"type": "page_id", "page_id": parent_id}
+                if parent_id
+                else {"type": "workspace", "workspace": True}
+            ),
+            "archived": False,
+            "in_trash": False,
+            "properties": {
+                "title": {
+                    "id": "title",
+                    "type": "title",
+                    "title": _rich_text([{"text": {"content": title}}]),
+                },
+            },
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+        }
+
+        self.pages[page_id] = page
+        self.children[page_id] = []
+
+        if parent_id:
+            self.children[parent_id].append(page_id)
+            self.blocks[page_id] = {
+                "object": "block",
+                "id": page_id,
+                "type": "child_page",
+                "child_page": {"title": title},
+                "parent": {"type": "page_id", "page_id": parent_id},
+                "archived": False,
+                "has_children": False,
+            }
+
+        return page
+
+    def append_block(self, parent_id, block_data, parent_is_page):
+        block_type = block_data["type"]
+        block_id = str(uuid.uuid4())
+        now = _now()
+
+        type_data = dict(block_data[block_type])
+        nested_children = type_data.pop("children", [])
+
+        if "rich_text" in type_data:
+            type_data["rich_text"] = _rich_text(type_data["rich_text"])
+
+        block = {
+            "object": "block",
+            "id": block_id,
+            "parent": (
+                {"type": "page_id", "page_id": parent_id}
+                if parent_is_page
+                else {"type": "block_id", "block_id": parent_id}
+            ),
+            "created_time": now,
+            "last_edited_time": now,
+            "has_children": bool(nested_children),
+            "archived": False,
+            "type": block_type,
+            block_type: type_data,
+        }
+
+        self.blocks[block_id] = block
+        self.children[block_id] = []
+        self.stats["blocks_created"] += 1
+        self.children[parent_id].append(block_id)
+
+        for child in nested_children:
+            self.append_block(block_id, child, parent_is_page=False)
+
+        return block
+
+    def is_alive(self, object_id):
+        obj = self.pages.get(object_id) or self.blocks.get(object_id)
+        return obj is not None and not obj.get("archived")
+
+
+class NotionMockHandler(BaseHTTPRequestHandler):
+    server: "NotionMockServer"
+
+    protocol_version = "HTTP/1.1"
+
+    routes: List[Tuple[str, Any, str]] = [
+        ("GET", re.compile(r"^/v1/users$"), "list_users"),
+        ("POST", re.compile(r"^/v1/search$"), "search"),
+        ("POST", re.compile(r"^/v1/pages$"), "create_page"),
+        ("GET", re.compile(r"^/v1/pages/(?P<object_id>[^/]+)$"), "get_page"),
+        ("PATCH", re.compile(r"^/v1/pages/(?P<object_id>[^/]+)$"), "update_page"),
+        (
+            "GET",
+            re.compile(r"^/v1/blocks/(?P<object_id>[^/]+)/children$"),
+            "list_children",
+        ),
+        (
+            "PATCH",
+            re.compile(r"^/v1/blocks/(?P<object_id>[^/]+)/children$"),
+            "append_children",
+        ),
+        ("GET", re.compile(r"^/v1/blocks/(?P<object_id>[^/]+)$"), "get_block"),
+        ("PATCH", re.compile(r"^/v1/blocks/(?P<object_id>[^/]+)$"), "update_block"),
+        ("DELETE", re.compile(r"^/v1/blocks/(?P<object_id>[^/]+)$"), "delete_block"),
+        ("POST", re.compile(r"^/v1/file_uploads$"), "create_file_upload"),
+        (
+            "POST",
+            re.compile(r"^/v1/file_uploads/(?P<object_id>[^/]+)/send$"),
+            "send_file_upload",
+        ),
+    ]
+
+    def do_GET(self):  # noqa: N802
+        self._dispatch("GET")
+
+    def do_POST(self):  # noqa: N802
+        self._dispatch("POST")
+
+    def do_PATCH(self):  # noqa: N802
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):  # noqa: N802
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):  # noqa: WPS125
+        logger.debug(format % args)  # noqa: WPS323
+
+    @property
+    def state(self) -> NotionMockState:
+        return self.server.state
+
+    @property
+    def config(self) -> MockServerConfig:
+        return self.server.state.config
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if url.path == "/__stats":
+            self._send_json(200, self.state.get_stats())
+            return
+
+        try:
+            handler, params = self._route(method, url.path)
+
+            self.state.incr("requests", f"{method} {handler}")
+            self.state.incr("bytes_received", value=len(body))
+
+            self._simulate_network()
+            self._check_auth()
+
+            if (
+                len(body) > self.config.max_payload_bytes
+                and handler != "send_file_upload"
+            ):
+                raise NotionMockError(
+                    400, "validation_error", "Request body too large."
+                )
+
+            request = {
+                "query": {k: v[-1] for k, v in parse_qs(url.query).items()},
+                "body": body,
+                "params": params,
+            }
+
+            response = getattr(self, f"handle_{handler}")(request)
+        except NotionMockError as e:
+            self._send_error(e)
+            return
+
+        self._send_json(200, response)
+
+    def _route(self, method, path):
+        path_found = False
+
+        for route_method, route_re, handler in self.routes:
+            match = route_re.match(path)
+            if not match:
+                continue
+            path_found = True
+            if route_method == method:
+                return handler, match.groupdict()
+
+        if path_found:
+            raise NotionMockError(405, "invalid_request", "Method not allowed.")
+        raise NotionMockError(400, "invalid_request_url", "Invalid request URL.")
+
+    def _simulate_network(self):
+        delay = self.config.latency + self.state.jitter()
+        if delay > 0:
+            time.sleep(delay)
+
+        if not self.state.take_rps_slot() or self.state.roll(
+            self.config.rate_limited_ratio
+        ):
+            self.state.incr("injected_429")
+            raise NotionMockError(429, "rate_limited", "You have been rate limited.")
+
+        if self.state.roll(self.config.server_error_ratio):
+            self.state.incr("injected_5xx")
+            raise NotionMockError(503, "service_unavailable", "Notion is unavailable.")
+
+    def _check_auth(self):
+        auth = self.headers.get("Authorization", "")
+        token = auth[len("Bearer ") :] if auth.startswith("Bearer ") else ""
+
+        if not token or (self.config.token and token != self.config.token):
+            raise NotionMockError(401, "unauthorized", "API token is invalid.")
+
+    def _send_error(self, error: NotionMockError):
+        headers = {}
+        if error.status == 429:
+            headers["Retry-After"] = f"{self.config.retry_after:g}"
+
+        self._send_json(
+            error.status,
+            {
+                "object": "error",
+                "status": error.status,
+                "code": error.code,
+                "message": error.message,
+            },
+            headers,
+        )
+
+    def _send_json(self, status, data, headers=None):
+        payload = json.dumps(data).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for header, header_value in (headers or {}).items():
+            self.send_header(header, header_value)
+        self.end_headers()
+
+        self.wfile.write(payload)
+
+    def handle_list_users(self, request):
+        return _list_response(
+            [{"object": "user", "id": str(uuid.UUID(int=1)), "type": "bot", "bot": {}}]
+        )
+
+    def handle_search(self, request):
+        body = _parse_json(request["body"])
+        query = (body.get("query") or "").lower()
+
+        with self.state.lock:
+            pages = [
+                page
+                for page in self.state.pages.values()
+                if not page["archived"] and query in _page_title(page).lower()
+            ]
+
+        pages.sort(key=lambda p: p["last_edited_time"], reverse=True)
+
+        return _paginate(pages, body.get("start_cursor"), body.get("page_size"))
+
+    def handle_create_page(self, request):
+        body = _parse_json(request["body"])
+
+        parent_id = (body.get("parent") or {}).get("page_id")
+        title_prop = (body.get("properties") or {}).get("title") or {}
+        title = "".join(
+            t.get("text", {}).get("content", "") for t in title_prop.get("title", [])
+        )
+
+        children = body.get("children") or []
+        _validate_children(self.state, children)
+
+        with self.state.lock:
+            if not parent_id or not self.state.is_alive(parent_id):
+                raise _not_found(parent_id)
+
+            page = self.state.create_page(parent_id, title)
+            for child in children:
+                self.state.append_block(page["id"], child, parent_is_page=True)
+
+            return page
+
+    def handle_get_page(self, request):
+        page_id = request["params"]["object_id"]
+
+        with self.state.lock:
+            page = self.state.pages.get(page_id)
+            if page is None:
+                raise _not_found(page_id)
+            return page
+
+    def handle_update_page(self, request):
+        page_id = request["params"]["object_id"]
+        body = _parse_json(request["body"])
+
+        with self.state.lock:
+            page = self.state.pages.get(page_id)
+            if page is None:
+                raise _not_found(page_id)
+
+            title_prop = (body.get("properties") or {}).get("title")
+            if title_prop:
+                page["properties"]["title"]["title"] = _rich_text(
+                    title_prop.get("title", [])
+                )
+
+                child_page_block = self.state.blocks.get(page_id)
+                if child_page_block is not None:
+                    child_page_block["child_page"]["title"] = _page_title(page)
+
+            for flag in ("archived", "in_trash"):
+                if flag in body:
+                    page["archived"] = page["in_trash"] = bool(body[flag])
+
+                    if page_id in self.state.blocks:
+                        self.state.blocks[page_id]["archived"] = page["archived"]
+
+            page["last_edited_time"] = _now()
+            return page
+
+    def handle_list_children(self, request):
+        block_id = request["params"]["object_id"]
+
+        with self.state.lock:
+            if block_id not in self.state.children:
+                raise _not_found(block_id)
+
+            children = [
+                self.state.blocks[child_id]
+                for child_id in self.state.children[block_id]
+                if not self.state.blocks[child_id]["archived"]
+            ]
+
+        return _paginate(
+            children,
+            request["query"].get("start_cursor"),
+            request["query"].get("page_size"),
+        )
+
+    def handle_append_children(self, request):
+        parent_id = request["params"]["object_id"]
+        body = _parse_json(request["body"])
+        children = body.get("children") or []
+
+        _validate_children(self.state, children)
+
+        with self.state.lock:
+            if not self.state.is_alive(parent_id):
+                raise _not_found(parent_id)
+
+            parent_is_page = parent_id in self.state.pages
+            if not parent_is_page:
+                parent_type = self.state.blocks[parent_id]["type"]
+                if parent_type not in CHILDREN_TYPES:
+                    raise NotionMockError(
+                        400,
+                        "validation_error",
+                        f"Block type {parent_type} does not support children.",
+                    )
+                self.state.blocks[parent_id]["has_children"] = True
+
+            created = [
+                self.state.append_block(parent_id, child, parent_is_page)
+                for child in children
+            ]
+
+        return _list_response(created, response_type="block")
+
+    def handle_get_block(self, request):
+        block_id = request["params"]["object_id"]
+
+        with self.state.lock:
+            block = self.state.blocks.get(block_id)
+            if block is None:
+                raise _not_found(block_id)
+            return block
+
+    def handle_update_block(self, request):
+        block_id = request["params"]["object_id"]
+        body = _parse_json(request["body"])
+
+        with self.state.lock:
+            block = self.state.blocks.get(block_id)
+            if block is None:
+                raise _not_found(block_id)
+
+            block_type = block["type"]
+            if block_type in body:
+                _validate_block(self.state, {"type": block_type, **body}, 0, [0])
+                block[block_type].update(body[block_type])
+
+            if "archived" in body:
+                block["archived"] = bool(body["archived"])
+
+            block["last_edited_time"] = _now()
+            return block
+
+    def handle_delete_block(self, request):
+        block_id = request["params"]["object_id"]
+
+        with self.state.lock:
+            block = self.state.blocks.get(block_id)
+            if block is None or block["archived"]:
+                raise _not_found(block_id)
+
+            block["archived"] = True
+            if block_id in self.state.pages:
+                self.state.pages[block_id]["archived"] = True
+
+            return block
+
+    def handle_create_file_upload(self, request):
+        body = _parse_json(request["body"])
+        upload_id = str(uuid.uuid4())
+
+        file_upload = {
+            "object": "file_upload",
+            "id": upload_id,
+            "created_time": _now(),
+            "status": "pending",
+            "filename": body.get("filename"),
+            "content_type": body.get("content_type"),
+            "content_length": None,
+            "upload_url": f"{self.server.url}/v1/file_uploads/{upload_id}/send",
+        }
+
+        with self.state.lock:
+            self.state.file_uploads[upload_id] = file_upload
+
+        return file_upload
+
+    def handle_send_file_upload(self, request):
+        upload_id = request["params"]["object_id"]
+
+        file_data = _parse_multipart_file(
+            self.headers.get("Content-Type", ""), request["body"]
+        )
+
+        if len(file_data) > self.config.max_file_bytes:
+            raise NotionMockError(
+                400, "validation_error", "File exceeds single part upload limit."
+            )
+
+        with self.state.lock:
+            file_upload = self.state.file_uploads.get(upload_id)
+            if file_upload is None:
+                raise _not_found(upload_id)
+            if file_upload["status"] != "pending":
+                raise NotionMockError(
+                    400, "validation_error", "File upload is not pending."
+                )
+
+            file_upload["status"] = "uploaded"
+            file_upload["content_length"] = len(file_data)
+            return file_upload
+
+
+class NotionMockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, config: Optional[MockServerConfig] = None):
+        super().__init__(server_address, NotionMockHandler)
+
+        self.state = NotionMockState(config or MockServerConfig())
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock_server(
+    config: Optional[MockServerConfig] = None, host="127.0.0.1", port=0
+) -> NotionMockServer:
+    """Start server in a background thread, stop it with server.shutdown()"""
+
+    server = NotionMockServer((host, port), config)
+
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+    )
+    thread.start()
+
+    return server
+
+
+def _validate_children(state: NotionMockState, children):
+    if not isinstance(children, list):
+        raise NotionMockError(
+            400, "validation_error", "body.children should be an array."
+        )
+
+    if len(children) > state.config.max_children:
+        raise NotionMockError(
+            400,
+            "validation_error",
+            f"body.children.length should be ≤ `{state.config.max_children}`,"
+            f" instead was `{len(children)}`.",
+        )
+
+    blocks_count = [0]
+    for child in children:
+        _validate_block(state, child, 1, blocks_count)
+
+    if blocks_count[0] > state.config.max_blocks_per_request:
+        raise NotionMockError(
+            400, "validation_error", "Too many blocks in a single request."
+        )
+
+
+def _validate_block(state: NotionMockState, block, depth, blocks_count):
+    blocks_count[0] += 1
+
+    block_type = block.get("type") if isinstance(block, dict) else None
+    if block_type not in BLOCK_TYPES or not isinstance(block.get(block_type), dict):
+        raise NotionMockError(
+            400, "validation_error", f"Unsupported block type: {block_type}."
+        )
+
+    type_data = block[block_type]
+
+    for text_item in type_data.get("rich_text", []):
+        content = (text_item.get("text") or {}).get("content", "")
+        if len(content) > state.config.max_text_length:
+            raise NotionMockError(
+                400,
+                "validation_error",
+                f"rich_text.text.content.length should be ≤"
+                f" `{state.config.max_text_length}`, instead was `{len(content)}`.",
+            )
+
+    if block_type in FILE_TYPES:
+        _validate_file_block(state, type_data)
+
+    nested_children = type_data.get("children") or []
+    if nested_children:
+        if depth >= state.config.max_nesting:
+            raise NotionMockError(
+                400, "validation_error", "Block children nesting is too deep."
+            )
+        if block_type not in CHILDREN_TYPES:
+            raise NotionMockError(
+                400,
+                "validation_error",
+                f"Block type {block_type} does not support children.",
+            )
+        for child in nested_children:
+            _validate_block(state, child, depth + 1, blocks_count)
+
+
+def _validate_file_block(state: NotionMockState, type_data):
+    file_type = type_data.get("type")
+
+    if file_type == "external":
+        url = (type_data.get("external") or {}).get("url", "")
+        if not re.match("^https?://[^/]+", url):
+            raise NotionMockError(400, "validation_error", "Invalid image url.")
+        return
+
+    if file_type == "file_upload":
+        upload_id = (type_data.get("file_upload") or {}).get("id")
+        with state.lock:
+            file_upload = state.file_uploads.get(upload_id)
+        if file_upload is None or file_upload["status"] != "uploaded":
+            raise NotionMockError(
+                400, "validation_error", f"File upload {upload_id} is not uploaded."
+            )
+        return
+
+    raise NotionMockError(400, "validation_error", "Unsupported file type.")
+
+
+def _parse_json(body: bytes) -> Dict[str, Any]:
+    if not body:
+        return {}
+
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise NotionMockError(400, "invalid_json", "Error parsing JSON body.")
+
+
+def _parse_multipart_file(content_type: str, body: bytes) -> bytes:
+    if not content_type.startswith("multipart/form-data"):
+        raise NotionMockError(
+            400, "validation_error", "Content-Type must be multipart/form-data."
+        )
+
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_payload(decode=True) or b""
+
+    raise NotionMockError(400, "validation_error", "No file in the request.")
+
+
+def _paginate(results, start_cursor, page_size):
+    start = int(start_cursor) if start_cursor else 0
+    page_size = min(int(page_size or 100), 100)
+
+    page = results[start : start + page_size]
+    has_more = start + page_size < len(results)
+
+    return _list_response(
+        page, next_cursor=str(start + page_size) if has_more else None
+    )
+
+
+def _list_response(results, next_cursor=None, response_type="page_or_database"):
+    return {
+        "object": "list",
+        "results": results,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "type": response_type,
+        response_type: {},
+    }
+
+
+def _rich_text(items):
+    rich_text = []
+
+    for item in items:
+        content = (item.get("text") or {}).get("content", "")
+        rich_text.append(
+            {
+                "type": "text",
+                "text": {"content": content, "link": None},
+                "annotations": item.get("annotations")
+                or {
+                    "bold": False,
+                    "italic": False,
+                    "strikethrough": False,
+                    "underline": False,
+                    "code": False,
+                    "color": "default",
+                },
+                "plain_text": content,
+                "href": None,
+            }
+        )
+
+    return rich_text
+
+
+def _page_title(page):
+    return "".join(t["plain_text"] for t in page["properties"]["title"]["title"])
+
+
+def _not_found(object_id):
+    return NotionMockError(
+        404,
+        "object_not_found",
+        f"Could not find object with ID: {object_id}.",
+    )
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m enex2notion.notion_mock_server",
+        description="Local mock of the Notion API for upload benchmarks",
+    )
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="delay added to each request, seconds"
+    )
+    parser.add_argument(
+        "--latency-jitter", type=float, default=0, help="random +/- latency, seconds"
+    )
+    parser.add_argument(
+        "--rate-limited-ratio",
+        type=float,
+        default=0,
+        help="share of requests answered with 429",
+    )
+    parser.add_argument(
+        "--server-error-ratio",
+        type=float,
+        default=0,
+        help="share of requests answered with 503",
+    )
+    parser.add_argument(
+        "--retry-after", type=float, default=1, help="Retry-After of 429 responses"
+    )
+    parser.add_argument(
+        "--rps-limit",
+        type=float,
+        default=0,
+        help="answer 429 above this many requests per second",
+    )
+    parser.add_argument("--token", default="", help="accept only this token")
+    parser.add_argument("--seed", type=int, help="random seed for injected errors")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):  # pragma: no cover
+    args = parse_args(argv)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+
+    config = MockServerConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limited_ratio=args.rate_limited_ratio,
+        server_error_ratio=args.server_error_ratio,
+        retry_after=args.retry_after,
+        rps_limit=args.rps_limit,
+        token=args.token,
+        seed=args.seed,
+    )
+
+    server = NotionMockServer((args.host, args.port), config)
+
+    logger.info(f"Mock Notion API listening on {server.url}")
+    logger.info(f"Root page ID: {ROOT_PAGE_ID}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"Stats: {server.state.get_stats()}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -3,6 +3,7 @@ import re
 from functools import partial
 from math import sqrt
 from types import MappingProxyType
+from typing import Dict, Optional
 
 from tinycss2 import parse_declaration_list
 from tinycss2.color3 import parse_color
@@ -11,6 +12,33 @@ HEX_BASE = 16
 
 base16 = partial(int, base=HEX_BASE)
 
+# Nearest palette colours are memoized per cube of 8x8x8 RGB values
+CUBE_BITS = 3
+CUBE_SIZE = 1 << CUBE_BITS
+CUBES_PER_CHANNEL = 256 >> CUBE_BITS
+CUBE_MIXED = 255
+
+CSS_WHITESPACE = "[ \t\n\r\f]*"
+
+# Plain declarations, as Evernote writes them, have no quotes, comments,
+# escapes or blocks besides rgb(), so splitting them by ";" gives
+# the same result as the CSS parser
+SIMPLE_DECLARATION_RE = re.compile(
+    CSS_WHITESPACE
+    + r"(-{0,2}[a-z_][\w-]*)"
+    + CSS_WHITESPACE
+    + ":"
+    + CSS_WHITESPACE
+    + r"([^;\"'(){}\[\]\\/]*?|rgb\([\d, \t\n\r\f]*\))"
+    + CSS_WHITESPACE,
+    re.IGNORECASE | re.ASCII,
+)
+SIMPLE_IDENT_RE = re.compile(r"-?[a-z_][\w-]*", re.IGNORECASE | re.ASCII)
+SIMPLE_HEX_RE = re.compile(r"#([0-9a-f]{3}|[0-9a-f]{6})", re.IGNORECASE)
+SIMPLE_RGB_RE = re.compile(
+    r"rgb\({0}(\d+){0},{0}(\d+){0},{0}(\d+){0}\)".format(CSS_WHITESPACE), re.ASCII
+)
+
 EVERNOTE_STANDARD_FG = MappingProxyType(
     {
         (51, 51, 51): "black",
@@ -81,6 +109,10 @@ COLORS_BG = MappingProxyType(
 
 
 def extract_color(style):  # noqa: WPS210
+    simple_style = _parse_simple_style(style)
+    if simple_style is not None:
+        return _extract_simple_color(simple_style)
+
     color_map = {
         ".*en-highlight$": _extract_background_text,
         "^background-color$": _extract_background_rgb,
@@ -115,6 +147,82 @@ def _parse_style(style):
     return result_styles
 
 
+def _parse_simple_style(style) -> Optional[Dict[str, str]]:
+    """Fast path for styles like "color:rgb(252, 18, 51);", without tinycss2
+
+    None if the style needs the full CSS parser.
+    """
+
+    result_styles = {}
+
+    for declaration in style.split(";"):
+        if not declaration.strip():
+            continue
+
+        match = SIMPLE_DECLARATION_RE.fullmatch(declaration)
+        if match is None:
+            return None
+
+        s_name, s_value = match.group(1).lower(), match.group(2)
+        if not s_value:
+            continue
+
+        if not _is_simple_value(s_name, s_value):
+            return None
+
+        result_styles[s_name] = s_value
+
+    return result_styles
+
+
+def _is_simple_value(s_name, s_value):
+    if s_name.endswith("en-highlight"):
+        return SIMPLE_IDENT_RE.fullmatch(s_value) is not None
+
+    if s_name in {"background-color", "color"}:
+        return _parse_simple_rgb(s_value) is not None
+
+    return True
+
+
+def _extract_simple_color(simple_style):
+    for s_name, s_value in simple_style.items():
+        if s_name.endswith("en-highlight"):
+            color = _get_background_by_name(s_value)
+        elif s_name == "background-color":
+            color = _get_background_by_rgb(_parse_simple_rgb(s_value))
+        elif s_name == "color":
+            color = _get_foreground_by_rgb(_parse_simple_rgb(s_value))
+        else:
+            continue
+
+        if color:
+            return color
+
+    return None
+
+
+def _parse_simple_rgb(color_value):
+    hex_match = SIMPLE_HEX_RE.fullmatch(color_value)
+    rgb_match = SIMPLE_RGB_RE.fullmatch(color_value)
+
+    if hex_match:
+        hex_color = hex_match.group(1)
+        if len(hex_color) == 3:
+            hex_color = "".join(c * 2 for c in hex_color)
+
+        channels = [base16(hex_color[i : i + 2]) for i in (0, 2, 4)]
+    elif rgb_match:
+        channels = [int(c) for c in rgb_match.groups()]
+    else:
+        return None
+
+    float_to_int_rgb = 255
+
+    # Same rounding as for colors parsed by tinycss2
+    return tuple(int(c / float_to_int_rgb * float_to_int_rgb) for c in channels)
+
+
 def _parse_css_color(color_token):
     rgba = parse_color(color_token)
 
@@ -127,7 +235,11 @@ def _parse_css_color(color_token):
 
 
 def _extract_background_text(color_token):
-    color = f"{color_token.value}_background"
+    return _get_background_by_name(color_token.value)
+
+
+def _get_background_by_name(color_name):
+    color = f"{color_name}_background"
 
     if color == "green_background":
         color = "teal_background"
@@ -139,15 +251,17 @@ def _extract_background_text(color_token):
 
 
 def _extract_background_rgb(color_token):
-    rbg_bg = _parse_css_color(color_token)
+    return _get_background_by_rgb(_parse_css_color(color_token))
 
+
+def _get_background_by_rgb(rbg_bg):
     if rbg_bg is None:
         return None
 
     if EVERNOTE_STANDARD_BG.get(rbg_bg):
         return EVERNOTE_STANDARD_BG[rbg_bg]
     else:
-        color = _closest_color(COLORS_BG, rbg_bg)
+        color = closest_bg.get(rbg_bg)
 
     if color not in {"black_background", "white_background"}:
         return color
@@ -156,15 +270,17 @@ def _extract_background_rgb(color_token):
 
 
 def _extract_foreground_rgb(color_token):
-    rbg_fg = _parse_css_color(color_token)
+    return _get_foreground_by_rgb(_parse_css_color(color_token))
+
 
+def _get_foreground_by_rgb(rbg_fg):
     if rbg_fg is None:
         return None
 
     if EVERNOTE_STANDARD_FG.get(rbg_fg):
         color = EVERNOTE_STANDARD_FG[rbg_fg]
     else:
-        color = _closest_color(COLORS_FG, rbg_fg)
+        color = closest_fg.get(rbg_fg)
 
     if color not in {"black", "white"}:
         return color
@@ -182,3 +298,71 @@ def _closest_color(colors, rgb):  # noqa: WPS210
         )
         color_diffs.append((color_diff, color_name))
     return min(color_diffs)[1]
+
+
+class ColorLookup(object):
+    """Nearest palette colour, memoized per cube of RGB space
+
+    A cube gets a colour once all of the cube is known to be nearest to it.
+    Squared distance to the colour minus squared distance to any other one
+    is linear, so it's enough to check the cube corner farthest toward
+    the other colour. Cubes crossed by a boundary between colours
+    are marked mixed and searched exactly.
+    """
+
+    def __init__(self, colors):
+        self.colors = colors
+        self.palette = list(colors)
+
+        # 0 - not resolved yet, CUBE_MIXED, otherwise palette index + 1
+        self.cubes = bytearray(CUBES_PER_CHANNEL**3)
+
+    def get(self, rgb) -> str:
+        if not all(0 <= c <= 255 for c in rgb):
+            return _closest_color(self.colors, rgb)
+
+        cube = self.get_cube(rgb)
+
+        cube_entry = self.cubes[cube]
+        if cube_entry == CUBE_MIXED:
+            return _closest_color(self.colors, rgb)
+        if cube_entry:
+            return self.palette[cube_entry - 1]
+
+        color_name = _closest_color(self.colors, rgb)
+        self.cubes[cube] = self._resolve_cube(rgb, color_name)
+
+        return color_name
+
+    def get_cube(self, rgb) -> int:
+        r, g, b = (c >> CUBE_BITS for c in rgb)
+
+        return (r * CUBES_PER_CHANNEL + g) * CUBES_PER_CHANNEL + b
+
+    def _resolve_cube(self, rgb, color_name) -> int:
+        cube_start = [c >> CUBE_BITS << CUBE_BITS for c in rgb]
+        color = self.colors[color_name]
+
+        for other_name, other in self.colors.items():
+            if other_name == color_name:
+                continue
+
+            corner = [
+                start + CUBE_SIZE - 1 if other_c > color_c else start
+                for start, color_c, other_c in zip(cube_start, color, other)
+            ]
+            diff = _distance_sq(corner, color) - _distance_sq(corner, other)
+
+            # Equal distances are resolved by name, same as in _closest_color
+            if diff > 0 or (diff == 0 and other_name < color_name):
+                return CUBE_MIXED
+
+        return self.palette.index(color_name) + 1
+
+
+def _distance_sq(rgb1, rgb2):
+    return sum((c1 - c2) ** 2 for c1, c2 in zip(rgb1, rgb2))
+
+
+closest_fg = ColorLookup(COLORS_FG)
+closest_bg = ColorLookup(COLORS_BG)
@@ -4,3 +4,7 @@ class NoteUploadFailException(Exception):
 
 class BadTokenException(Exception):
     """Exception for when a token is invalid"""
+
+
+class PdfRenderException(Exception):
+    """Exception for when wkhtmltopdf fails to render a webclip"""
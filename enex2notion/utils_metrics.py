@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from enex2notion.utils_stats import RunStats, run_stats
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "enex2notion"
+
+# How often --metrics-file is rewritten, seconds
+METRICS_FILE_INTERVAL = 15
+
+HTTP_STATUS_RE = re.compile(r"^http_(\d{3})$")
+
+
+class MetricsExporter(object):
+    """Publishes run_stats while the run goes on
+
+    Serves Prometheus text on /metrics and JSON on /metrics.json
+    and/or keeps rewriting a file for node_exporter textfile collector.
+    """
+
+    def __init__(self, stats: RunStats = run_stats):
+        self.stats = stats
+        self.metrics_file: Optional[Path] = None
+        self.server: Optional[_MetricsServer] = None
+
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(
+        self,
+        listen: Optional[Tuple[str, int]] = None,
+        metrics_file: Optional[Path] = None,
+    ):
+        self.metrics_file = metrics_file
+        self._stop_event.clear()
+
+        if listen:
+            self.server = _MetricsServer(listen, self)
+            self._start_thread(self.server.serve_forever, kwargs={"poll_interval": 0.5})
+
+            host, port = self.server.server_address[:2]
+            logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+        if metrics_file:
+            self._start_thread(self._write_file_loop)
+
+    def stop(self):
+        self._stop_event.set()
+
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+        if self.metrics_file:
+            self.write_file()
+            self.metrics_file = None
+
+    def get_json(self) -> dict:
+        totals = self.stats.get_totals()
+        counters = totals["counters"]
+        gauges = totals["gauges"]
+
+        notes_finished = sum(
+            counters.get(c, 0) for c in ("notes_done", "notes_failed", "notes_skipped")
+        )
+        notes_left = max(gauges.get("notes_planned", 0) - notes_finished, 0)
+
+        eta = None
+        if notes_finished and totals["duration"]:
+            eta = notes_left / (notes_finished / totals["duration"])
+
+        return {
+            "duration": totals["duration"],
+            "notes_left": notes_left,
+            "eta_seconds": eta,
+            "counters": counters,
+            "gauges": gauges,
+            "stages": {
+                stage: {"count": count, "total": total}
+                for stage, (count, total) in totals["stages"].items()
+            },
+        }
+
+    def get_prometheus(self) -> str:
+        metrics = self.get_json()
+
+        lines = [
+            *_format_metric(
+                "run_duration_seconds", "gauge", [("", metrics["duration"])]
+            ),
+            *_format_metric("notes_left", "gauge", [("", metrics["notes_left"])]),
+        ]
+
+        if metrics["eta_seconds"] is not None:
+            lines.extend(
+                _format_metric("eta_seconds", "gauge", [("", metrics["eta_seconds"])])
+            )
+
+        http_statuses = []
+        for counter, counter_value in sorted(metrics["counters"].items()):
+            status_match = HTTP_STATUS_RE.match(counter)
+            if status_match:
+                http_statuses.append((f'status="{status_match[1]}"', counter_value))
+            else:
+                lines.extend(
+                    _format_metric(f"{counter}_total", "counter", [("", counter_value)])
+                )
+
+        if http_statuses:
+            lines.extend(
+                _format_metric("http_retried_responses_total", "counter", http_statuses)
+            )
+
+        for gauge, gauge_value in sorted(metrics["gauges"].items()):
+            lines.extend(_format_metric(gauge, "gauge", [("", gauge_value)]))
+
+        stages = sorted(metrics["stages"].items())
+        stage_labels = [(_stage_label(stage), s["total"]) for stage, s in stages]
+        stage_counts = [(_stage_label(stage), s["count"]) for stage, s in stages]
+
+        lines.extend(_format_metric("stage_seconds_total", "counter", stage_labels))
+        lines.extend(_format_metric("stage_calls_total", "counter", stage_counts))
+
+        return "\n".join(lines) + "\n"
+
+    def write_file(self):
+        # Textfile collector may read any moment, so replace file atomically
+        tmp_file = self.metrics_file.with_name(
+            f"{self.metrics_file.name}.{os.getpid()}"
+        )
+        tmp_file.write_text(self.get_prometheus(), encoding="utf-8")
+        os.replace(tmp_file, self.metrics_file)
+
+    def _write_file_loop(self):
+        while not self._stop_event.wait(METRICS_FILE_INTERVAL):
+            try:
+                self.write_file()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics file: {e}")
+
+    def _start_thread(self, target, **kwargs):
+        thread = threading.Thread(target=target, daemon=True, **kwargs)
+        thread.start()
+
+        self._threads.append(thread)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        exporter = self.server.exporter
+
+        if self.path == "/metrics":
+            body = exporter.get_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(exporter.get_json()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: WPS125
+        logger.debug(f"Metrics request: {format % args}")
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, exporter: MetricsExporter):
+        super().__init__(server_address, _MetricsHandler)
+
+        self.exporter = exporter
+
+
+metrics_exporter = MetricsExporter()
+
+
+def _format_metric(name, metric_type, samples):
+    full_name = f"{METRICS_PREFIX}_{name}"
+
+    yield f"# TYPE {full_name} {metric_type}"
+
+    for labels, sample_value in samples:
+        labels_str = f"{{{labels}}}" if labels else ""
+        yield f"{full_name}{labels_str} {sample_value}"
+
+
+def _stage_label(stage):
+    escaped_stage = stage.replace("\\", "\\\\").replace('"', '\\"')
+
+    return f'stage="{escaped_stage}"'
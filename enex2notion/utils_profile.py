@@ -0,0 +1,136 @@
+import cProfile
+import logging
+import pstats
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "mem")
+
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 5
+
+
+class StageProfiler(object):
+    """Optional profiling of the run, split by processing stage
+
+    cpu mode keeps a cProfile profiler per stage and saves it to <stage>.pstats.
+    Only one profiler can be active at a time since Python 3.12, and before
+    that it only saw the thread it was enabled in, so profiled sections
+    of concurrent workers run one at a time.
+
+    mem mode traces allocations with tracemalloc and snapshots them at
+    checkpoints (after parsing, conversion and upload) of every N-th note.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.output_dir = Path()
+        self.every = 1
+
+        self._lock = threading.Lock()
+        self._cpu_lock = threading.RLock()
+        self._cpu_active = False
+        self._cpu_profiles: Dict[str, cProfile.Profile] = defaultdict(cProfile.Profile)
+        self._checkpoints: Counter = Counter()
+        self._mem_reports: List[str] = []
+
+    def start(self, mode: Optional[str], output_dir: Path, every: int = 1):
+        self.mode = mode
+        self.output_dir = output_dir
+        self.every = max(every, 1)
+
+        self._cpu_profiles.clear()
+        self._checkpoints.clear()
+        self._mem_reports.clear()
+
+        if mode == "mem":
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def profile(self, stage: str):
+        if self.mode != "cpu":
+            yield
+            return
+
+        with self._cpu_lock:
+            # Nested stage is counted in the outer one
+            if self._cpu_active:
+                yield
+                return
+
+            profiler = self._cpu_profiles[stage]
+
+            self._cpu_active = True
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._cpu_active = False
+
+    def checkpoint(self, point: str, note_title: str = ""):
+        if self.mode != "mem":
+            return
+
+        with self._lock:
+            self._checkpoints[point] += 1
+            checkpoint_idx = self._checkpoints[point]
+
+        if (checkpoint_idx - 1) % self.every:
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        current, peak = tracemalloc.get_traced_memory()
+
+        report_lines = [
+            f"== after {point} #{checkpoint_idx} '{note_title}':"
+            f" current {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB",
+            *(str(s) for s in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]),
+        ]
+
+        with self._lock:
+            self._mem_reports.append("\n".join(report_lines))
+
+    def stop(self):
+        if self.mode is None:
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.mode == "cpu":
+            self._dump_cpu_profiles()
+        elif self.mode == "mem":
+            self._dump_mem_reports()
+            tracemalloc.stop()
+
+        self.mode = None
+
+    def _dump_cpu_profiles(self):
+        for stage, profile in sorted(self._cpu_profiles.items()):
+            stats = pstats.Stats(profile)
+
+            stats_file = self.output_dir / f"{stage}.pstats"
+            stats.dump_stats(str(stats_file))
+
+            logger.info(f"CPU profile of '{stage}' stage saved to '{stats_file}'")
+
+    def _dump_mem_reports(self):
+        _, peak = tracemalloc.get_traced_memory()
+        report_file = self.output_dir / "memory.txt"
+
+        with open(report_file, "w", encoding="utf-8") as f:
+            f.write(f"Peak traced memory: {peak / 2**20:.1f} MiB\n\n")
+            f.write("\n\n".join(self._mem_reports))
+
+        logger.info(f"Memory profile saved to '{report_file}'")
+
+
+stage_profiler = StageProfiler()
@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from enex2notion.utils_stats import get_endpoint_name, run_stats
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 5
+MAX_BACKOFF = 30
+DEFAULT_RETRY_AFTER = 1
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Repeating these has the same effect as sending them once
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+# Failures before the request reached the server
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class RateLimiter(object):
+    """Thread-safe request pacer, rate is in requests per second (0 = unlimited)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.burst_window = self.interval * max(burst - 1, 0)
+
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        delay = self._reserve_slot()
+        if delay > 0:
+            with run_stats.timer("rate_limit_wait"):
+                time.sleep(delay)
+
+    async def acquire_async(self):
+        """Same as acquire(), but waits without blocking the event loop"""
+
+        delay = self._reserve_slot()
+        if delay > 0:
+            with run_stats.timer("rate_limit_wait", track="rate limiter"):
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold off all requests, used when server asks to slow down"""
+
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+    def _reserve_slot(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now - self.burst_window)
+            self._next_slot = slot + self.interval
+
+        return slot - now
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Paces every request through the limiter and retries throttled ones
+
+    Retry-After from 429 responses pauses the shared limiter,
+    so all workers back off together instead of hammering the API.
+
+    Requests that are not idempotent, like appending blocks, are retried
+    only if the server couldn't have applied them, other failures are left
+    to the note upload retry.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        transport: Optional[httpx.BaseTransport] = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.rate_limiter = rate_limiter
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in itertools.count():
+            is_last_attempt = attempt == self.max_retries
+
+            self.rate_limiter.acquire()
+
+            try:
+                response = self._send(request, attempt)
+            except httpx.TransportError as e:
+                run_stats.incr("http_connection_errors")
+                if is_last_attempt or not _can_retry_error(request, e):
+                    raise
+                self._backoff(request, attempt, f"connection error ({e})")
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+
+            run_stats.incr(f"http_{response.status_code}")
+            if is_last_attempt or not _can_retry_status(request, response):
+                return response
+
+            run_stats.incr("http_retries")
+            response.close()
+
+            if response.status_code == 429:
+                retry_after = _parse_retry_after(response)
+                logger.debug(
+                    f"Rate limited on {request.method} {request.url.path},"
+                    f" waiting {retry_after}s"
+                )
+                self.rate_limiter.pause(retry_after)
+            else:
+                self._backoff(request, attempt, f"HTTP {response.status_code}")
+
+    def close(self):
+        self.transport.close()
+
+    def _send(self, request: httpx.Request, attempt: int) -> httpx.Response:
+        endpoint = get_endpoint_name(request.method, request.url.path)
+
+        run_stats.incr("http_bytes_sent", int(request.headers.get("Content-Length", 0)))
+        run_stats.add_gauge("http_in_flight", 1)
+
+        try:
+            with run_stats.timer(f"http {endpoint}", attempt=attempt):
+                return self.transport.handle_request(request)
+        finally:
+            run_stats.add_gauge("http_in_flight", -1)
+
+    def _backoff(self, request, attempt, reason):
+        wait_time = min(2**attempt, MAX_BACKOFF)
+
+        logger.debug(
+            f"{reason} on {request.method} {request.url.path},"
+            f" retrying in {wait_time}s"
+        )
+
+        with run_stats.timer("retry_backoff", reason=reason):
+            time.sleep(wait_time)
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Asyncio counterpart of RateLimitedTransport for notion_client.AsyncClient
+
+    Can share the limiter with a sync transport, so both stay within one budget.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.rate_limiter = rate_limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in itertools.count():
+            is_last_attempt = attempt == self.max_retries
+
+            await self.rate_limiter.acquire_async()
+
+            try:
+                response = await self._send(request, attempt)
+            except httpx.TransportError as e:
+                run_stats.incr("http_connection_errors")
+                if is_last_attempt or not _can_retry_error(request, e):
+                    raise
+                await self._backoff(request, attempt, f"connection error ({e})")
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+
+            run_stats.incr(f"http_{response.status_code}")
+            if is_last_attempt or not _can_retry_status(request, response):
+                return response
+
+            run_stats.incr("http_retries")
+            await response.aclose()
+
+            if response.status_code == 429:
+                retry_after = _parse_retry_after(response)
+                logger.debug(
+                    f"Rate limited on {request.method} {request.url.path},"
+                    f" waiting {retry_after}s"
+                )
+                self.rate_limiter.pause(retry_after)
+            else:
+                await self._backoff(request, attempt, f"HTTP {response.status_code}")
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def _send(self, request: httpx.Request, attempt: int) -> httpx.Response:
+        endpoint = get_endpoint_name(request.method, request.url.path)
+
+        run_stats.incr("http_bytes_sent", int(request.headers.get("Content-Length", 0)))
+        run_stats.add_gauge("http_in_flight", 1)
+
+        try:
+            with run_stats.timer(
+                f"http {endpoint}", track=f"request {id(request)}", attempt=attempt
+            ):
+                return await self.transport.handle_async_request(request)
+        finally:
+            run_stats.add_gauge("http_in_flight", -1)
+
+    async def _backoff(self, request, attempt, reason):
+        wait_time = min(2**attempt, MAX_BACKOFF)
+
+        logger.debug(
+            f"{reason} on {request.method} {request.url.path},"
+            f" retrying in {wait_time}s"
+        )
+
+        with run_stats.timer(
+            "retry_backoff", track=f"request {id(request)}", reason=reason
+        ):
+            await asyncio.sleep(wait_time)
+
+
+def _can_retry_error(request: httpx.Request, error: httpx.TransportError) -> bool:
+    return request.method in IDEMPOTENT_METHODS or isinstance(error, CONNECT_ERRORS)
+
+
+def _can_retry_status(request: httpx.Request, response: httpx.Response) -> bool:
+    return response.status_code == 429 or request.method in IDEMPOTENT_METHODS
+
+
+def _parse_retry_after(response: httpx.Response) -> float:
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 0)
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
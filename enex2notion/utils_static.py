@@ -1,5 +1,6 @@
 from argparse import Namespace
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 
 
@@ -18,6 +19,14 @@ class Rules(object):
     skip_failed: bool
     keep_failed: bool
 
+    webclip_max_requests: int = 5
+    pdf_jobs: int = 0
+    pdf_timeout: float = 60
+    pdf_preview_width: int = 0
+    pdf_preview_format: str = "png"
+    render_cache: Optional[Path] = None
+    render_cache_size: int = 1024
+
     @classmethod
     def from_args(cls, args: Namespace) -> "Rules":
         args_map = {
@@ -0,0 +1,242 @@
+import functools
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+ID_RE = re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}")
+
+
+class RunStats(object):
+    """Per-stage timings and counters of a single run, shared by all threads
+
+    With tracing started, every timed stage is also recorded as a span
+    in Chrome trace event format, see write_trace().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.timings: Dict[str, array] = defaultdict(lambda: array("d"))
+            self.stage_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+            self.counters: Counter = Counter()
+            self.gauges: Dict[str, float] = defaultdict(float)
+            self.trace_events: Optional[List[Dict[str, Any]]] = None
+            self._traced_threads = set()
+
+    def start_trace(self):
+        with self._lock:
+            self.trace_events = []
+
+    @contextmanager
+    def timer(self, stage: str, track: Optional[str] = None, **span_args):
+        """Time the stage, track puts the span on its own async timeline
+
+        Spans that can overlap on one thread (e.g. waits in the event loop)
+        need a track, otherwise they are attributed to the running thread.
+        """
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            self.add_timing(stage, end - start)
+
+            if self.trace_events is not None:
+                self._add_span(stage, start, end, track, span_args)
+
+    @contextmanager
+    def locked(self, lock, stage: str, **span_args):
+        """Acquire the lock, timing the wait for it as the stage"""
+
+        with self.timer(stage, **span_args):
+            lock.acquire()
+
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def add_timing(self, stage: str, seconds: float):
+        with self._lock:
+            self.timings[stage].append(seconds)
+
+            stage_total = self.stage_totals[stage]
+            stage_total[0] += 1
+            stage_total[1] += seconds
+
+    def incr(self, counter: str, value: int = 1):
+        with self._lock:
+            self.counters[counter] += value
+
+    def set_gauge(self, gauge: str, value: float):
+        with self._lock:
+            self.gauges[gauge] = value
+
+    def add_gauge(self, gauge: str, delta: float):
+        with self._lock:
+            self.gauges[gauge] += delta
+
+    def get_totals(self) -> dict:
+        """Cheap alternative to get_report() without latency percentiles"""
+
+        with self._lock:
+            return {
+                "duration": time.monotonic() - self.started,
+                "stages": {k: tuple(v) for k, v in self.stage_totals.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def get_trace(self) -> dict:
+        with self._lock:
+            trace_events = list(self.trace_events or [])
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def get_report(self) -> dict:
+        with self._lock:
+            timings = {k: sorted(v) for k, v in self.timings.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            duration = time.monotonic() - self.started
+
+        return {
+            "duration": duration,
+            "stages": {
+                stage: _summarize_timings(stage_timings)
+                for stage, stage_timings in sorted(timings.items())
+            },
+            "counters": dict(sorted(counters.items())),
+            "gauges": dict(sorted(gauges.items())),
+        }
+
+    def _add_span(self, stage, start, end, track, span_args):
+        span = {
+            "name": stage,
+            "cat": stage.split(" ")[0].split(".")[0],
+            "ts": (start - self.started) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": span_args,
+        }
+
+        if track is None:
+            span_events = [{**span, "ph": "X", "dur": (end - start) * 1e6}]
+        else:
+            span_events = [
+                {**span, "ph": "b", "id": track},
+                {**span, "ph": "e", "id": track, "ts": (end - self.started) * 1e6},
+            ]
+
+        with self._lock:
+            if self.trace_events is None:
+                return
+
+            if span["tid"] not in self._traced_threads:
+                self._traced_threads.add(span["tid"])
+                self.trace_events.append(_make_thread_name_event(span))
+
+            self.trace_events.extend(span_events)
+
+
+run_stats = RunStats()
+
+
+def timed(stage: str):
+    """Decorator to add function run time to the stage in run_stats"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run_stats.timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_endpoint_name(method: str, path: str) -> str:
+    """Notion API endpoint without object IDs, e.g. 'PATCH /v1/blocks/{id}/children'"""
+
+    return f"{method} {ID_RE.sub('{id}', path)}"
+
+
+def write_report(report: dict, report_file: Path):
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_trace(trace: dict, trace_file: Path):
+    with open(trace_file, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Run time: {report['duration']:.1f}s",
+        "{0:<40} {1:>8} {2:>10} {3:>9} {4:>9} {5:>9}".format(
+            "stage", "count", "total s", "p50 ms", "p95 ms", "p99 ms"
+        ),
+    ]
+
+    for stage, summary in report["stages"].items():
+        lines.append(
+            "{0:<40} {1:>8} {2:>10.2f} {3:>9.1f} {4:>9.1f} {5:>9.1f}".format(
+                stage,
+                summary["count"],
+                summary["total"],
+                summary["p50"] * 1000,
+                summary["p95"] * 1000,
+                summary["p99"] * 1000,
+            )
+        )
+
+    for counter, counter_value in report["counters"].items():
+        lines.append(f"{counter:<40} {counter_value:>8}")
+
+    return "\n".join(lines)
+
+
+def _make_thread_name_event(span):
+    return {
+        "name": "thread_name",
+        "ph": "M",
+        "pid": span["pid"],
+        "tid": span["tid"],
+        "args": {"name": threading.current_thread().name},
+    }
+
+
+def _summarize_timings(timings) -> dict:
+    summary = {
+        "count": len(timings),
+        "total": sum(timings),
+        "max": timings[-1],
+    }
+
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = _get_percentile(timings, percentile)
+
+    return summary
+
+
+def _get_percentile(sorted_values, percentile):
+    # Nearest-rank method
+    rank = max(-(-len(sorted_values) * percentile // 100), 1)
+
+    return sorted_values[rank - 1]
@@ -4,6 +4,7 @@ import json
 import os
 import platform
 import uuid
+from datetime import datetime
 from hashlib import md5
 from pathlib import Path
 
@@ -12,9 +13,52 @@ from bs4 import BeautifulSoup
 from notion.block import PageBlock
 from notion.client import NotionClient
 
-from enex2notion.enex_types import EvernoteResource
+from enex2notion.enex_types import EvernoteNote, EvernoteResource
 from enex2notion.utils_static import Rules
 
+TEST_ENEX = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE en-export SYSTEM "http://xml.evernote.com/pub/evernote-export4.dtd">
+<en-export export-date="20211218T085932Z" application="Evernote" version="10.25.6">
+  <note>
+    <title>test1</title>
+    <created>20211118T085332Z</created>
+    <updated>20211118T085920Z</updated>
+    <content>
+      <![CDATA[<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd">
+<en-note><div>test1</div><ul><li>item<ul><li>subitem</li></ul></li></ul></en-note>]]>
+    </content>
+  </note>
+  <note>
+    <title>test2</title>
+    <created>20211118T085332Z</created>
+    <updated>20211118T085920Z</updated>
+    <content>
+      <![CDATA[<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd">
+<en-note><div>test</div><en-media type="image/gif" hash="dac43804dadb7bbd67bdbc6e489a3aee" /></en-note>]]>
+    </content>
+    <resource>
+      <data encoding="base64">R0lGODlhAQABAAAAACH5BAEAAAAALAAAAAABAAEAAAIA</data>
+      <mime>image/gif</mime>
+      <resource-attributes>
+        <file-name>smallest.gif</file-name>
+      </resource-attributes>
+    </resource>
+  </note>
+  <note>
+    <title>empty</title>
+    <created>20211118T085332Z</created>
+    <updated>20211118T085920Z</updated>
+    <content>
+      <![CDATA[<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd">
+<en-note></en-note>]]>
+    </content>
+  </note>
+</en-export>
+"""
+
 
 @pytest.fixture(scope="module")
 def vcr_config():
@@ -202,3 +246,57 @@ def parse_rules():
         skip_failed=False,
         keep_failed=False,
     )
+
+
+@pytest.fixture()
+def enex_file(tmp_path):
+    enex_path = tmp_path / "notebook.enex"
+    enex_path.write_text(TEST_ENEX)
+
+    return enex_path
+
+
+@pytest.fixture()
+def make_note():
+    def inner(title="test", content="content", guid=""):
+        return EvernoteNote(
+            title=title,
+            created=datetime(2021, 11, 18, 8, 53, 32),
+            updated=datetime(2021, 11, 18, 8, 59, 20),
+            content=content,
+            tags=[],
+            author="",
+            url="",
+            is_webclip=False,
+            resources=[],
+            guid=guid,
+        )
+
+    return inner
+
+
+@pytest.fixture()
+def mock_upload_api(mocker):
+    """Upload pipeline without Notion, notes come from iter_notes mock"""
+
+    mocker.patch("enex2notion.cli_upload.RETRY_BASE_DELAY", 0)
+
+    return {
+        "get_notion_client": mocker.patch("enex2notion.cli_notion.get_notion_client"),
+        "get_import_root": mocker.patch("enex2notion.cli_notion.get_import_root"),
+        "get_notebook_page": mocker.patch("enex2notion.cli_upload.get_notebook_page"),
+        "count_notes": mocker.patch("enex2notion.cli_upload.count_notes"),
+        "iter_notes": mocker.patch("enex2notion.cli_upload.iter_notes"),
+        "parse_note": mocker.patch(
+            "enex2notion.cli_upload.parse_note", return_value=["block"]
+        ),
+        "upload_note": mocker.patch(
+            "enex2notion.cli_upload.upload_note", return_value="page1"
+        ),
+        "sync_note": mocker.patch(
+            "enex2notion.cli_upload.sync_note", return_value="page1"
+        ),
+        "discard_note_upload": mocker.patch(
+            "enex2notion.cli_upload.discard_note_upload"
+        ),
+    }
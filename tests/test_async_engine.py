@@ -0,0 +1,159 @@
+import asyncio
+
+import httpx
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.cli_notion import get_async_notion_client, get_notion_client
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+from enex2notion.utils_rate_limit import AsyncRateLimitedTransport, RateLimiter
+
+
+@pytest.fixture()
+def mock_server():
+    server = start_mock_server(MockServerConfig())
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def run_upload(server, *args):
+    cli(
+        [
+            *args[:-1],
+            "--token",
+            "fake_token",
+            "--pageid",
+            ROOT_PAGE_ID,
+            "--notion-base-url",
+            server.url,
+            "--rate-limit",
+            "0",
+            args[-1],
+        ]
+    )
+
+
+def get_upload_stats(server):
+    stats = server.state.stats
+
+    return {
+        key: stats[key]
+        for key in ("POST create_page", "POST send_file_upload", "blocks_created")
+    }
+
+
+def test_async_engine_matches_threads(enex_file, tmp_path):
+    engine_stats = {}
+    for engine in ("threads", "async"):
+        server = start_mock_server(MockServerConfig())
+        done_file = tmp_path / f"done_{engine}.txt"
+
+        try:
+            run_upload(
+                server,
+                "--engine",
+                engine,
+                "--done-file",
+                str(done_file),
+                str(enex_file),
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert len(done_file.read_text().splitlines()) == 2
+        engine_stats[engine] = get_upload_stats(server)
+
+    assert engine_stats["async"] == engine_stats["threads"]
+    assert engine_stats["async"]["POST send_file_upload"] == 1
+
+
+def test_async_engine_replay(enex_file, tmp_path, mock_server):
+    spool_dir = tmp_path / "spool"
+    done_file = tmp_path / "done.txt"
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    run_upload(
+        mock_server,
+        "replay",
+        "--engine",
+        "async",
+        "--done-file",
+        str(done_file),
+        str(spool_dir),
+    )
+
+    assert len(done_file.read_text().splitlines()) == 2
+    assert mock_server.state.stats["POST send_file_upload"] == 1
+
+
+def test_async_engine_retries(enex_file, tmp_path):
+    done_file = tmp_path / "done.txt"
+
+    server = start_mock_server(MockServerConfig(server_error_ratio=0.2))
+
+    try:
+        run_upload(
+            server, "--engine", "async", "--done-file", str(done_file), str(enex_file)
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(done_file.read_text().splitlines()) == 2
+
+
+def test_async_client_shares_rate_limiter(mock_server):
+    rate_limiter = RateLimiter(3)
+    client = get_notion_client("fake_token", rate_limiter, mock_server.url)
+
+    async def get_transport():
+        async_client = get_async_notion_client(client, rate_limiter)
+        try:
+            return async_client.client._transport
+        finally:
+            await async_client.aclose()
+
+    transport = asyncio.run(get_transport())
+
+    assert transport.rate_limiter is rate_limiter
+    assert client.client._transport.rate_limiter is rate_limiter
+
+
+def test_async_transport_retry_after(mocker):
+    mock_pause = mocker.patch.object(RateLimiter, "pause")
+    mock_sleep = mocker.patch(
+        "enex2notion.utils_rate_limit.asyncio.sleep", new=mocker.AsyncMock()
+    )
+
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "7"}),
+        httpx.Response(502),
+        httpx.Response(200, json={"ok": True}),
+    ]
+
+    async def handler(request):
+        return responses.pop(0)
+
+    async def get():
+        transport = AsyncRateLimitedTransport(
+            RateLimiter(0), transport=httpx.MockTransport(handler)
+        )
+        async with httpx.AsyncClient(
+            transport=transport, base_url="https://test"
+        ) as client:
+            return await client.get("/test")
+
+    response = asyncio.run(get())
+
+    assert response.json() == {"ok": True}
+    mock_pause.assert_called_once_with(7)
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [2]
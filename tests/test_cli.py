@@ -1,4 +1,5 @@
 import logging
+import threading
 
 import pytest
 from requests import HTTPError
@@ -173,7 +174,7 @@ def test_no_keep_failed(mock_api, fake_note_factory, mocker):
     cli(["--token", "fake_token", "fake.enex"])
 
     mock_api["upload_note"].assert_called_once_with(
-        mocker.ANY, mocker.ANY, mocker.ANY, False
+        mocker.ANY, mocker.ANY, mocker.ANY, False, mocker.ANY
     )
 
 
@@ -181,7 +182,7 @@ def test_keep_failed(mock_api, fake_note_factory, mocker):
     cli(["--token", "fake_token", "--keep-failed", "fake.enex"])
 
     mock_api["upload_note"].assert_called_once_with(
-        mocker.ANY, mocker.ANY, mocker.ANY, True
+        mocker.ANY, mocker.ANY, mocker.ANY, True, mocker.ANY
     )
 
 
@@ -289,6 +290,27 @@ def test_webclip_pdf_with_preview(mock_api, fake_note_factory, mocker, parse_rul
     mock_api["parse_note"].assert_called_once_with(mocker.ANY, parse_rules)
 
 
+def test_parse_ahead_of_upload(mock_api, fake_note_factory, mocker):
+    fake_note_factory.return_value = [
+        mocker.MagicMock(note_hash="fake_hash1", is_webclip=True),
+        mocker.MagicMock(note_hash="fake_hash2", is_webclip=True),
+    ]
+
+    # Both notes must be parsed at once with a single upload slot
+    parse_barrier = threading.Barrier(2, timeout=2)
+
+    def fake_parse(*args):
+        parse_barrier.wait()
+        return ["block"]
+
+    mock_api["parse_note"].side_effect = fake_parse
+
+    args = ["--token", "fake_token", "--pageid", "fake_page", "--upload-jobs", "1"]
+    cli([*args, "--pdf-jobs", "2", "fake.enex"])
+
+    assert mock_api["upload_note"].call_count == 2
+
+
 def test_parse_exception(mock_api, fake_note_factory, caplog):
     fake_exception = Exception("fake")
     mock_api["parse_note"].side_effect = fake_exception
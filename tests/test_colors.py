@@ -0,0 +1,63 @@
+import itertools
+import random
+
+import pytest
+
+from enex2notion.utils_colors import (
+    COLORS_BG,
+    COLORS_FG,
+    CUBE_MIXED,
+    CUBE_SIZE,
+    ColorLookup,
+    _closest_color,
+)
+
+
+@pytest.mark.parametrize("colors", [COLORS_FG, COLORS_BG])
+def test_color_lookup_sample(colors):
+    lookup = ColorLookup(colors)
+    rng = random.Random(0)
+
+    for _ in range(10000):
+        rgb = tuple(rng.randrange(256) for _ in range(3))
+
+        assert lookup.get(rgb) == _closest_color(colors, rgb)
+
+
+@pytest.mark.parametrize("rgb", [(300, 0, 0), (-10, 120, 200), (0, 256, 0)])
+def test_color_lookup_out_of_range(rgb):
+    lookup = ColorLookup(COLORS_FG)
+
+    assert lookup.get(rgb) == _closest_color(COLORS_FG, rgb)
+
+
+@pytest.mark.parametrize("colors", [COLORS_FG, COLORS_BG])
+def test_color_lookup_all_colors(colors):
+    """Every cube with a colour must be nearest to it in all of its points
+
+    Distance difference between two colours is linear, so a colour nearest
+    in all 8 corners of a cube is nearest in the whole cube too.
+    Mixed cubes are searched with _closest_color itself.
+    """
+
+    lookup = ColorLookup(colors)
+
+    mixed_cubes = 0
+    for cube_start in itertools.product(range(0, 256, CUBE_SIZE), repeat=3):
+        color_name = lookup.get(cube_start)
+
+        corner_colors = {
+            _closest_color(colors, corner)
+            for corner in itertools.product(
+                *((c, c + CUBE_SIZE - 1) for c in cube_start)
+            )
+        }
+
+        if lookup.cubes[lookup.get_cube(cube_start)] == CUBE_MIXED:
+            mixed_cubes += 1
+            assert len(corner_colors) > 1
+        else:
+            assert corner_colors == {color_name}
+
+    # Only cubes crossing a palette boundary fall back to the full search
+    assert mixed_cubes < len(lookup.cubes) // 5
@@ -0,0 +1,26 @@
+from benchmarks.enex_generator import GeneratorConfig, write_enex
+from enex2notion.enex_parser import count_notes, iter_notes
+
+
+def test_generator_reproducible(tmp_path):
+    config = GeneratorConfig(notes=5, attachment_size=64, seed=1)
+
+    enex1 = write_enex(tmp_path / "1.enex", config)
+    enex2 = write_enex(tmp_path / "2.enex", config)
+
+    assert enex1.read_text() == enex2.read_text()
+
+
+def test_generator_parsed(tmp_path):
+    config = GeneratorConfig(
+        notes=10, webclip_ratio=0.5, attachments=2, attachment_size=100, seed=1
+    )
+
+    enex_file = write_enex(tmp_path / "test.enex", config)
+    notes = list(iter_notes(enex_file))
+
+    assert count_notes(enex_file) == 10
+    assert 0 < sum(n.is_webclip for n in notes) < 10
+    assert all(len(n.resources) == 2 for n in notes)
+    assert all(r.size == 100 for n in notes for r in n.resources)
+    assert all(r.md5 in n.content for n in notes for r in n.resources)
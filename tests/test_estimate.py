@@ -0,0 +1,82 @@
+import logging
+
+from enex2notion.cli import cli
+from enex2notion.cli_estimate import UploadEstimate, estimate_payloads
+from enex2notion.enex_uploader_block import build_block_payloads
+from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
+from enex2notion.notion_blocks.uploadable import NotionImageBlock
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+
+
+def test_estimate_payloads(smallest_gif):
+    parent = NotionTextBlock(text_prop=TextProp("parent"))
+    parent.children.append(NotionTextBlock(text_prop=TextProp("child")))
+
+    blocks = [
+        *(NotionTextBlock(text_prop=TextProp(str(i))) for i in range(60)),
+        parent,
+        NotionImageBlock(resource=smallest_gif),
+    ]
+
+    estimate = estimate_payloads(build_block_payloads(blocks))
+
+    assert estimate.pages == 1
+    assert estimate.appends == 5
+    assert estimate.blocks == 63
+    assert estimate.files == 1
+    assert estimate.file_bytes == smallest_gif.size
+    assert estimate.payload_bytes > 0
+    assert estimate.requests == 3 + 5 + 2
+
+
+def test_estimate_wall_time():
+    estimate = UploadEstimate(requests=30)
+
+    assert estimate.get_wall_time(3) == 10
+    assert estimate.get_wall_time(0) is None
+
+
+def test_estimate_cli(enex_file, caplog):
+    with caplog.at_level(logging.INFO, logger="enex2notion"):
+        cli(["--estimate", "--rate-limit", "1", str(enex_file)])
+
+    summary = caplog.text.split("Upload estimate:\n")[1].splitlines()
+
+    assert summary[0].split()[:3] == ["notebook", "notes", "pages"]
+    assert summary[1].split()[:3] == ["notebook", "3", "2"]
+    assert summary[2].split()[:3] == ["TOTAL", "3", "2"]
+    assert summary[2].split()[-1] == "0:00:13"
+
+
+def test_estimate_matches_upload(enex_file, caplog):
+    with caplog.at_level(logging.INFO, logger="enex2notion"):
+        cli(["--estimate", str(enex_file)])
+
+    estimated_requests = int(caplog.text.splitlines()[-1].split()[-2])
+
+    server = start_mock_server(MockServerConfig())
+
+    try:
+        cli(
+            [
+                "--token",
+                "fake_token",
+                "--pageid",
+                ROOT_PAGE_ID,
+                "--notion-base-url",
+                server.url,
+                "--rate-limit",
+                "0",
+                str(enex_file),
+            ]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Token check and root page lookup are not part of the estimate
+    assert server.state.stats["requests"] - 2 == estimated_requests
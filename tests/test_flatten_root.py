@@ -0,0 +1,70 @@
+from enex2notion.note_parser import blocks_helpers, webclip_stages_flatten
+from enex2notion.note_parser.webclip import parse_webclip
+
+# Old Evernote notes can nest divs this deep, well past the recursion limit
+DEEP_NESTING = 1500
+
+
+def test_note_deep_divs(parse_html):
+    test_note = parse_html(
+        "<div>" * DEEP_NESTING
+        + "<div>test1</div><span>test2</span>"
+        + "</div>" * DEEP_NESTING
+        + "<div></div>"
+    )
+
+    blocks_helpers.flatten_root(test_note)
+
+    assert str(test_note) == "<div>test1</div><div><span>test2</span></div>"
+
+
+def test_note_keeps_special_divs(parse_html):
+    test_note = parse_html(
+        "<div><div>test1</div>"
+        '<div style="--en-codeblock:true"><div>code</div></div></div>'
+    )
+
+    blocks_helpers.flatten_root(test_note)
+
+    assert str(test_note) == (
+        '<div>test1</div><div style="--en-codeblock:true"><div>code</div></div>'
+    )
+
+
+def test_webclip_deep_inline(parse_html):
+    test_note = parse_html(
+        "<b>" * DEEP_NESTING + "test1<div>test2</div>test3" + "</b>" * DEEP_NESTING
+    )
+
+    webclip_stages_flatten.flatten_root(test_note)
+
+    assert [str(c) for c in test_note.children] == [
+        "<b>test1</b>",
+        "<div>test2</div>",
+        "<b>test3</b>",
+    ]
+
+
+def test_webclip_split_keeps_attributes(parse_html):
+    test_note = parse_html(
+        '<span class="c1">test1<div>test2</div><img src="test.png"/>test3</span>'
+    )
+
+    webclip_stages_flatten.flatten_root(test_note)
+
+    assert str(test_note) == (
+        '<span class="c1">test1</span><div>test2</div>'
+        '<img src="test.png"/><span class="c1">test3</span>'
+    )
+
+
+def test_parse_webclip_deep_nesting(parse_html):
+    test_note = parse_html(
+        "<div><span>" * DEEP_NESTING
+        + "test1<div>test2</div>"
+        + "</span></div>" * DEEP_NESTING
+    )
+
+    blocks = parse_webclip(test_note)
+
+    assert [b.text_prop.text for b in blocks] == ["test1", "test2"]
@@ -0,0 +1,131 @@
+import json
+
+import httpx
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.cli_args import parse_listen_address
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+from enex2notion.utils_metrics import MetricsExporter
+from enex2notion.utils_stats import RunStats
+
+
+@pytest.fixture()
+def stats():
+    stats = RunStats()
+
+    stats.set_gauge("notes_planned", 4)
+    stats.incr("notes_done")
+    stats.incr("http_429", 2)
+    stats.add_timing('webclip."quoted"', 0.5)
+
+    return stats
+
+
+def test_parse_listen_address():
+    assert parse_listen_address("9100") == ("127.0.0.1", 9100)
+    assert parse_listen_address(":9100") == ("127.0.0.1", 9100)
+    assert parse_listen_address("0.0.0.0:9100") == ("0.0.0.0", 9100)
+
+
+def test_metrics_json(stats):
+    metrics = MetricsExporter(stats).get_json()
+
+    assert metrics["notes_left"] == 3
+    assert metrics["eta_seconds"] == pytest.approx(metrics["duration"] * 3)
+    assert metrics["stages"] == {'webclip."quoted"': {"count": 1, "total": 0.5}}
+
+
+def test_metrics_prometheus(stats):
+    metrics = MetricsExporter(stats).get_prometheus().splitlines()
+
+    assert "# TYPE enex2notion_notes_done_total counter" in metrics
+    assert "enex2notion_notes_done_total 1" in metrics
+    assert "enex2notion_notes_planned 4" in metrics
+    assert "enex2notion_notes_left 3" in metrics
+    assert 'enex2notion_http_retried_responses_total{status="429"} 2' in metrics
+    assert (
+        'enex2notion_stage_seconds_total{stage="webclip.\\"quoted\\""} 0.5' in metrics
+    )
+    assert 'enex2notion_stage_calls_total{stage="webclip.\\"quoted\\""} 1' in metrics
+
+
+def test_metrics_server(stats):
+    exporter = MetricsExporter(stats)
+    exporter.start(listen=("127.0.0.1", 0))
+
+    host, port = exporter.server.server_address[:2]
+
+    try:
+        metrics_json = httpx.get(f"http://{host}:{port}/metrics.json").json()
+        metrics_text = httpx.get(f"http://{host}:{port}/metrics")
+        not_found = httpx.get(f"http://{host}:{port}/")
+    finally:
+        exporter.stop()
+
+    assert metrics_json["notes_left"] == 3
+    assert metrics_text.headers["Content-Type"].startswith("text/plain")
+    assert "enex2notion_notes_planned 4" in metrics_text.text
+    assert not_found.status_code == 404
+
+
+def test_metrics_file_cli(enex_file, tmp_path):
+    server = start_mock_server(MockServerConfig())
+
+    metrics_file = tmp_path / "enex2notion.prom"
+
+    try:
+        cli(
+            [
+                "--token",
+                "fake_token",
+                "--pageid",
+                ROOT_PAGE_ID,
+                "--notion-base-url",
+                server.url,
+                "--rate-limit",
+                "0",
+                "--metrics-file",
+                str(metrics_file),
+                str(enex_file),
+            ]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    metrics = metrics_file.read_text().splitlines()
+
+    assert "enex2notion_notes_done_total 2" in metrics
+    assert "enex2notion_notes_planned 3.0" in metrics
+    assert "enex2notion_notes_left 0.0" in metrics
+    assert "enex2notion_http_in_flight 0.0" in metrics
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("enex2")] == [
+        "enex2notion.prom"
+    ]
+
+
+def test_metrics_port_in_use(enex_file, caplog):
+    busy_exporter = MetricsExporter(RunStats())
+    busy_exporter.start(listen=("127.0.0.1", 0))
+    busy_port = busy_exporter.server.server_address[1]
+
+    try:
+        with pytest.raises(SystemExit):
+            cli(["--metrics-listen", str(busy_port), str(enex_file)])
+    finally:
+        busy_exporter.stop()
+
+    assert "Failed to start metrics server" in caplog.text
+
+
+def test_metrics_disabled(tmp_path):
+    exporter = MetricsExporter(RunStats())
+    exporter.start()
+    exporter.stop()
+
+    assert json.dumps(exporter.get_json())
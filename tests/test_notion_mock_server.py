@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+
+
+@pytest.fixture()
+def mock_server_factory():
+    servers = []
+
+    def factory(**config):
+        server = start_mock_server(MockServerConfig(**config))
+        servers.append(server)
+        return server
+
+    yield factory
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def api(server, method, path, **kwargs):
+    return httpx.request(
+        method,
+        f"{server.url}/v1/{path}",
+        headers={"Authorization": "Bearer fake_token"},
+        **kwargs,
+    )
+
+
+def get_children(server, block_id):
+    return api(server, "GET", f"blocks/{block_id}/children").json()["results"]
+
+
+def test_upload_end_to_end(enex_file, mock_server_factory):
+    server = mock_server_factory()
+
+    cli(
+        [
+            "--token",
+            "fake_token",
+            "--pageid",
+            ROOT_PAGE_ID,
+            "--notion-base-url",
+            server.url,
+            "--rate-limit",
+            "0",
+            str(enex_file),
+        ]
+    )
+
+    (notebook,) = get_children(server, ROOT_PAGE_ID)
+    assert notebook["child_page"]["title"] == "notebook"
+
+    note1, note2 = sorted(
+        get_children(server, notebook["id"]), key=lambda b: b["child_page"]["title"]
+    )
+    assert note1["child_page"]["title"] == "test1"
+
+    note1_page = api(server, "GET", f"pages/{note1['id']}").json()
+    assert note1_page["properties"]["title"]["title"][0]["plain_text"] == "test1"
+
+    text_block, list_block = get_children(server, note1["id"])
+    assert text_block["paragraph"]["rich_text"][0]["plain_text"] == "test1"
+    assert list_block["type"] == "bulleted_list_item"
+
+    _, image_block = get_children(server, note2["id"])
+    assert image_block["image"]["type"] == "file_upload"
+
+    assert server.state.stats["POST send_file_upload"] == 1
+    assert server.state.stats["blocks_created"] == 4
+    assert server.state.stats["bytes_received"] > 0
+
+
+def test_rate_limited(mock_server_factory):
+    server = mock_server_factory(rate_limited_ratio=1, retry_after=7)
+
+    response = api(server, "GET", "users")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["code"] == "rate_limited"
+
+
+def test_server_errors(mock_server_factory):
+    server = mock_server_factory(server_error_ratio=1)
+
+    assert api(server, "GET", "users").status_code == 503
+    assert server.state.stats["injected_5xx"] == 1
+
+
+def test_stats_concurrent_requests(mock_server_factory):
+    server = mock_server_factory()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: api(server, "GET", "users"), range(80)))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert server.state.get_stats()["requests"] == 80
+    assert server.state.get_stats()["GET list_users"] == 80
+
+
+def test_unauthorized(mock_server_factory):
+    server = mock_server_factory(token="good_token")
+
+    assert api(server, "GET", "users").status_code == 401
+
+
+def test_children_limit(mock_server_factory):
+    server = mock_server_factory()
+
+    paragraph = {
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"text": {"content": "test"}}]},
+    }
+
+    response = api(
+        server,
+        "PATCH",
+        f"blocks/{ROOT_PAGE_ID}/children",
+        json={"children": [paragraph] * 101},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "validation_error"
+
+
+def test_text_limit(mock_server_factory):
+    server = mock_server_factory()
+
+    paragraph = {
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"text": {"content": "x" * 2001}}]},
+    }
+
+    response = api(
+        server,
+        "PATCH",
+        f"blocks/{ROOT_PAGE_ID}/children",
+        json={"children": [paragraph]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_children_not_supported(mock_server_factory):
+    server = mock_server_factory()
+
+    heading = {
+        "type": "heading_1",
+        "heading_1": {"rich_text": [{"text": {"content": "test"}}]},
+    }
+
+    (created,) = api(
+        server,
+        "PATCH",
+        f"blocks/{ROOT_PAGE_ID}/children",
+        json={"children": [heading]},
+    ).json()["results"]
+
+    response = api(
+        server,
+        "PATCH",
+        f"blocks/{created['id']}/children",
+        json={"children": [heading]},
+    )
+
+    assert response.status_code == 400
+    assert "does not support children" in response.json()["message"]
+
+
+def test_pagination(mock_server_factory):
+    server = mock_server_factory()
+
+    paragraph = {"type": "paragraph", "paragraph": {"rich_text": []}}
+    for _ in range(3):
+        api(
+            server,
+            "PATCH",
+            f"blocks/{ROOT_PAGE_ID}/children",
+            json={"children": [paragraph] * 50},
+        )
+
+    first = api(server, "GET", f"blocks/{ROOT_PAGE_ID}/children").json()
+    second = api(
+        server,
+        "GET",
+        f"blocks/{ROOT_PAGE_ID}/children",
+        params={"start_cursor": first["next_cursor"]},
+    ).json()
+
+    assert len(first["results"]) == 100
+    assert first["has_more"]
+    assert len(second["results"]) == 50
+    assert not second["has_more"]
@@ -0,0 +1,120 @@
+import os
+from datetime import datetime
+
+from dateutil.tz import tzutc
+
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.note_parser.note import parse_note
+from enex2notion.note_parser.webclip_pdf_cache import (
+    RenderCache,
+    cached_render,
+    get_render_key,
+)
+from enex2notion.utils_stats import run_stats
+
+
+def make_webclip(content="<en-note><div>test</div></en-note>"):
+    return EvernoteNote(
+        title="test1",
+        created=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        updated=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        content=content,
+        tags=[],
+        author="",
+        url="",
+        is_webclip=True,
+        resources=[],
+    )
+
+
+def test_render_cache_get_put(tmp_path):
+    cache = RenderCache(tmp_path, 100)
+
+    assert cache.get("key1") is None
+
+    cache.put("key1", b"data")
+
+    assert cache.get("key1") == b"data"
+    assert RenderCache(tmp_path, 100).get("key1") == b"data"
+    assert [f.name for f in tmp_path.iterdir()] == ["key1"]
+
+
+def test_render_cache_evicts_least_recent(tmp_path):
+    cache = RenderCache(tmp_path, 10)
+
+    cache.put("key1", b"1111")
+    cache.put("key2", b"2222")
+    os.utime(tmp_path / "key1", (0, 0))
+    os.utime(tmp_path / "key2", (1, 1))
+
+    cache.get("key1")
+    cache.put("key3", b"3333")
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["key1", "key3"]
+
+
+def test_render_cache_evicts_to_low_water(tmp_path, mocker):
+    cache = RenderCache(tmp_path, 100)
+    iter_spy = mocker.spy(cache, "_iter_stats")
+
+    for i in range(11):
+        cache.put(f"key{i:02d}", b"0123456789")
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        f"key{i:02d}" for i in range(2, 11)
+    ]
+    assert iter_spy.call_count == 0
+
+
+def test_render_cache_too_big(tmp_path):
+    cache = RenderCache(tmp_path, 2)
+
+    cache.put("key1", b"data")
+
+    assert cache.get("key1") is None
+
+
+def test_render_key():
+    note = make_webclip()
+
+    assert get_render_key(note, "pdf") != get_render_key(note, "png")
+    assert get_render_key(note, "pdf") == get_render_key(make_webclip(), "pdf")
+    assert get_render_key(note, "pdf") != get_render_key(
+        make_webclip(content="<en-note>changed</en-note>"), "pdf"
+    )
+
+
+def test_cached_render(tmp_path, mocker):
+    render = mocker.Mock(return_value=b"%PDF")
+    cache = RenderCache(tmp_path, 100)
+
+    assert cached_render(cache, "key1", render) == b"%PDF"
+    assert cached_render(cache, "key1", render) == b"%PDF"
+    assert cached_render(None, "key1", render) == b"%PDF"
+
+    assert render.call_count == 2
+
+
+def test_parse_webclip_cached(tmp_path, mocker, parse_rules):
+    mock_render = mocker.patch(
+        "enex2notion.note_parser.webclip_pdf.render_pdf", return_value=b"%PDF"
+    )
+    mock_preview = mocker.patch(
+        "enex2notion.note_parser.webclip_pdf._get_pdf_first_page_png",
+        return_value=b"PNG",
+    )
+    mocker.patch("enex2notion.note_parser.note.resolve_resources")
+
+    parse_rules.mode_webclips = "PDF"
+    parse_rules.add_pdf_preview = True
+    parse_rules.render_cache = tmp_path / "cache"
+
+    hits_before = run_stats.counters["render_cache_hits"]
+
+    first_blocks = parse_note(make_webclip(), parse_rules)
+    second_blocks = parse_note(make_webclip(), parse_rules)
+
+    assert first_blocks == second_blocks
+    mock_render.assert_called_once()
+    mock_preview.assert_called_once()
+    assert run_stats.counters["render_cache_hits"] - hits_before == 2
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import fitz
+import pytest
+from dateutil.tz import tzutc
+
+from enex2notion.enex_types import EvernoteNote
+from enex2notion.note_parser.note import parse_note
+from enex2notion.note_parser.webclip_pdf_preview import (
+    rasterize_first_page,
+    render_preview,
+)
+
+
+@pytest.fixture(scope="module")
+def pdf_bin():
+    with fitz.open() as doc:
+        page = doc.new_page(width=600, height=800)
+        page.insert_text((50, 50), "test")
+
+        return doc.tobytes()
+
+
+def get_image_size(image_bin):
+    pix = fitz.Pixmap(image_bin)
+
+    return pix.width, pix.height
+
+
+def test_rasterize_png(pdf_bin):
+    image_bin = rasterize_first_page(pdf_bin, 0, "png")
+
+    assert image_bin.startswith(b"\x89PNG")
+    assert get_image_size(image_bin) == (600, 800)
+
+
+def test_rasterize_scaled_jpeg(pdf_bin):
+    image_bin = rasterize_first_page(pdf_bin, 300, "jpeg")
+
+    assert image_bin.startswith(b"\xff\xd8")
+    assert get_image_size(image_bin) == (300, 400)
+
+
+def test_render_preview_pool(pdf_bin):
+    image_bin = render_preview(pdf_bin, 150, "png", jobs=1)
+
+    assert get_image_size(image_bin) == (150, 200)
+
+
+def test_preview_block_format(mocker, parse_rules):
+    mocker.patch("enex2notion.note_parser.webclip_pdf.render_pdf", return_value=b"")
+    mock_preview = mocker.patch(
+        "enex2notion.note_parser.webclip_pdf.render_preview", return_value=b"JPEG"
+    )
+    mocker.patch("enex2notion.note_parser.note.resolve_resources")
+
+    test_note = EvernoteNote(
+        title="test1",
+        created=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        updated=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        content="<en-note><div>test</div></en-note>",
+        tags=[],
+        author="",
+        url="",
+        is_webclip=True,
+        resources=[],
+    )
+
+    parse_rules.mode_webclips = "PDF"
+    parse_rules.add_pdf_preview = True
+    parse_rules.pdf_preview_width = 400
+    parse_rules.pdf_preview_format = "jpeg"
+
+    preview_block = parse_note(test_note, parse_rules)[0]
+
+    mock_preview.assert_called_once_with(b"", 400, "jpeg", 0)
+    assert preview_block.resource.mime == "image/jpeg"
+    assert preview_block.resource.file_name.endswith(".jpeg")
@@ -0,0 +1,84 @@
+import sys
+
+import pytest
+from pdfkit.configuration import Configuration
+
+from enex2notion.note_parser.webclip_pdf_render import PdfRenderPool, render_pdf
+from enex2notion.utils_exceptions import PdfRenderException
+
+FAKE_WKHTMLTOPDF = """#!{python}
+import os
+import sys
+import time
+
+html = sys.stdin.read()
+mode = os.environ.get("FAKE_WKHTMLTOPDF_MODE", "")
+
+if mode == "crash":
+    sys.stderr.write("Segmentation fault")
+    sys.exit(139)
+if mode == "hang":
+    time.sleep(30)
+
+sys.stdout.write("%PDF-1.4 " + html)
+sys.exit(1 if mode == "partial" else 0)
+"""
+
+
+@pytest.fixture()
+def fake_wkhtmltopdf(tmp_path, monkeypatch):
+    if sys.platform == "win32":
+        pytest.skip("fake wkhtmltopdf is a shell script")
+
+    wkhtmltopdf = tmp_path / "wkhtmltopdf"
+    wkhtmltopdf.write_text(FAKE_WKHTMLTOPDF.format(python=sys.executable))
+    wkhtmltopdf.chmod(0o755)
+
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=":")
+
+    return wkhtmltopdf
+
+
+def test_render(fake_wkhtmltopdf):
+    assert render_pdf("<div>test</div>", jobs=2) == b"%PDF-1.4 <div>test</div>"
+
+
+def test_render_partial(fake_wkhtmltopdf, monkeypatch):
+    monkeypatch.setenv("FAKE_WKHTMLTOPDF_MODE", "partial")
+
+    assert render_pdf("<div>test</div>").startswith(b"%PDF")
+
+
+def test_render_crash(fake_wkhtmltopdf, monkeypatch):
+    monkeypatch.setenv("FAKE_WKHTMLTOPDF_MODE", "crash")
+
+    pool = PdfRenderPool(jobs=1)
+
+    with pytest.raises(PdfRenderException, match="exit code 139: Segmentation fault"):
+        pool.render("<div>test</div>")
+
+    monkeypatch.delenv("FAKE_WKHTMLTOPDF_MODE")
+
+    assert pool.render("<div>next</div>") == b"%PDF-1.4 <div>next</div>"
+
+
+def test_render_timeout(fake_wkhtmltopdf, monkeypatch):
+    monkeypatch.setenv("FAKE_WKHTMLTOPDF_MODE", "hang")
+
+    with pytest.raises(PdfRenderException, match="timed out"):
+        PdfRenderPool(jobs=1, timeout=0.5).render("<div>test</div>")
+
+
+def test_pool_jobs():
+    assert PdfRenderPool(jobs=3).jobs == 3
+    assert PdfRenderPool().jobs >= 1
+
+
+def test_pool_configuration_once(fake_wkhtmltopdf, mocker):
+    configuration_spy = mocker.spy(Configuration, "__init__")
+
+    pool = PdfRenderPool(jobs=2)
+    pool.render("<div>first</div>")
+    pool.render("<div>second</div>")
+
+    assert configuration_spy.call_count == 1
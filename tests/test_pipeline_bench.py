@@ -0,0 +1,28 @@
+import os
+
+from benchmarks.enex_generator import GeneratorConfig, write_enex
+from benchmarks.pipeline import PipelineKnobs, format_report_row, sweep
+
+
+def test_pipeline_sweep(tmp_path, monkeypatch):
+    monkeypatch.delenv("TQDM_DISABLE", raising=False)
+
+    enex_file = write_enex(
+        tmp_path / "bench.enex", GeneratorConfig(notes=3, attachment_size=64)
+    )
+    knobs_list = [
+        PipelineKnobs(concurrency=1, batch_size=10, rate_limit=0),
+        PipelineKnobs(concurrency=2, batch_size=50, rate_limit=0),
+    ]
+
+    results = list(sweep(enex_file, 3, knobs_list))
+
+    small_batch, big_batch = results
+
+    assert small_batch["server"]["POST create_page"] == 4
+    assert small_batch["blocks_per_sec"] > 0
+    assert small_batch["mb_uploaded"] > 0
+    assert small_batch["requests_per_note"] > big_batch["requests_per_note"]
+    assert set(small_batch["stages"]) >= {"parse", "upload", "notebook"}
+    assert format_report_row(big_batch).startswith("2\t50\t0\t")
+    assert "TQDM_DISABLE" not in os.environ
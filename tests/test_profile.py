@@ -0,0 +1,113 @@
+import pstats
+import threading
+
+from enex2notion.cli import cli
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+from enex2notion.utils_profile import StageProfiler
+
+
+def profiled_work():
+    return sum(range(1000))
+
+
+def test_cpu_profile_threads(tmp_path):
+    profiler = StageProfiler()
+    profiler.start("cpu", tmp_path)
+
+    # Holds the first worker inside the profiled block until the second one
+    # arrives, gives up if profiled sections are run one at a time
+    overlap = threading.Barrier(2, timeout=0.5)
+    errors = []
+
+    def worker():
+        try:
+            with profiler.profile("stage"):
+                profiled_work()
+                try:
+                    overlap.wait()
+                except threading.BrokenBarrierError:
+                    pass
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    profiler.stop()
+
+    stats = pstats.Stats(str(tmp_path / "stage.pstats"))
+    calls = [v[1] for k, v in stats.stats.items() if k[2] == "profiled_work"]
+
+    assert errors == []
+    assert calls == [2]
+
+
+def test_profile_disabled(tmp_path):
+    profiler = StageProfiler()
+    profiler.start(None, tmp_path / "profile")
+
+    with profiler.profile("stage"):
+        profiled_work()
+    profiler.checkpoint("stage")
+
+    profiler.stop()
+
+    assert not (tmp_path / "profile").exists()
+
+
+def test_mem_checkpoints(tmp_path):
+    profiler = StageProfiler()
+    profiler.start("mem", tmp_path, every=2)
+
+    for idx in range(3):
+        profiler.checkpoint("parse", f"note{idx}")
+
+    profiler.stop()
+
+    report = (tmp_path / "memory.txt").read_text()
+
+    assert report.startswith("Peak traced memory:")
+    assert "after parse #1 'note0'" in report
+    assert "note1" not in report
+    assert "after parse #3 'note2'" in report
+
+
+def test_profile_cli(enex_file, tmp_path):
+    server = start_mock_server(MockServerConfig())
+
+    profile_dir = tmp_path / "profile"
+
+    try:
+        cli(
+            [
+                "--token",
+                "fake_token",
+                "--pageid",
+                ROOT_PAGE_ID,
+                "--notion-base-url",
+                server.url,
+                "--rate-limit",
+                "0",
+                "--profile",
+                "cpu",
+                "--profile-dir",
+                str(profile_dir),
+                str(enex_file),
+            ]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sorted(p.name for p in profile_dir.iterdir()) == [
+        "parse.pstats",
+        "read.pstats",
+        "upload.pstats",
+    ]
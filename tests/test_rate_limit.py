@@ -0,0 +1,140 @@
+import time
+
+import httpx
+import pytest
+
+from enex2notion.utils_rate_limit import RateLimitedTransport, RateLimiter
+
+
+def make_client(responses, max_retries=5, rate=0):
+    requests_log = []
+
+    def handler(request):
+        requests_log.append(request)
+
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    transport = RateLimitedTransport(
+        RateLimiter(rate),
+        transport=httpx.MockTransport(handler),
+        max_retries=max_retries,
+    )
+
+    return httpx.Client(transport=transport, base_url="https://test"), requests_log
+
+
+def test_rate_limiter_pacing(mocker):
+    mock_sleep = mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    limiter = RateLimiter(2)
+    for _ in range(3):
+        limiter.acquire()
+
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+
+    assert len(delays) == 2
+    assert delays[-1] == pytest.approx(1, abs=0.1)
+
+
+def test_rate_limiter_pause():
+    limiter = RateLimiter(0)
+    limiter.pause(0.2)
+
+    start = time.monotonic()
+    limiter.acquire()
+
+    assert time.monotonic() - start >= 0.15
+
+
+def test_retry_after(mocker):
+    mock_pause = mocker.patch.object(RateLimiter, "pause")
+
+    client, requests_log = make_client(
+        [
+            httpx.Response(429, headers={"Retry-After": "7"}),
+            httpx.Response(200, json={"ok": True}),
+        ]
+    )
+
+    response = client.get("/test")
+
+    assert response.json() == {"ok": True}
+    assert len(requests_log) == 2
+    mock_pause.assert_called_once_with(7)
+
+
+def test_server_error_backoff(mocker):
+    mock_sleep = mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client(
+        [httpx.Response(502), httpx.Response(503), httpx.Response(200)]
+    )
+
+    assert client.get("/test").status_code == 200
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [1, 2]
+
+
+def test_retries_exhausted(mocker):
+    mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client(
+        [httpx.Response(500), httpx.Response(500)], max_retries=1
+    )
+
+    assert client.get("/test").status_code == 500
+    assert len(requests_log) == 2
+
+
+def test_non_idempotent_server_error_not_retried(mocker):
+    mock_sleep = mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client([httpx.Response(503), httpx.Response(200)])
+
+    assert client.patch("/test").status_code == 503
+    assert len(requests_log) == 1
+    mock_sleep.assert_not_called()
+
+
+def test_non_idempotent_rate_limited_retried(mocker):
+    mocker.patch.object(RateLimiter, "pause")
+
+    client, requests_log = make_client(
+        [httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200)]
+    )
+
+    assert client.patch("/test").status_code == 200
+    assert len(requests_log) == 2
+
+
+def test_non_idempotent_connect_error_retried(mocker):
+    mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client(
+        [httpx.ConnectError("refused"), httpx.Response(200)]
+    )
+
+    assert client.post("/test").status_code == 200
+    assert len(requests_log) == 2
+
+
+def test_non_idempotent_read_error_not_retried(mocker):
+    mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client([httpx.ReadError("reset"), httpx.Response(200)])
+
+    with pytest.raises(httpx.ReadError):
+        client.patch("/test")
+
+    assert len(requests_log) == 1
+
+
+def test_idempotent_read_error_retried(mocker):
+    mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+
+    client, requests_log = make_client([httpx.ReadError("reset"), httpx.Response(200)])
+
+    assert client.get("/test").status_code == 200
+    assert len(requests_log) == 2
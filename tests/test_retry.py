@@ -0,0 +1,115 @@
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.cli_upload import get_retry_delay
+from enex2notion.enex_uploader import UploadProgress, upload_note
+from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
+from enex2notion.utils_exceptions import NoteUploadFailException
+
+
+def test_retry_delay():
+    assert [get_retry_delay(a) for a in range(1, 8)] == [2, 4, 8, 16, 32, 60, 60]
+
+
+def test_retry_deferred(make_note, mock_upload_api):
+    mock_upload_api["iter_notes"].return_value = [make_note("a"), make_note("b")]
+    mock_upload_api["upload_note"].side_effect = [
+        NoteUploadFailException,
+        "page_b",
+        "page_a",
+    ]
+
+    cli(["--token", "t", "--pageid", "p", "--upload-jobs", "1", "fake.enex"])
+
+    calls = mock_upload_api["upload_note"].call_args_list
+
+    assert [c.args[1].title for c in calls] == ["a", "b", "a"]
+    assert calls[0].args[4] is calls[2].args[4]
+    mock_upload_api["discard_note_upload"].assert_not_called()
+
+
+def test_retry_exhausted(make_note, mock_upload_api, caplog):
+    mock_upload_api["iter_notes"].return_value = [make_note("a")]
+    mock_upload_api["upload_note"].side_effect = NoteUploadFailException
+
+    cli(["--token", "t", "--pageid", "p", "--retry", "3", "--skip-failed", "f.enex"])
+
+    assert mock_upload_api["upload_note"].call_count == 3
+    mock_upload_api["discard_note_upload"].assert_called_once()
+    assert "Failed to upload note 'a' to Notion!" in caplog.text
+
+
+def test_retry_exhausted_raise(make_note, mock_upload_api):
+    mock_upload_api["iter_notes"].return_value = [make_note("a")]
+    mock_upload_api["upload_note"].side_effect = NoteUploadFailException
+
+    with pytest.raises(Exception, match="1 notes failed to upload"):
+        cli(["--token", "t", "--pageid", "p", "--retry", "2", "f.enex"])
+
+    assert mock_upload_api["upload_note"].call_count == 2
+
+
+def test_upload_resume(make_note, mocker):
+    client = mocker.MagicMock()
+    client.search.return_value = {"results": []}
+    client.pages.create.return_value = {"id": "page1"}
+    client.pages.retrieve.return_value = {"id": "page1"}
+    client.blocks.children.append.side_effect = [
+        {"results": [{"id": f"b{i}"} for i in range(50)]},
+        Exception("fake error"),
+        {"results": [{"id": f"b{i}"} for i in range(50, 60)]},
+    ]
+    client.blocks.children.list.return_value = {
+        "results": [{"id": f"b{i}"} for i in range(51)],
+        "has_more": False,
+    }
+    root = {"id": "root", "_client": client}
+
+    note = make_note()
+    blocks = [NotionTextBlock(text_prop=TextProp(str(i))) for i in range(60)]
+    progress = UploadProgress()
+
+    with pytest.raises(NoteUploadFailException):
+        upload_note(root, note, blocks, False, progress)
+
+    assert progress.payloads_done == 50
+    assert progress.blocks_done == 50
+    client.pages.update.assert_not_called()
+
+    assert upload_note(root, note, blocks, False, progress) == "page1"
+
+    client.pages.create.assert_called_once()
+    client.blocks.delete.assert_called_once_with(block_id="b50")
+
+    append_calls = client.blocks.children.append.call_args_list
+    assert len(append_calls[2].kwargs["children"]) == 10
+    assert progress.payloads_done == 60
+
+
+def test_upload_resume_next_run(make_note, mock_upload_api, tmp_path):
+    def fail_midway(root, note, note_blocks, keep_failed, progress):
+        progress.page = {"id": "page1"}
+        progress.page_created = True
+        progress.payloads_total = 2
+        progress.payloads_done = 1
+        progress.blocks_done = 50
+        raise NoteUploadFailException
+
+    args = ["--token", "t", "--pageid", "p", "--state-db", str(tmp_path / "s.db")]
+
+    mock_upload_api["iter_notes"].return_value = [make_note("a")]
+    mock_upload_api["upload_note"].side_effect = fail_midway
+
+    cli([*args, "--retry", "1", "--keep-failed", "--skip-failed", "f.enex"])
+
+    mock_upload_api["upload_note"].side_effect = None
+
+    cli([*args, "f.enex"])
+
+    assert mock_upload_api["upload_note"].call_args.args[4] == UploadProgress(
+        page={"id": "page1"},
+        page_created=True,
+        payloads_total=2,
+        payloads_done=1,
+        blocks_done=50,
+    )
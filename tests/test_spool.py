@@ -0,0 +1,214 @@
+import json
+
+from enex2notion.cli import cli
+from enex2notion.cli_spool import EnexSpooler
+from enex2notion.enex_spool import SpoolFiles, get_spooled_hashes
+from enex2notion.enex_uploader_block import (
+    PENDING_FILE_UPLOAD,
+    build_block_payloads,
+    collect_block_resources,
+    plan_payload_requests,
+    upload_block_payloads,
+)
+from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
+from enex2notion.notion_blocks.uploadable import NotionImageBlock
+
+
+def test_payloads_text():
+    blocks = [NotionTextBlock(text_prop=TextProp("test"))]
+
+    assert build_block_payloads(blocks) == [
+        {
+            "block": {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": [{"type": "text", "text": {"content": "test"}}]
+                },
+            }
+        }
+    ]
+
+
+def test_payloads_children():
+    parent = NotionTextBlock(text_prop=TextProp("parent"))
+    parent.children.append(NotionTextBlock(text_prop=TextProp("child")))
+
+    payloads = build_block_payloads([parent])
+
+    assert len(payloads) == 1
+    assert payloads[0]["children"][0]["block"]["paragraph"]["rich_text"][0] == {
+        "type": "text",
+        "text": {"content": "child"},
+    }
+
+
+def test_payloads_chunked():
+    blocks = [NotionTextBlock(text_prop=TextProp("word " * 1000))]
+
+    payloads = build_block_payloads(blocks)
+
+    assert len(payloads) > 1
+    assert all("children" not in p for p in payloads)
+
+
+def test_payloads_file(smallest_gif):
+    blocks = [NotionImageBlock(resource=smallest_gif)]
+
+    payloads = build_block_payloads(blocks)
+
+    assert payloads == [
+        {
+            "block": {
+                "object": "block",
+                "type": "image",
+                "image": {
+                    "type": "file_upload",
+                    "file_upload": {"id": PENDING_FILE_UPLOAD},
+                },
+            },
+            "file": {
+                "md5": smallest_gif.md5,
+                "file_name": "smallest.gif",
+                "mime": "image/gif",
+                "size": smallest_gif.size,
+            },
+        }
+    ]
+    assert collect_block_resources(blocks) == {smallest_gif.md5: smallest_gif}
+
+
+def test_plan_requests(smallest_gif):
+    blocks = [NotionTextBlock(text_prop=TextProp(str(i))) for i in range(120)]
+    blocks.insert(60, NotionImageBlock(resource=smallest_gif))
+
+    plan = plan_payload_requests(build_block_payloads(blocks))
+
+    assert [len(r) for r in plan] == [50, 10, 1, 50, 10]
+
+
+def test_upload_payloads(mocker, smallest_gif):
+    mock_client = mocker.MagicMock()
+    mock_client.request.return_value = {"id": "fake_upload_id"}
+    mock_client.client.post.return_value.status_code = 200
+    mock_client.client.post.return_value.json.return_value = {"status": "uploaded"}
+    page = {"id": "fake_page", "_client": mock_client}
+
+    blocks = [
+        NotionTextBlock(text_prop=TextProp("test1")),
+        NotionTextBlock(text_prop=TextProp("test2")),
+        NotionImageBlock(resource=smallest_gif),
+    ]
+
+    upload_block_payloads(
+        page, build_block_payloads(blocks), collect_block_resources(blocks)
+    )
+
+    append_calls = mock_client.blocks.children.append.call_args_list
+
+    mock_client.client.post.assert_called_once_with(
+        url="file_uploads/fake_upload_id/send",
+        files={"file": ("smallest.gif", smallest_gif.data_bin, "image/gif")},
+    )
+    assert len(append_calls) == 2
+    assert len(append_calls[0].kwargs["children"]) == 2
+    assert append_calls[1].kwargs["children"][0]["image"] == {
+        "type": "file_upload",
+        "file_upload": {"id": "fake_upload_id"},
+    }
+
+
+def test_spool_pdf_jobs_split(tmp_path, mocker, parse_rules):
+    mocker.patch(
+        "enex2notion.note_parser.webclip_pdf_render.os.cpu_count", return_value=8
+    )
+
+    assert EnexSpooler(tmp_path, parse_rules, 3).rules.pdf_jobs == 2
+    assert EnexSpooler(tmp_path, parse_rules, 16).rules.pdf_jobs == 1
+    assert EnexSpooler(tmp_path, parse_rules).rules.pdf_jobs == 8
+
+    parse_rules.pdf_jobs = 4
+
+    assert EnexSpooler(tmp_path, parse_rules, 2).rules.pdf_jobs == 2
+
+
+def test_spool_cli(enex_file, tmp_path):
+    spool_dir = tmp_path / "spool"
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    notebook_dir = spool_dir / "notebook"
+    note_files = sorted(notebook_dir.glob("*.ndjson"))
+
+    assert len(note_files) == 2
+    assert len(get_spooled_hashes(notebook_dir)) == 2
+
+    page_line, *payload_lines = note_files[1].read_text().splitlines()
+    payload = json.loads(payload_lines[1])
+
+    assert json.loads(page_line)["page"]["title"] == "test2"
+    assert payload["file"]["file_name"] == "smallest.gif"
+    assert (notebook_dir / "files" / payload["file"]["md5"]).exists()
+
+
+def test_spool_cli_resume(enex_file, tmp_path, mocker):
+    spool_dir = tmp_path / "spool"
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    mock_parse = mocker.patch("enex2notion.cli_spool.parse_note", return_value=[])
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    # Empty notes leave nothing in the spool, so only they are parsed again
+    assert [c.args[0].title for c in mock_parse.call_args_list] == ["empty"]
+
+
+def test_replay_cli(enex_file, tmp_path, mocker):
+    spool_dir = tmp_path / "spool"
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    mocker.patch("enex2notion.cli_notion.get_notion_client")
+    mocker.patch("enex2notion.cli_notion.get_import_root")
+    mock_notebook = mocker.patch("enex2notion.cli_upload.get_notebook_page")
+    mock_upload = mocker.patch("enex2notion.cli_replay.upload_note_payloads")
+    mock_parse = mocker.patch("enex2notion.cli_upload.parse_note")
+
+    cli(["replay", "--token", "fake_token", "--pageid", "fake_id", str(spool_dir)])
+
+    mock_parse.assert_not_called()
+    mock_notebook.assert_called_once_with(mocker.ANY, "notebook")
+    assert mock_upload.call_count == 2
+
+    titles = sorted(c.args[1].title for c in mock_upload.call_args_list)
+    assert titles == ["test1", "test2"]
+
+    gif_call = next(c for c in mock_upload.call_args_list if c.args[1].title == "test2")
+    payloads, files = gif_call.args[2], gif_call.args[3]
+    md5 = payloads[1]["file"]["md5"]
+
+    assert isinstance(files, SpoolFiles)
+    assert files[md5].file_name == "smallest.gif"
+    assert files[md5].md5 == md5
+    assert files[md5].size == len(files[md5].data_bin)
+
+
+def test_replay_cli_done_file(enex_file, tmp_path, mocker):
+    spool_dir = tmp_path / "spool"
+    done_file = tmp_path / "done.txt"
+
+    cli(["--spool-dir", str(spool_dir), str(enex_file)])
+
+    mocker.patch("enex2notion.cli_notion.get_notion_client")
+    mocker.patch("enex2notion.cli_notion.get_import_root")
+    mocker.patch("enex2notion.cli_upload.get_notebook_page")
+    mock_upload = mocker.patch("enex2notion.cli_replay.upload_note_payloads")
+
+    replay_args = ["replay", "--token", "fake_token", "--pageid", "fake_id"]
+    replay_args += ["--done-file", str(done_file), str(spool_dir / "notebook")]
+
+    cli(replay_args)
+    cli(replay_args)
+
+    assert mock_upload.call_count == 2
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ("fitz", "pdfkit", "bs4", "notion_client", "httpx", "tqdm")
+
+
+def _get_loaded_heavy_modules(code):
+    check_code = (
+        f"{code}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", check_code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def test_cli_import_is_light():
+    assert _get_loaded_heavy_modules("import enex2notion.cli") == []
+
+
+def test_state_is_light(tmp_path):
+    code = (
+        "from enex2notion.cli import cli\n"
+        "try:\n"
+        f"    cli(['state', {str(tmp_path / 'missing.db')!r}])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+
+    assert _get_loaded_heavy_modules(code) == []
+
+
+def test_parser_without_pdf():
+    code = "import enex2notion.note_parser.note"
+
+    assert _get_loaded_heavy_modules(code) == ["bs4"]
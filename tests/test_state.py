@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from enex2notion.cli import cli
+from enex2notion.cli_state import StateDB
+from enex2notion.utils_exceptions import NoteUploadFailException
+
+
+def upload_notes(state_path, notes):
+    state = StateDB(state_path)
+    for note in notes:
+        state.mark_parsed(note, "notebook", 1)
+        state.mark_uploading(note)
+        state.mark_done(note, f"page-{note.title}", 0.1)
+    state.close()
+
+
+def test_state_lifecycle(make_note, tmp_path):
+    state = StateDB(tmp_path / "state.db")
+    note = make_note()
+
+    state.mark_parsed(note, "notebook", 3)
+    assert note.note_hash not in state
+
+    state.mark_uploading(note)
+    state.mark_failed(note, "fake error", 1.5)
+    state.mark_parsed(note, "notebook", 3)
+    state.mark_uploading(note)
+    state.mark_done(note, "page1", 2.5)
+    state.close()
+
+    state = StateDB(tmp_path / "state.db")
+
+    assert note.note_hash in state
+    assert state.get_page_id(note.note_id) == "page1"
+    assert list(state.iter_notes()) == [
+        ("done", 2, 2.5, "notebook", "test", "page1", None)
+    ]
+
+
+def test_state_done_not_reset(make_note, tmp_path):
+    state = StateDB(tmp_path / "state.db")
+    note = make_note()
+
+    state.mark_parsed(note, "notebook", 1)
+    state.mark_done(note, "page1", 1)
+    state.mark_parsed(note, "notebook", 1)
+
+    assert state.count_by_status() == {"done": 1}
+
+
+def test_state_threads(make_note, tmp_path):
+    state_path = tmp_path / "state.db"
+    state = StateDB(state_path)
+
+    def worker(prefix):
+        for i in range(50):
+            note = make_note(title=f"{prefix}{i}")
+            state.mark_parsed(note, "notebook", 1)
+            state.mark_uploading(note)
+            state.mark_done(note, "page", 0.1)
+
+    threads = [threading.Thread(target=worker, args=(str(t),)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    state.close()
+
+    assert StateDB(state_path).count_by_status() == {"done": 400}
+
+
+def test_state_processes(make_note, tmp_path):
+    state_path = tmp_path / "state.db"
+    StateDB(state_path).close()
+
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        futures = [
+            pool.submit(
+                upload_notes,
+                state_path,
+                [make_note(title=f"{prefix}{i}") for i in range(100)],
+            )
+            for prefix in "abc"
+        ]
+        for future in futures:
+            future.result()
+
+    assert StateDB(state_path).count_by_status() == {"done": 300}
+
+
+def test_state_no_open_transaction(make_note, tmp_path, mocker):
+    mocker.patch("enex2notion.cli_state.BUSY_TIMEOUT", 0.1)
+
+    state_path = tmp_path / "state.db"
+    state = StateDB(state_path)
+    other = StateDB(state_path)
+
+    note = make_note(title="first")
+    state.mark_parsed(note, "notebook", 1)
+    state.mark_uploading(note)
+
+    other_note = make_note(title="second")
+    other.mark_parsed(other_note, "notebook", 1)
+    other.mark_done(other_note, "page2", 0.1)
+    other.flush()
+
+    state.mark_done(note, "page1", 0.1)
+    state.flush()
+
+    assert other.count_by_status() == {"done": 2}
+    assert note.note_hash in other
+
+    state.close()
+    other.close()
+
+
+def test_state_cli_upload(make_note, mock_upload_api, tmp_path, capsys):
+    state_path = tmp_path / "state.db"
+    args = ["--token", "t", "--pageid", "p", "--state-db", str(state_path)]
+
+    mock_upload_api["iter_notes"].return_value = [
+        make_note(title="good"),
+        make_note(title="bad"),
+    ]
+    mock_upload_api["upload_note"].side_effect = [
+        "page1",
+        NoteUploadFailException("fake error"),
+    ]
+
+    cli([*args, "--retry", "1", "--skip-failed", "fake.enex"])
+
+    capsys.readouterr()
+    cli(["state", str(state_path)])
+    assert capsys.readouterr().out == "parsed\t0\nuploading\t0\ndone\t1\nfailed\t1\n"
+
+    cli(["state", "--failed", str(state_path)])
+    failed_lines = capsys.readouterr().out.splitlines()
+    assert len(failed_lines) == 1
+    assert failed_lines[0].startswith("failed\t1\t")
+    assert failed_lines[0].endswith("\tfake\tbad\tfake error")
+
+    mock_upload_api["upload_note"].side_effect = None
+    cli([*args, "fake.enex"])
+
+    assert mock_upload_api["upload_note"].call_count == 3
+
+    cli(["state", "--left", str(state_path)])
+    assert capsys.readouterr().out == ""
+
+
+def test_state_cli_missing(tmp_path, caplog):
+    cli(["state", str(tmp_path / "missing.db")])
+
+    assert "does not exist" in caplog.text
+    assert not (tmp_path / "missing.db").exists()
@@ -0,0 +1,195 @@
+import json
+import threading
+
+import httpx
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.notion_mock_server import (
+    ROOT_PAGE_ID,
+    MockServerConfig,
+    start_mock_server,
+)
+from enex2notion.utils_rate_limit import RateLimitedTransport, RateLimiter
+from enex2notion.utils_stats import RunStats, get_endpoint_name, run_stats
+
+
+@pytest.fixture()
+def mock_server():
+    server = start_mock_server(MockServerConfig())
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_stats_percentiles():
+    stats = RunStats()
+
+    for ms in range(1, 101):
+        stats.add_timing("stage", ms / 1000)
+    stats.incr("counter")
+    stats.incr("counter", 2)
+
+    report = stats.get_report()
+
+    assert report["stages"]["stage"]["count"] == 100
+    assert report["stages"]["stage"]["total"] == pytest.approx(5.05)
+    assert report["stages"]["stage"]["p50"] == pytest.approx(0.05)
+    assert report["stages"]["stage"]["p95"] == pytest.approx(0.095)
+    assert report["stages"]["stage"]["p99"] == pytest.approx(0.099)
+    assert report["counters"] == {"counter": 3}
+
+
+def test_stats_timer():
+    stats = RunStats()
+
+    with pytest.raises(ValueError):
+        with stats.timer("failed"):
+            raise ValueError
+
+    assert stats.get_report()["stages"]["failed"]["count"] == 1
+
+
+def test_trace_spans():
+    stats = RunStats()
+    stats.start_trace()
+
+    with stats.timer("stage", note="test"):
+        pass
+    with stats.timer("wait", track="note 1"):
+        pass
+    with stats.locked(threading.Lock(), "lock_wait"):
+        pass
+
+    events = stats.get_trace()["traceEvents"]
+
+    assert [(e["name"], e["ph"]) for e in events] == [
+        ("thread_name", "M"),
+        ("stage", "X"),
+        ("wait", "b"),
+        ("wait", "e"),
+        ("lock_wait", "X"),
+    ]
+    assert events[0]["args"] == {"name": threading.current_thread().name}
+    assert events[1]["args"] == {"note": "test"}
+    assert events[1]["tid"] == threading.get_ident()
+    assert events[2]["id"] == events[3]["id"] == "note 1"
+    assert events[3]["ts"] >= events[2]["ts"]
+
+
+def test_trace_disabled():
+    stats = RunStats()
+
+    with stats.timer("stage"):
+        pass
+
+    assert stats.get_trace()["traceEvents"] == []
+
+
+def test_endpoint_name():
+    page_id = "59833787-2cf9-4fdf-8782-e53db20768a5"
+
+    assert get_endpoint_name("PATCH", f"/v1/blocks/{page_id}/children") == (
+        "PATCH /v1/blocks/{id}/children"
+    )
+    assert get_endpoint_name("GET", "/v1/blocks/59833787" + "a" * 24) == (
+        "GET /v1/blocks/{id}"
+    )
+
+
+def test_transport_stats(mocker):
+    mocker.patch("enex2notion.utils_rate_limit.time.sleep")
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200),
+    ]
+
+    transport = RateLimitedTransport(
+        RateLimiter(0), transport=httpx.MockTransport(lambda r: responses.pop(0))
+    )
+    client = httpx.Client(transport=transport, base_url="https://test")
+
+    run_stats.reset()
+    client.put("/v1/users", content=b"test")
+
+    report = run_stats.get_report()
+
+    assert report["stages"]["http PUT /v1/users"]["count"] == 3
+    assert report["counters"] == {
+        "http_429": 1,
+        "http_503": 1,
+        "http_retries": 2,
+        "http_bytes_sent": 12,
+    }
+    assert report["gauges"] == {"http_in_flight": 0}
+
+
+def test_report_cli(enex_file, mock_server, tmp_path):
+    report_file = tmp_path / "report.json"
+
+    cli(
+        [
+            "--token",
+            "fake_token",
+            "--pageid",
+            ROOT_PAGE_ID,
+            "--notion-base-url",
+            mock_server.url,
+            "--rate-limit",
+            "0",
+            "--report",
+            str(report_file),
+            str(enex_file),
+        ]
+    )
+
+    report = json.loads(report_file.read_text())
+    stages = report["stages"]
+
+    assert report["counters"]["notes_done"] == 2
+    assert report["counters"]["notes_skipped"] == 1
+    assert stages["xml_parse"]["count"] == 4
+    assert stages["note_build"]["count"] == 3
+    assert stages["dom_parse"]["count"] == 3
+    assert stages["block_append"]["count"] == 3
+    assert stages["page_create"]["count"] == 2
+    assert stages["page_rename"]["count"] == 2
+    assert stages["http POST /v1/pages"]["count"] == 3
+    assert stages["http PATCH /v1/blocks/{id}/children"]["count"] == 3
+    assert {"count", "total", "max", "p50", "p95", "p99"} == set(stages["note_upload"])
+
+
+def test_trace_cli(enex_file, mock_server, tmp_path):
+    trace_file = tmp_path / "trace.json"
+
+    cli(
+        [
+            "--token",
+            "fake_token",
+            "--pageid",
+            ROOT_PAGE_ID,
+            "--notion-base-url",
+            mock_server.url,
+            "--rate-limit",
+            "0",
+            "--trace",
+            str(trace_file),
+            str(enex_file),
+        ]
+    )
+
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    note_uploads = [e["args"] for e in events if e["name"] == "note_upload"]
+
+    assert sorted(note_uploads, key=lambda a: a["note"]) == [
+        {"note": "test1", "attempt": 1},
+        {"note": "test2", "attempt": 1},
+    ]
+    assert "page_create_lock_wait" in spans
+    assert "http PATCH /v1/blocks/{id}/children" in spans
+    assert {e["name"] for e in events if e["ph"] == "b"} == {"note_slot_wait"}
+    assert any(e["ph"] == "M" for e in events)
@@ -1,5 +1,10 @@
+import pytest
+
 from enex2notion.note_parser.string_extractor import extract_string
+from enex2notion.note_parser.string_extractor_properties import StyleCache, style_cache
 from enex2notion.notion_blocks.text import TextProp
+from enex2notion.utils_colors import extract_color
+from enex2notion.utils_stats import run_stats
 
 
 def test_extract_text(parse_html):
@@ -22,6 +27,14 @@ def test_extract_text_newline(parse_html):
     )
 
 
+def test_extract_text_newline_same_lines(parse_html):
+    test_note = parse_html("<div>test1</div><div>test1</div>")
+
+    assert extract_string(test_note) == TextProp(
+        text="test1\ntest1", properties=[["test1\ntest1"]]
+    )
+
+
 def test_extract_text_newline_inline(parse_html):
     test_note = parse_html("<div>test1<br />test2</div>")
 
@@ -345,3 +358,60 @@ def test_extract_text_color_inversion(parse_html):
     assert extract_string(test_note) == TextProp(
         text="yellow", properties=[["yellow", [["h", "yellow"]]]]
     )
+
+
+@pytest.mark.parametrize(
+    "style, color",
+    [
+        ("color:rgb(252, 18, 51);", "red"),
+        ("color: #FC1233", "red"),
+        ("color:#fff;background-color:#fe1;", "yellow_background"),
+        ("font-family: Arial;--en-highlight:yellow;", "yellow_background"),
+        # CSS parser fallback
+        ("color: rgb(252, 18, 51) !important;", "red"),
+        ("font-family: 'A;B'; color: rgba(252, 18, 51, 1)", "red"),
+        ("/* color: red; */ background-color: rgb(255, 239, 158)", "yellow_background"),
+        ("color: RED", "red"),
+        ("color: rgb(51, 51, 51)", None),
+    ],
+)
+def test_extract_color(style, color):
+    assert extract_color(style) == color
+
+
+def test_style_cache_hits(parse_html):
+    style_cache.clear()
+
+    test_note = parse_html(
+        '<div><span style="color:rgb(252, 18, 51);font-weight:bold">red</span>'
+        ' <span style="color:rgb(252, 18, 51);font-weight:bold">again</span></div>'
+    )
+
+    hits_before = run_stats.counters["style_cache_hits"]
+    misses_before = run_stats.counters["style_cache_misses"]
+
+    assert extract_string(test_note) == TextProp(
+        text="red again",
+        properties=[
+            ["red", [["b"], ["h", "red"]]],
+            [" "],
+            ["again", [["b"], ["h", "red"]]],
+        ],
+    )
+    assert run_stats.counters["style_cache_hits"] - hits_before == 1
+    assert run_stats.counters["style_cache_misses"] - misses_before == 1
+
+
+def test_style_cache_evicts_least_recent():
+    test_cache = StyleCache(2)
+
+    test_cache.get("color:#fc1233")
+    test_cache.get("font-weight:bold")
+    test_cache.get("color:#fc1233")
+    test_cache.get("font-style:italic")
+
+    misses_before = run_stats.counters["style_cache_misses"]
+
+    assert test_cache.get("color:#fc1233") == (("h", "red"),)
+    assert test_cache.get("font-weight:bold") == (("b",),)
+    assert run_stats.counters["style_cache_misses"] - misses_before == 1
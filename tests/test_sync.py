@@ -0,0 +1,131 @@
+import logging
+
+import pytest
+
+from enex2notion.cli import cli
+from enex2notion.cli_upload import DoneFile
+from enex2notion.enex_uploader import sync_note
+from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
+
+
+def test_note_id(make_note):
+    assert make_note(content="v1").note_id == make_note(content="v2").note_id
+    assert make_note(title="a").note_id != make_note(title="b").note_id
+    assert make_note(guid="fake-guid").note_id == "fake-guid"
+
+
+def test_done_file_mapping(tmp_path):
+    done_path = tmp_path / "done.txt"
+    done_path.write_text("legacy_hash\n")
+
+    done_file = DoneFile(done_path)
+    done_file.add("hash1", "note1", "page1")
+
+    reloaded = DoneFile(done_path)
+
+    assert "legacy_hash" in reloaded
+    assert "hash1" in reloaded
+    assert reloaded.get_page_id("note1") == "page1"
+    assert done_path.read_text() == "legacy_hash\nhash1\tnote1\tpage1\n"
+
+
+def test_done_file_memory():
+    done_file = DoneFile(None)
+    done_file.add("hash1", "note1", "page1")
+
+    assert "hash1" in done_file
+    assert done_file.get_page_id("note1") == "page1"
+
+
+def test_sync_changed(make_note, mock_upload_api, tmp_path, mocker):
+    done_file = tmp_path / "done.txt"
+    args = ["--token", "t", "--pageid", "p", "--done-file", str(done_file)]
+
+    mock_upload_api["iter_notes"].return_value = [make_note(content="v1")]
+    cli([*args, "fake.enex"])
+
+    changed_note = make_note(content="v2")
+    mock_upload_api["iter_notes"].return_value = [changed_note]
+    cli([*args, "--sync", "fake.enex"])
+
+    mock_upload_api["upload_note"].assert_called_once()
+    mock_upload_api["sync_note"].assert_called_once_with(
+        mock_upload_api["get_notebook_page"].return_value,
+        changed_note,
+        ["block"],
+        False,
+        "page1",
+        mocker.ANY,
+    )
+
+
+def test_sync_unchanged(make_note, mock_upload_api, tmp_path):
+    done_file = tmp_path / "done.txt"
+    args = ["--token", "t", "--pageid", "p", "--done-file", str(done_file)]
+
+    mock_upload_api["iter_notes"].return_value = [make_note()]
+    cli([*args, "fake.enex"])
+    cli([*args, "--sync", "fake.enex"])
+
+    mock_upload_api["upload_note"].assert_called_once()
+    mock_upload_api["sync_note"].assert_not_called()
+
+
+def test_no_sync_changed(make_note, mock_upload_api, tmp_path):
+    done_file = tmp_path / "done.txt"
+    args = ["--token", "t", "--pageid", "p", "--done-file", str(done_file)]
+
+    mock_upload_api["iter_notes"].return_value = [make_note(content="v1")]
+    cli([*args, "fake.enex"])
+
+    mock_upload_api["iter_notes"].return_value = [make_note(content="v2")]
+    cli([*args, "fake.enex"])
+
+    assert mock_upload_api["upload_note"].call_count == 2
+    mock_upload_api["sync_note"].assert_not_called()
+
+
+def test_sync_requires_done_file(mock_upload_api, caplog):
+    with caplog.at_level(logging.ERROR, logger="enex2notion"):
+        with pytest.raises(SystemExit):
+            cli(["--token", "t", "--pageid", "p", "--sync", "fake.enex"])
+
+    assert "--sync requires --done-file" in caplog.text
+
+
+def test_sync_note_replaces_blocks(make_note, mocker):
+    client = mocker.MagicMock()
+    client.pages.retrieve.return_value = {"id": "page1"}
+    client.blocks.children.list.side_effect = [
+        {"results": [{"id": "b1"}], "has_more": True, "next_cursor": "c1"},
+        {"results": [{"id": "b2"}], "has_more": False},
+    ]
+    root = {"id": "root", "_client": client}
+
+    note = make_note(title="new title")
+    blocks = [NotionTextBlock(text_prop=TextProp("test"))]
+
+    assert sync_note(root, note, blocks, False, "page1") == "page1"
+
+    client.pages.create.assert_not_called()
+    assert [c.kwargs["block_id"] for c in client.blocks.delete.call_args_list] == [
+        "b1",
+        "b2",
+    ]
+    client.blocks.children.append.assert_called_once()
+
+    final_title = client.pages.update.call_args_list[-1].kwargs["properties"]
+    assert final_title["title"]["title"][0]["text"]["content"] == "new title"
+
+
+def test_sync_note_page_gone(make_note, mocker):
+    client = mocker.MagicMock()
+    client.pages.retrieve.return_value = {"id": "page1", "archived": True}
+    client.pages.create.return_value = {"id": "page2"}
+    client.search.return_value = {"results": []}
+    root = {"id": "root", "_client": client}
+
+    blocks = [NotionTextBlock(text_prop=TextProp("test"))]
+
+    assert sync_note(root, make_note(), blocks, False, "page1") == "page2"
+    client.blocks.delete.assert_not_called()
@@ -0,0 +1,101 @@
+import copy
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.enex_generator import GeneratorConfig, generate_enex
+from enex2notion.note_parser.blocks import parse_note_blocks
+from enex2notion.note_parser.webclip import parse_webclip
+from enex2notion.note_parser.webclip_stages_cleanup import (
+    fix_redundant_img_src_quotes,
+    remove_empty_blocks,
+    strip_paragraphs,
+    wrap_orphans,
+)
+from enex2notion.note_parser.webclip_stages_convert import (
+    convert_inline_modifiers,
+    convert_newlines,
+    convert_paragraphs,
+    convert_subheaders,
+    convert_textless_links,
+)
+from enex2notion.note_parser.webclip_stages_flatten import flatten_root
+from enex2notion.note_parser.webclip_stages_preparation import (
+    remove_unprocessable,
+    unpack_block_elements,
+    unpack_tables,
+)
+
+# Stage by stage pipeline the fused passes must match
+SEPARATE_STAGES = (
+    remove_unprocessable,
+    unpack_block_elements,
+    unpack_tables,
+    convert_paragraphs,
+    convert_subheaders,
+    convert_inline_modifiers,
+    convert_textless_links,
+    convert_newlines,
+    flatten_root,
+    remove_empty_blocks,
+    wrap_orphans,
+    strip_paragraphs,
+    fix_redundant_img_src_quotes,
+)
+
+WEBCLIPS = (
+    "<div>test</div>",
+    "<nav><section><p>menu</p></section></nav><p>text</p>",
+    "<section><nav>menu</nav><article><p>text</p></article></section>",
+    "<menu><menu>a</menu></menu><footer>bye<nav>x</nav></footer>",
+    "<figure><img src=\"'test.png'\"/><figcaption>caption</figcaption></figure>",
+    (
+        "<table><colgroup><col/></colgroup><caption>cap</caption>"
+        "<thead><tr><th>h1</th><th>h2</th></tr></thead>"
+        "<tbody><tr><td><p>c1</p></td><td><strong>c2</strong></td></tr></tbody>"
+        "</table>"
+    ),
+    "<colgroup><section><p>hidden</p></section></colgroup><p>shown</p>",
+    "<details><dl><dt>term</dt><dd>definition<br/>more</dd></dl></details>",
+    "<h4>h4</h4><h5>h5</h5><h6><em>h6</em></h6>",
+    "<p><strike>s</strike><del>d</del><cite>c</cite><abbr>a</abbr></p>",
+    '<a href="http://a.com"> <br/> </a><a href="http://b.com">text</a>',
+    '<a href="http://outer.com"><a href="http://inner.com"></a></a>',
+    '<a href="http://outer.com"> <span><br/></span> </a>',
+    '<a href=""> </a><a> <br/> </a>',
+    "<div>  <b> lead</b> mid <i>tail </i>  </div>",
+    "<div><div><p>deep <br/> text</p><ul><li>item</li></ul>after</div></div>",
+    "<span>orphan</span><div>para</div>  <hr/>  text<img src='\"x.png\"'/>",
+    "<blockquote><pre>code\n  block</pre><address>addr</address></blockquote>",
+    "<main><aside><hgroup><h1>t</h1><h2>s</h2></hgroup></aside></main>",
+    "<form><fieldset><dialog>dlg</dialog></fieldset></form>",
+    "<div>   </div><div><br/></div><div>\n</div>",
+)
+
+
+def _run_separate_stages(note_dom):
+    for stage in SEPARATE_STAGES:
+        stage(note_dom)
+
+    return parse_note_blocks(note_dom)
+
+
+def _get_generated_webclips():
+    config = GeneratorConfig(notes=10, webclip_ratio=1, attachments=0, seed=3)
+    enex = "".join(generate_enex(config))
+
+    return [c.split("]]>")[0] for c in enex.split("<content><![CDATA[")[1:]]
+
+
+@pytest.mark.parametrize("webclip", [*WEBCLIPS, *_get_generated_webclips()])
+def test_fused_matches_separate_stages(webclip):
+    note_dom = BeautifulSoup(f"<en-note>{webclip}</en-note>", "html.parser").find(
+        "en-note"
+    )
+    expected_dom = copy.copy(note_dom)
+
+    expected_blocks = _run_separate_stages(expected_dom)
+    blocks = parse_webclip(note_dom)
+
+    assert str(note_dom) == str(expected_dom)
+    assert blocks == expected_blocks
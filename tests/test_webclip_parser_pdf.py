@@ -1,10 +1,12 @@
 from datetime import datetime
+from pathlib import Path
 
 import pytest
 from dateutil.tz import tzutc
 
 from enex2notion.enex_types import EvernoteNote, EvernoteResource
 from enex2notion.note_parser.note import parse_note
+from enex2notion.notion_blocks.text import NotionTextBlock, TextProp
 from enex2notion.notion_blocks.uploadable import NotionImageBlock, NotionPDFBlock
 
 
@@ -26,7 +28,7 @@ def mock_pdf_block():
 
 @pytest.fixture()
 def mock_pdfkit(mocker):
-    mock_pdfkit = mocker.patch("enex2notion.note_parser.webclip_pdf.pdfkit.from_string")
+    mock_pdfkit = mocker.patch("enex2notion.note_parser.webclip_pdf.render_pdf")
     mock_pdfkit.return_value = b""
 
     return mock_pdfkit
@@ -109,7 +111,7 @@ def test_local_image(mock_pdfkit, mock_pdf_block, smallest_gif, parse_rules):
 
     expected_html = (
         '<en-note><img height="100"'
-        ' src="data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEAAAAALAAAAAABAAEAAAIA"'
+        ' src="{0}/{1}.gif"'
         ' width="100"></img></en-note>'
     )
 
@@ -117,8 +119,9 @@ def test_local_image(mock_pdfkit, mock_pdf_block, smallest_gif, parse_rules):
 
     result_blocks = parse_note(test_note, parse_rules)
     result_html = mock_pdfkit.call_args[0][0]
+    images_dir = Path(mock_pdfkit.call_args[1]["options"]["allow"])
 
-    assert result_html == expected_html
+    assert result_html == expected_html.format(images_dir.as_uri(), smallest_gif.md5)
     assert result_blocks == [mock_pdf_block]
 
 
@@ -220,3 +223,81 @@ def test_data_images(mock_pdfkit, mock_pdf_block, parse_rules):
 
     assert result_html == expected_html
     assert result_blocks == [mock_pdf_block]
+
+
+def test_local_image_file(mocker, smallest_gif, parse_rules):
+    test_note = EvernoteNote(
+        title="test1",
+        created=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        updated=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        content=(
+            f'<en-note><en-media type="image/gif" hash="{smallest_gif.md5}">'
+            "</en-note>"
+        ),
+        tags=[],
+        author="",
+        url="",
+        is_webclip=True,
+        resources=[smallest_gif],
+    )
+
+    rendered_images = []
+
+    def fake_render(html, jobs, timeout, options):
+        images_dir = Path(options["allow"])
+        rendered_images.extend(f.read_bytes() for f in images_dir.iterdir())
+        return b""
+
+    mocker.patch(
+        "enex2notion.note_parser.webclip_pdf.render_pdf", side_effect=fake_render
+    )
+
+    parse_rules.mode_webclips = "PDF"
+
+    parse_note(test_note, parse_rules)
+
+    assert rendered_images == [smallest_gif.data_bin]
+
+
+def test_auto_small_webclip(mock_pdfkit, parse_rules):
+    test_note = EvernoteNote(
+        title="test1",
+        created=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        updated=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        content="<en-note><div>test</div></en-note>",
+        tags=[],
+        author="",
+        url="",
+        is_webclip=True,
+        resources=[],
+    )
+
+    parse_rules.mode_webclips = "AUTO"
+
+    result_blocks = parse_note(test_note, parse_rules)
+
+    mock_pdfkit.assert_not_called()
+    assert result_blocks == [NotionTextBlock(text_prop=TextProp("test"))]
+
+
+def test_auto_big_webclip(mock_pdfkit, parse_rules):
+    paragraphs = "".join(f"<p>line {i}</p>" for i in range(120))
+
+    test_note = EvernoteNote(
+        title="test1",
+        created=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        updated=datetime(2021, 11, 18, 0, 0, 0, tzinfo=tzutc()),
+        content=f"<en-note>{paragraphs}</en-note>",
+        tags=[],
+        author="",
+        url="",
+        is_webclip=True,
+        resources=[],
+    )
+
+    parse_rules.mode_webclips = "AUTO"
+    parse_rules.webclip_max_requests = 2
+
+    parse_note(test_note, parse_rules)
+
+    assert mock_pdfkit.call_args[0][0] == test_note.content